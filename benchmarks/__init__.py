@@ -0,0 +1,7 @@
+"""
+
+    Performance benchmarks for VVV.
+
+    See :py:mod:`benchmarks.run`.
+
+"""
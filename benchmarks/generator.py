@@ -0,0 +1,223 @@
+"""
+
+    Generate synthetic project trees for benchmarking.
+
+    The same parameters and seed always give the same tree, so that
+    results of different VVV versions can be compared.
+
+"""
+
+# Python imports
+import os
+import random
+
+#: Non-breaking space caught by evil-spacebar validator
+NBSP = "\u00a0"
+
+#: Default file extensions and their relative weights
+DEFAULT_EXTENSIONS = {
+    ".py": 6,
+    ".txt": 2,
+    ".rst": 1,
+    ".css": 1,
+    ".js": 1,
+    ".pt": 1,
+}
+
+#: Folders which are generated and then ignored in validation-files.yaml
+DEFAULT_IGNORED = ["build", "node_modules", "*.egg-info"]
+
+#: Line marking a file which the stub validators report as bad, see stubs.py
+ERROR_MARKER = "# benchmark-error"
+
+#: Words used for file contents
+WORDS = ["foo", "bar", "baz", "return", "import", "def", "class", "self", "value", "print", "none", "true"]
+
+#: Global options for the generated project. Validators not having a stub are disabled.
+OPTIONS_TEMPLATE = """
+linelength:
+  length: %(max_line_length)d
+css:
+  enabled: false
+jshint:
+  enabled: false
+rst:
+  enabled: false
+"""
+
+
+class TreeParameters(object):
+    """
+    Shape of a generated project tree.
+    """
+
+    def __init__(self, files=1000, depth=4, folders_per_level=4, extensions=None, lines=(10, 200),
+                 line_length=(0, 100), tab_density=0.01, nbsp_density=0.001, error_density=0.05, ignored=None, ignored_files=100, extra_ignores=0, seed=0):
+        """
+        :param files: How many files are validated
+
+        :param depth: How many folder levels there are at most
+
+        :param folders_per_level: How many subfolders each folder has at most
+
+        :param extensions: Dict file extension -> relative weight
+
+        :param lines: Tuple (min, max) lines per file
+
+        :param line_length: Tuple (min, max) characters per line
+
+        :param tab_density: Probability of a line being indented with a hard tab
+
+        :param nbsp_density: Probability of a line containing a non-breaking space
+
+        :param error_density: Probability of a file being reported bad by the stub validators
+
+        :param ignored: Folder name patterns written to validation-files.yaml blacklist
+
+        :param ignored_files: How many files are generated in the ignored folders
+
+        :param extra_ignores: How many more blacklist patterns, not matching any file, are written to validation-files.yaml
+
+        :param seed: Random seed
+        """
+        self.files = files
+        self.depth = depth
+        self.folders_per_level = folders_per_level
+        self.extensions = extensions or DEFAULT_EXTENSIONS
+        self.lines = lines
+        self.line_length = line_length
+        self.tab_density = tab_density
+        self.nbsp_density = nbsp_density
+        self.error_density = error_density
+        self.ignored = DEFAULT_IGNORED if ignored is None else ignored
+        self.ignored_files = ignored_files
+        self.extra_ignores = extra_ignores
+        self.seed = seed
+
+    def get_data(self):
+        """
+        :return: Parameters as JSON serializable dict for the results file
+        """
+        return dict(self.__dict__)
+
+
+def generate_line(rand, params):
+    """
+    :return: One line of text without the newline
+    """
+    length = rand.randint(*params.line_length)
+
+    words = []
+    total = 0
+    while total < length:
+        word = rand.choice(WORDS)
+        words.append(word)
+        total += len(word) + 1
+
+    line = " ".join(words)[:length]
+
+    if rand.random() < params.nbsp_density:
+        pos = rand.randint(0, len(line))
+        line = line[:pos] + NBSP + line[pos:]
+
+    if rand.random() < params.tab_density:
+        line = "\t" + line
+    else:
+        line = "    " * rand.randint(0, 3) + line
+
+    return line
+
+
+def generate_text(rand, params):
+    """
+    :return: File content as unicode string
+    """
+    count = rand.randint(*params.lines)
+    text = "".join(generate_line(rand, params) + "\n" for i in range(count))
+    if rand.random() < params.error_density:
+        text += ERROR_MARKER + "\n"
+    return text
+
+
+def generate_folders(rand, params):
+    """
+    :return: List of folder paths relative to the project root, including the root itself as ""
+    """
+    folders = [""]
+    level = [""]
+
+    for depth in range(params.depth):
+        next_level = []
+        for parent in level:
+            for i in range(rand.randint(0, params.folders_per_level)):
+                next_level.append(os.path.join(parent, "folder%d_%d" % (depth, i)))
+        folders += next_level
+        level = next_level
+
+    return folders
+
+
+def write_file(fpath, text):
+    """
+    Write a file creating its folder.
+    """
+    folder = os.path.dirname(fpath)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(fpath, "wt", encoding="utf-8") as f:
+        f.write(text)
+
+
+def get_files_config(params):
+    """
+    :return: validation-files.yaml content
+    """
+    lines = ["all: |", "  *"]
+    for pattern in params.ignored:
+        lines.append("  !%s" % pattern)
+
+    # Large imported ignore lists mix exact names, extensions and wildcards
+    templates = ["  !unused%d", "  !*.unused%d", "  !unused%d/folder", "  !unused%d-*.tmp"]
+    for i in range(params.extra_ignores):
+        lines.append(templates[i % len(templates)] % i)
+    return "\n".join(lines) + "\n"
+
+
+def generate_tree(path, params, options=""):
+    """
+    Create a synthetic project.
+
+    :param path: Folder where the project is created
+
+    :param params: TreeParameters
+
+    :param options: Extra YAML appended to validation-options.yaml, e.g. stub validator commands
+
+    :return: List of project root relative paths of the generated files which are validated
+    """
+
+    rand = random.Random(params.seed)
+
+    folders = generate_folders(rand, params)
+
+    extensions = sorted(params.extensions.items())
+    choices = [ext for ext, weight in extensions for i in range(weight)]
+
+    fpaths = []
+
+    for i in range(params.files):
+        folder = rand.choice(folders)
+        fpath = os.path.join(folder, "file%d%s" % (i, rand.choice(choices)))
+        write_file(os.path.join(path, fpath), generate_text(rand, params))
+        fpaths.append(fpath)
+
+    # Files which the walker must skip
+    ignored = [pattern.replace("*", "generated") for pattern in params.ignored]
+    for i in range(params.ignored_files if ignored else 0):
+        fpath = os.path.join(rand.choice(folders), rand.choice(ignored), "ignored%d.py" % i)
+        write_file(os.path.join(path, fpath), generate_text(rand, params))
+
+    write_file(os.path.join(path, "validation-files.yaml"), get_files_config(params))
+    write_file(os.path.join(path, "validation-options.yaml"), OPTIONS_TEMPLATE % dict(max_line_length=params.line_length[1] + 10) + options)
+
+    return fpaths
@@ -0,0 +1,173 @@
+"""
+
+    Measure how long VVV takes to start.
+
+    Runs VVV against a one file project in a fresh Python process with
+    ``python -X importtime`` and reports the time spent importing modules,
+    the wall clock time of the process and whether modules which should
+    only be imported when needed were imported.
+
+    Usage::
+
+        python -m benchmarks.importtime --output importtime.json
+
+"""
+
+# Python imports
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+
+import plac
+
+#: Modules which a run not downloading anything must not import
+LAZY_MODULES = ["requests", "tarfile", "pkg_resources"]
+
+#: Project where only the built-in validators are enabled
+OPTIONS = """
+css:
+  enabled: false
+jshint:
+  enabled: false
+pylint:
+  enabled: false
+pep8:
+  enabled: false
+pyflakes:
+  enabled: false
+rst:
+  enabled: false
+zptlint:
+  enabled: false
+"""
+
+FILES = """
+all: |
+  *
+"""
+
+
+def parse_importtime(output):
+    """
+    Parse ``-X importtime`` output.
+
+    :return: Dict module name -> (self microseconds, cumulative microseconds, nesting level)
+    """
+    modules = {}
+
+    for line in output.splitlines():
+
+        if not line.startswith("import time:"):
+            continue
+
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            # Header line
+            continue
+
+        name = parts[2].rstrip()
+        stripped = name.lstrip(" ")
+        level = (len(name) - len(stripped) - 1) // 2
+        modules[stripped] = (self_us, cumulative_us, level)
+
+    return modules
+
+
+def create_project(path):
+    """
+    Create a project with one file.
+    """
+    for name, text in (("validation-options.yaml", OPTIONS), ("validation-files.yaml", FILES), ("foo.txt", "foo\n")):
+        with open(os.path.join(path, name), "wt") as f:
+            f.write(text)
+
+
+def run_vvv(path, home):
+    """
+    Run VVV command line in a new process.
+
+    :return: Dict with wall clock time and import times
+    """
+    env = dict(os.environ, HOME=home)
+
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-X", "importtime", "-m", "vvv.main", "-q", path],
+                               env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    wall = time.perf_counter() - started
+
+    modules = parse_importtime(stderr.decode("utf-8", "replace"))
+
+    return dict(
+        exit_code=process.returncode,
+        wall=wall,
+        imports=sum(cumulative for self_us, cumulative, level in modules.values() if level == 0) / 1000000.0,
+        modules=len(modules),
+        lazy_modules_imported=[name for name in LAZY_MODULES if name in modules],
+        slowest=sorted(((name, cumulative / 1000000.0) for name, (self_us, cumulative, level) in modules.items() if level == 0),
+                       key=lambda item: item[1], reverse=True)[:10],
+    )
+
+
+def measure(repeat):
+    """
+    :return: Results of the first run, which scans the installed plug-ins, and the best later run
+    """
+    path = tempfile.mkdtemp()
+    home = tempfile.mkdtemp()
+
+    try:
+        create_project(path)
+        first = run_vvv(path, home)
+        runs = [run_vvv(path, home) for i in range(repeat)]
+    finally:
+        shutil.rmtree(path)
+        shutil.rmtree(home)
+
+    return dict(
+        python=sys.version.split()[0],
+        first=first,
+        best=min(runs, key=lambda run: run["wall"]),
+    )
+
+
+@plac.annotations(
+    repeat=("How many times VVV is started after the first run", "option", "r", int),
+    output=("Write JSON results to this file", "option", "o", str),
+)
+def main(repeat=5, output=None):
+    """
+    Measure VVV start up time.
+    """
+
+    data = measure(repeat)
+
+    for name in ("first", "best"):
+        run = data[name]
+        print("%-6s wall %.3f s, imports %.3f s, %d modules, lazy modules imported: %s" % (
+            name, run["wall"], run["imports"], run["modules"], ", ".join(run["lazy_modules_imported"]) or "none"))
+
+    if output:
+        with open(output, "wt") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    return 0
+
+
+def entry_point():
+    """
+    Application starting point which parses command line.
+    """
+    sys.exit(plac.call(main))
+
+if __name__ == "__main__":
+    entry_point()
@@ -0,0 +1,279 @@
+"""
+
+    Benchmark VVV against a synthetic project tree.
+
+    Usage::
+
+        python -m benchmarks.run --files 5000 --output results.json
+
+    Measured steps
+
+    * ``walker`` - walking the tree with the global match list
+
+    * ``globster`` - matching the walked and the ignored paths against the global and plug-in match lists
+
+    * ``text-lines`` - running the built-in text line validators against all files
+
+    * ``run`` - full ``VVV.run()`` without the result cache, external validators replaced with stubs
+
+    * ``run-cached`` - full ``VVV.run()`` when all results are in the result cache
+
+    Each step is repeated and the best, mean and all timings are saved as JSON,
+    so that results of different VVV versions can be compared.
+
+"""
+
+# Python imports
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+
+import plac
+import pkg_resources
+
+# Local imports
+from vvv.main import VVV
+from vvv.filecontext import FileContext
+from vvv.textlineplugin import TextLinePlugin, run_text_line_plugins
+
+from .generator import TreeParameters, generate_tree
+from .stubs import create_stubs
+
+#: How many times each step is run by default
+DEFAULT_REPEAT = 3
+
+
+def create_vvv(path, installation, **kwargs):
+    """
+    :return: VVV instance set up to scan the generated project
+    """
+    vvv = VVV(quiet=True,
+              target=path,
+              installation=installation,
+              options=os.path.join(path, "validation-options.yaml"),
+              files=os.path.join(path, "validation-files.yaml"),
+              **kwargs)
+    vvv.set_project_path(path)
+    return vvv
+
+
+def create_setup_vvv(path, installation, **kwargs):
+    """
+    :return: VVV instance with configuration read and plug-ins initialized
+    """
+    vvv = create_vvv(path, installation, **kwargs)
+    vvv.setup()
+    return vvv
+
+
+def measure(func, repeat):
+    """
+    Run a function several times.
+
+    :return: Dict of timings in seconds
+    """
+    timings = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return dict(best=min(timings), mean=sum(timings) / len(timings), timings=timings)
+
+
+class Benchmark(object):
+    """
+    Generate a project and time VVV against it.
+    """
+
+    def __init__(self, path, installation, params, repeat=DEFAULT_REPEAT, jobs=None):
+        """
+        :param path: Folder where the project is generated
+
+        :param installation: VVV installation folder used in the runs
+
+        :param params: TreeParameters
+
+        :param jobs: Worker processes for full runs
+        """
+        self.path = path
+        self.installation = installation
+        self.params = params
+        self.repeat = repeat
+        self.jobs = jobs
+
+        #: Project root relative paths of generated files which are validated
+        self.fpaths = None
+
+        #: Paths of all generated files, including ignored ones
+        self.all_fpaths = None
+
+    def generate(self):
+        """
+        Create the project tree and stub validators.
+        """
+        options = create_stubs(os.path.join(self.installation, "stubs"))
+        self.fpaths = generate_tree(self.path, self.params, options)
+
+        self.all_fpaths = []
+        for root, dirs, files in os.walk(self.path):
+            relative = os.path.relpath(root, self.path)
+            for fname in files:
+                self.all_fpaths.append(fname if relative == "." else os.path.join(relative, fname))
+
+    def bench_walker(self):
+        """
+        Walk the project tree.
+        """
+        vvv = create_setup_vvv(self.path, self.installation, no_cache=True)
+
+        def walk():
+            """ Exhaust the walker """
+            for fpath in vvv.walker.walk_project_files(self.path, self.path, vvv.matchlist):
+                pass
+
+        return measure(walk, self.repeat)
+
+    def bench_globster(self):
+        """
+        Match all paths against the match lists.
+        """
+        vvv = create_setup_vvv(self.path, self.installation, no_cache=True)
+
+        matchlists = [vvv.matchlist] + [p.matchlist for p in vvv.plugins.values()]
+
+        def match():
+            """ Match every path against every list """
+            for matchlist in matchlists:
+                for fpath in self.all_fpaths:
+                    matchlist.match(fpath)
+
+        result = measure(match, self.repeat)
+        result["matches"] = len(matchlists) * len(self.all_fpaths)
+        return result
+
+    def bench_text_lines(self):
+        """
+        Run the built-in text line validators against all files.
+        """
+        vvv = create_setup_vvv(self.path, self.installation, no_cache=True)
+
+        plugins = [p for p in vvv.plugins.values() if isinstance(p, TextLinePlugin)]
+
+        def validate():
+            """ Check all files """
+            for fpath in self.fpaths:
+                run_text_line_plugins(plugins, FileContext(self.path, fpath))
+
+        result = measure(validate, self.repeat)
+        result["plugins"] = sorted(p.id for p in plugins)
+        return result
+
+    def bench_run(self, no_cache):
+        """
+        Run VVV.run() against the project.
+        """
+
+        def run():
+            """ One full run """
+            create_vvv(self.path, self.installation, no_cache=no_cache, jobs=self.jobs).run()
+
+        if not no_cache:
+            # Fill the cache
+            run()
+
+        return measure(run, self.repeat)
+
+    def run(self):
+        """
+        Generate the project and run all benchmarks.
+
+        :return: Results as JSON serializable dict
+        """
+
+        self.generate()
+
+        results = dict(
+            walker=self.bench_walker(),
+            globster=self.bench_globster(),
+        )
+        results["text-lines"] = self.bench_text_lines()
+        results["run"] = self.bench_run(no_cache=True)
+        results["run-cached"] = self.bench_run(no_cache=False)
+
+        return dict(
+            vvv=pkg_resources.get_distribution("vvv").version,
+            python=platform.python_version(),
+            platform=platform.platform(),
+            repeat=self.repeat,
+            jobs=self.jobs,
+            files=len(self.fpaths),
+            parameters=self.params.get_data(),
+            results=results,
+        )
+
+
+def format_results(data):
+    """
+    :return: Human readable summary as a string
+    """
+    lines = ["VVV %s on Python %s, %d files" % (data["vvv"], data["python"], data["files"])]
+    for name, result in sorted(data["results"].items()):
+        lines.append("%-15s best %8.3f s mean %8.3f s" % (name, result["best"], result["mean"]))
+    return "\n".join(lines)
+
+
+@plac.annotations(
+    files=("How many validated files are generated", "option", "f", int),
+    depth=("Maximum folder depth", "option", "d", int),
+    max_lines=("Maximum lines per file", "option", "ml", int),
+    max_line_length=("Maximum characters per line", "option", "mll", int),
+    tab_density=("Probability of a line indented with a tab", "option", "td", float),
+    nbsp_density=("Probability of a line containing a non-breaking space", "option", "nd", float),
+    extra_ignores=("How many more blacklist patterns are written to validation-files.yaml", "option", "ei", int),
+    seed=("Random seed for the tree generator", "option", "s", int),
+    repeat=("How many times each step is run", "option", "r", int),
+    jobs=("Worker processes for full runs", "option", "j", int),
+    keep=("Generate the project in this folder and do not delete it", "option", "k", str),
+    output=("Write JSON results to this file", "option", "o", str),
+)
+def main(files=1000, depth=4, max_lines=200, max_line_length=100, tab_density=0.01, nbsp_density=0.001,
+         extra_ignores=0, seed=0, repeat=DEFAULT_REPEAT, jobs=None, keep=None, output=None):
+    """
+    Benchmark VVV against a generated project tree.
+    """
+
+    params = TreeParameters(files=files, depth=depth, lines=(0, max_lines), line_length=(0, max_line_length),
+                            tab_density=tab_density, nbsp_density=nbsp_density, extra_ignores=extra_ignores, seed=seed)
+
+    path = keep or tempfile.mkdtemp()
+    installation = tempfile.mkdtemp()
+
+    try:
+        data = Benchmark(path, installation, params, repeat=repeat, jobs=jobs).run()
+    finally:
+        shutil.rmtree(installation)
+        if not keep:
+            shutil.rmtree(path)
+
+    print(format_results(data))
+
+    if output:
+        with open(output, "wt") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    return 0
+
+
+def entry_point():
+    """
+    Application starting point which parses command line.
+    """
+    sys.exit(plac.call(main))
+
+if __name__ == "__main__":
+    entry_point()
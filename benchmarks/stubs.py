@@ -0,0 +1,85 @@
+"""
+
+    Stub validator commands for benchmarking.
+
+    The stubs start like the real validators would, but do not need Java, Node or
+    a virtualenv, so we measure VVV's own overhead: walking, matching, process spawning,
+    splitting batch output and reporting. A file is reported bad when it contains
+    :py:data:`benchmarks.generator.ERROR_MARKER`.
+
+"""
+
+# Python imports
+import os
+import sys
+import stat
+
+from .generator import ERROR_MARKER
+
+#: Python script used for all stubs. Arguments starting with - are ignored,
+#: the rest are files to check.
+STUB_TEMPLATE = """#!%(python)s
+import os
+import sys
+
+style = %(style)r
+failed = False
+
+for fname in sys.argv[1:]:
+    if fname.startswith("-") or not os.path.isfile(fname):
+        continue
+    with open(fname, "rb") as f:
+        data = f.read()
+    if %(marker)r not in data:
+        continue
+    failed = True
+    if style == "pylint":
+        module = os.path.splitext(os.path.basename(fname))[0]
+        print("************* Module " + module)
+        print("C:  1,0: Benchmark stub message")
+    else:
+        print(fname + ":1:1: Benchmark stub message")
+
+sys.exit(1 if failed else 0)
+"""
+
+#: Validator id -> (command option name, output style)
+STUB_VALIDATORS = {
+    "pyflakes": ("pyflakes-command", "prefix"),
+    "pep8": ("pep8-command", "prefix"),
+    "pylint": ("pylint-command", "pylint"),
+    "zptlint": ("zptlint-command", "prefix"),
+}
+
+
+def create_stub(fpath, style):
+    """
+    Write an executable stub script.
+    """
+    with open(fpath, "wt") as f:
+        f.write(STUB_TEMPLATE % dict(python=sys.executable, style=style, marker=ERROR_MARKER.encode("ascii")))
+
+    os.chmod(fpath, os.stat(fpath).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def create_stubs(folder):
+    """
+    Create stub commands for all external validators we can stub.
+
+    :param folder: Where the scripts are written
+
+    :return: validation-options.yaml snippet pointing the validators to the stubs
+    """
+
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    lines = []
+
+    for validator_id, (option, style) in sorted(STUB_VALIDATORS.items()):
+        fpath = os.path.join(folder, "%s-stub" % validator_id)
+        create_stub(fpath, style)
+        lines.append("%s:" % validator_id)
+        lines.append("  %s: %s" % (option, fpath))
+
+    return "\n".join(lines) + "\n"
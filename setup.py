@@ -30,7 +30,7 @@ setup(name="vvv",
         "docutils",
         "Pygments"
     ],
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     classifiers=[
         "Programming Language :: Python",
     ],
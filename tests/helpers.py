@@ -0,0 +1,91 @@
+"""
+
+    Helpers for running VVV against small generated projects in test cases.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vvv.main import VVV
+
+#: Only run built-in text validators, so that we do not need to download anything
+OPTIONS = """
+css:
+  enabled: false
+jshint:
+  enabled: false
+pylint:
+  enabled: false
+pep8:
+  enabled: false
+pyflakes:
+  enabled: false
+rst:
+  enabled: false
+zptlint:
+  enabled: false
+"""
+
+FILES = """
+all: |
+  *
+"""
+
+
+class ProjectTestCase(unittest.TestCase):
+    """
+    Create a temporary project folder and installation folder for each test.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.installation = tempfile.mkdtemp()
+
+        self.write("validation-options.yaml", OPTIONS)
+        self.write("validation-files.yaml", FILES)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        shutil.rmtree(self.installation)
+
+    def write(self, name, text):
+        """
+        Create a file in the test project.
+        """
+        fpath = os.path.join(self.path, name)
+        folder = os.path.dirname(fpath)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(fpath, "wt") as f:
+            f.write(text)
+
+    def read(self, name):
+        """
+        Read a file in the test project.
+        """
+        with open(os.path.join(self.path, name), "rt") as f:
+            return f.read()
+
+    def create_vvv(self, **kwargs):
+        """
+        :return: VVV instance set up to scan the test project
+        """
+        kwargs.setdefault("target", self.path)
+        vvv = VVV(quiet=True,
+                  installation=self.installation,
+                  options=os.path.join(self.path, "validation-options.yaml"),
+                  files=os.path.join(self.path, "validation-files.yaml"),
+                  **kwargs)
+        vvv.set_project_path(self.path)
+        return vvv
+
+    def run_vvv(self, **kwargs):
+        """
+        :return: Tuple (exit code, output)
+        """
+        vvv = self.create_vvv(**kwargs)
+        result = vvv.run()
+        return result, vvv.output
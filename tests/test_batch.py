@@ -0,0 +1,147 @@
+"""
+
+    Test validating several files with one validator command.
+
+"""
+
+import logging
+import os
+import unittest
+
+from vvv import utils
+from vvv.plugin import Plugin
+from vvv.reporter import Reporter
+from vvv.validators.pylint import get_module_file
+from vvv.validators.css import CSSPlugin
+
+
+class DummyPlugin(Plugin):
+    """
+    Validator which fails files having "bad" in their name.
+    """
+
+    def __init__(self):
+        Plugin.__init__(self)
+        self.id = "dummy"
+        self.logger = logging.getLogger("vvv")
+        self.reporter = Reporter(suicidal=False)
+        self.validated = []
+
+    def validate(self, fullpath):
+        self.validated.append(fullpath)
+        if "bad" in fullpath:
+            self.reporter.report_unstructured(self.id, "%s:1: bad file" % fullpath, fname=fullpath)
+            return False
+        return True
+
+
+class DummyCSSPlugin(CSSPlugin):
+    """
+    CSS validator with canned W3C validator output.
+    """
+
+    def __init__(self, output):
+        CSSPlugin.__init__(self)
+        self.id = "css"
+        self.logger = logging.getLogger("vvv")
+        self.reporter = Reporter(suicidal=False)
+        self.installation_path = "/tmp"
+        self.extra_options = "--profile=css3"
+        self.output = output
+        self.commands = []
+
+    def capture_command_line(self, cmdline, env={}):
+        self.commands.append(cmdline)
+        return self.output
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Split arguments and combined command output.
+    """
+
+    def test_split_arguments(self):
+        """
+        Chunks do not exceed the maximum length.
+        """
+        args = ["file%d.py" % i for i in range(100)]
+        chunks = list(utils.split_arguments(args, max_length=100))
+        self.assertEqual(sum(chunks, []), args)
+        for chunk in chunks:
+            self.assertTrue(sum(len(arg) + 1 for arg in chunk) <= 100)
+
+    def test_split_output(self):
+        """
+        Output is reported against the right files.
+        """
+        plugin = DummyPlugin()
+        fnames = ["good.py", "bad.py", "bad2.py"]
+
+        def command(chunk):
+            return True, "warning\nbad.py:1: bad file\n  excerpt\nbad2.py:3: bad file"
+
+        results = plugin.run_batch_command(fnames, command, utils.get_prefix_matcher)
+
+        self.assertEqual(results, {"good.py": True, "bad.py": False, "bad2.py": False})
+        self.assertEqual(plugin.reporter.raw_output, ["bad.py validation output:", "bad.py:1: bad file\n  excerpt", "bad2.py validation output:", "bad2.py:3: bad file"])
+        self.assertEqual(plugin.validated, [])
+
+    def test_fallback(self):
+        """
+        Files are validated one by one if the output cannot be split.
+        """
+        plugin = DummyPlugin()
+        fnames = ["good.py", "bad.py"]
+
+        def command(chunk):
+            return True, "Something went wrong"
+
+        results = plugin.run_batch_command(fnames, command, utils.get_prefix_matcher)
+
+        self.assertEqual(results, {"good.py": True, "bad.py": False})
+        self.assertEqual(plugin.validated, fnames)
+
+    def test_pylint_module(self):
+        """
+        Pylint module names are mapped to files.
+        """
+        fnames = [os.path.join("src", "foo", "bar.py"), os.path.join("src", "foo", "__init__.py"), os.path.join("tests", "bar.py")]
+        self.assertEqual(get_module_file("foo.bar", fnames), fnames[0])
+        self.assertEqual(get_module_file("foo", fnames), fnames[1])
+        self.assertEqual(get_module_file("bar", fnames), None)
+
+    def test_css(self):
+        """
+        W3C validator output is split by the result headers.
+        """
+        output = "\n".join([
+            "{output=text, profile=css3}",
+            "W3C CSS Validator results for file:/src/good.css (CSS level 3)",
+            "Congratulations! No Error Found.",
+            "W3C CSS Validator results for file:/src/bad.css (CSS level 3)",
+            "Sorry! We found the following errors (1)",
+            "Line : 1 foo Parse Error",
+            "Valid CSS information",
+            "a { color: red }",
+        ])
+        plugin = DummyCSSPlugin(output)
+
+        results = plugin.validate_batch(["/src/good.css", "/src/bad.css"])
+
+        self.assertEqual(results, {"/src/good.css": True, "/src/bad.css": False})
+        self.assertEqual(len(plugin.commands), 1)
+        self.assertEqual(plugin.reporter.raw_output[1].split("\n")[1:], ["Sorry! We found the following errors (1)", "Line : 1 foo Parse Error"])
+
+    def test_css_fallback(self):
+        """
+        Output which cannot be split is validated file by file and reported for the file.
+        """
+        plugin = DummyCSSPlugin("Sorry! We found the following errors (1)\nLine : 1 foo Parse Error")
+
+        events = plugin.reporter.start_recording()
+        results = plugin.validate_batch(["/src/bad.css"])
+        plugin.reporter.stop_recording(events)
+
+        self.assertEqual(results, {"/src/bad.css": False})
+        self.assertEqual(len(plugin.commands), 2)
+        self.assertEqual([event[1][2] for event in events], ["/src/bad.css"])
@@ -0,0 +1,74 @@
+"""
+
+    Test the benchmark tree generator and runner.
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.generator import TreeParameters, generate_tree
+from benchmarks.run import Benchmark, create_setup_vvv
+
+
+def read_tree(path):
+    """
+    :return: Dict relative path -> file content
+    """
+    data = {}
+    for root, dirs, files in os.walk(path):
+        for fname in files:
+            fpath = os.path.join(root, fname)
+            with open(fpath, "rb") as f:
+                data[os.path.relpath(fpath, path)] = f.read()
+    return data
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Generated trees are the same every time and the benchmarks run against them.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.installation = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        shutil.rmtree(self.installation)
+
+    def test_deterministic(self):
+        """
+        Same parameters give the same tree.
+        """
+        params = TreeParameters(files=30, ignored_files=5, tab_density=0.5, nbsp_density=0.5)
+
+        fpaths = generate_tree(os.path.join(self.path, "a"), params)
+        generate_tree(os.path.join(self.path, "b"), params)
+
+        a = read_tree(os.path.join(self.path, "a"))
+        self.assertEqual(a, read_tree(os.path.join(self.path, "b")))
+        self.assertEqual(len(fpaths), 30)
+        self.assertEqual(len(a), 30 + 5 + 2)
+
+        text = b"".join(a.values()).decode("utf-8")
+        self.assertIn("\t", text)
+        self.assertIn(" ", text)
+
+    def test_run(self):
+        """
+        All steps are measured and ignored files are not walked.
+        """
+        params = TreeParameters(files=20, ignored_files=10)
+        benchmark = Benchmark(self.path, self.installation, params, repeat=1)
+        data = benchmark.run()
+
+        self.assertEqual(data["files"], 20)
+        self.assertEqual(sorted(data["results"]), ["globster", "run", "run-cached", "text-lines", "walker"])
+        self.assertEqual(len(data["results"]["run"]["timings"]), 1)
+
+        vvv = create_setup_vvv(self.path, self.installation, no_cache=True)
+        walked = list(vvv.walker.walk_project_files(self.path, self.path, vvv.matchlist))
+        self.assertEqual(sorted(walked), sorted(benchmark.fpaths + ["validation-files.yaml", "validation-options.yaml"]))
@@ -0,0 +1,106 @@
+"""
+
+    Test validation result cache.
+
+"""
+
+import os
+import time
+import logging
+
+from helpers import ProjectTestCase
+
+from vvv.cache import ResultCache, EVICT_INTERVAL, EVICT_PUTS, EVICT_MARKER
+from vvv.validators.tabs import TabsPlugin
+
+
+class TestCache(ProjectTestCase):
+    """
+    See that cached results are replayed and invalidated.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+        self.write("foo.txt", "foo\n\tbar\n")
+        self.write("bar.txt", "bar\n")
+        self.orignal_process_line = TabsPlugin.process_line
+
+    def tearDown(self):
+        TabsPlugin.process_line = self.orignal_process_line
+        ProjectTestCase.tearDown(self)
+
+    def break_tabs_plugin(self):
+        """
+        Make tabs validator fail, so that we can see if it was run or not.
+        """
+        def process_line(self, fname, line_number, line):
+            raise RuntimeError("Should not be called")
+        TabsPlugin.process_line = process_line
+
+    def test_replay(self):
+        """
+        The second run gives the same output without running validators.
+        """
+        result, output = self.run_vvv()
+        self.assertEqual(result, 2)
+        self.assertTrue("Line contains hard tabs" in output)
+
+        self.break_tabs_plugin()
+
+        self.assertEqual(self.run_vvv(), (result, output))
+
+        # Cache can be bypassed
+        result, output = self.run_vvv(no_cache=True)
+        self.assertTrue("Should not be called" in output)
+
+    def test_content_change(self):
+        """
+        Modified files are validated again.
+        """
+        self.run_vvv()
+        self.write("foo.txt", "foo\n")
+        self.assertEqual(self.run_vvv(), (0, ""))
+
+    def test_options_change(self):
+        """
+        Changing plug-in options invalidates cached results.
+        """
+        self.run_vvv()
+        self.break_tabs_plugin()
+        self.write("validation-options.yaml", self.read("validation-options.yaml") + "\ntabs:\n  hint: Foobar\n")
+        result, output = self.run_vvv()
+        self.assertTrue("Should not be called" in output)
+
+    def test_evict(self):
+        """
+        Least recently used entries are removed when the cache is full.
+        """
+        cache = ResultCache(logging.getLogger("vvv"), os.path.join(self.installation, "cache"), max_size=100)
+
+        for i in range(10):
+            cache.put("%040d" % i, [["report_unstructured", ["tabs", "x" * 20, None]]], False)
+
+        cache.evict()
+
+        kept = [key for key in ("%040d" % i for i in range(10)) if cache.get(key)]
+        self.assertTrue(0 < len(kept) < 10)
+
+    def test_evict_if_due(self):
+        """
+        Entries are walked through only once in a while.
+        """
+        cache = ResultCache(logging.getLogger("vvv"), os.path.join(self.installation, "cache"), max_size=100)
+        cache.put("%040d" % 0, [], True)
+
+        self.assertTrue(cache.evict_if_due())
+        self.assertFalse(cache.evict_if_due())
+
+        # Many new entries
+        cache.puts = EVICT_PUTS
+        self.assertTrue(cache.evict_if_due())
+
+        # A day later
+        marker = os.path.join(cache.path, EVICT_MARKER)
+        os.utime(marker, (time.time() - EVICT_INTERVAL - 1, time.time() - EVICT_INTERVAL - 1))
+        self.assertTrue(cache.evict_if_due())
+        self.assertTrue(cache.get("%040d" % 0))
@@ -0,0 +1,106 @@
+"""
+
+    Test parsed config files and translated match patterns cached on the disk.
+
+"""
+
+import os
+import logging
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from vvv.config import Config, ConfigCache
+
+logger = logging.getLogger("test")
+
+FILES = """
+all: |
+  *
+  !foo/[ab]*.txt
+  !RE:bar/.*\\.py$
+
+tabs: |
+  *.py
+  docs/*/index.rst
+"""
+
+
+class TestConfigCache(unittest.TestCase):
+    """
+    Config data and pattern translations come from the cache until the file changes.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.fpath = os.path.join(self.path, "validation-files.yaml")
+        self.cache = ConfigCache(logger, os.path.join(self.path, "config-cache"))
+        self.write(FILES)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write(self, text):
+        """ Write the config file """
+        with open(self.fpath, "wt") as f:
+            f.write(text)
+
+    def load(self):
+        """ Load the config, build the match lists and save the cache """
+        config = Config(self.fpath)
+        config.load(self.cache)
+        config.get_match_option("all")
+        config.get_match_option("tabs")
+        self.cache.save(config)
+        return config
+
+    def test_cached(self):
+        """
+        The second load uses the cached data.
+        """
+        first = self.load()
+        self.assertIn("foo/[ab]*.txt", first.translations)
+        self.assertIn("docs/*/index.rst", first.translations)
+        self.assertTrue(os.path.exists(self.cache.get_entry_path(self.fpath)))
+
+        with mock.patch.object(Config, "parse", side_effect=AssertionError("Parsed again")):
+            second = self.load()
+
+        self.assertEqual(second.config, first.config)
+        self.assertEqual(second.translations, first.translations)
+
+        matchlist = second.get_match_option("all")
+        self.assertFalse(matchlist.match("foo/a.txt"))
+        self.assertFalse(matchlist.match("bar/baz.py"))
+        self.assertTrue(matchlist.match("foo/c.txt"))
+        self.assertTrue(second.get_match_option("tabs").match("docs/foo/index.rst"))
+
+    def test_changed(self):
+        """
+        Edited config file is parsed again.
+        """
+        self.load()
+
+        self.write(FILES + "\nfoo: |\n  *.foo\n")
+        stat = os.stat(self.fpath)
+        os.utime(self.fpath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+        config = self.load()
+        self.assertEqual(config.config["foo"], "*.foo\n")
+
+    def test_not_json(self):
+        """
+        YAML data which does not survive JSON is not cached.
+        """
+        self.write("foo:\n  1: bar\n")
+        config = self.load()
+        self.assertEqual(config.config, {"foo": {1: "bar"}})
+        self.assertFalse(os.path.exists(self.cache.get_entry_path(self.fpath)))
+
+    def test_match_list_reused(self):
+        """
+        The same patterns give the same matcher object.
+        """
+        config = self.load()
+        self.assertIs(config.get_match_option("all"), config.get_match_option("all"))
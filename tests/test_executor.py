@@ -0,0 +1,120 @@
+"""
+
+    Test running validator commands without a shell.
+
+"""
+
+import os
+import sys
+import logging
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from vvv import utils
+from vvv import sysdeps
+from vvv import profiler
+
+logger = logging.getLogger("test")
+
+
+def python(code):
+    """
+    :return: Arguments running Python code
+    """
+    return [sys.executable, "-c", code]
+
+
+class TestExecutor(unittest.TestCase):
+    """
+    Argument lists, timeouts, bounded output and the process cap.
+    """
+
+    def test_arguments(self):
+        """
+        Arguments are passed as is, no shell quoting or expansion.
+        """
+        exitcode, output = utils.run_command(logger, python("import sys; print(sys.argv[1:])") + ["foo bar", "$HOME", "*"])
+        self.assertEqual(exitcode, 0)
+        self.assertEqual(output.strip(), "['foo bar', '$HOME', '*']")
+
+    def test_output(self):
+        """
+        stdout comes before stderr.
+        """
+        exitcode, output = utils.run_command(logger, python("import sys; sys.stderr.write('err'); sys.stdout.write('out'); sys.exit(3)"))
+        self.assertEqual(exitcode, 3)
+        self.assertEqual(output, "outerr")
+
+    def test_raise_error(self):
+        """
+        Failed command raises if asked.
+        """
+        self.assertRaises(utils.ShellCommandFailed, utils.run_command, logger, python("import sys; sys.exit(1)"), raise_error=True)
+
+    def test_timeout(self):
+        """
+        Command running too long is killed.
+        """
+        started = time.monotonic()
+        self.assertRaises(utils.CommandTimeout, utils.run_command, logger, python("import time; time.sleep(10)"), timeout=0.5)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_bounded(self):
+        """
+        Only the beginning of a huge output is kept.
+        """
+        executor = utils.Executor()
+        exitcode, output = executor.run(logger, python("print('x' * 100000)"), output_limit=1000)
+        self.assertEqual(exitcode, 0)
+        self.assertTrue(output.startswith("x" * 1000 + "\n[99001 bytes of output dropped]"))
+
+    def test_cap(self):
+        """
+        No more commands run at once than allowed.
+        """
+        executor = utils.Executor(max_processes=1)
+        folder = tempfile.mkdtemp()
+        try:
+            # Each command fails if another one is running
+            code = "import os, sys, time; fd = os.open(sys.argv[1], os.O_CREAT | os.O_EXCL); time.sleep(0.2); os.close(fd); os.unlink(sys.argv[1])"
+            results = []
+            args = python(code) + [os.path.join(folder, "lock")]
+            threads = [threading.Thread(target=lambda: results.append(executor.run(logger, args)[0])) for i in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            shutil.rmtree(folder)
+        self.assertEqual(results, [0, 0, 0])
+
+    def test_profiled(self):
+        """
+        Commands are counted as subprocesses.
+        """
+        p = profiler.start()
+        try:
+            utils.run_command(logger, python("pass"))
+        finally:
+            profiler.stop()
+        self.assertEqual(p.get_report()["subprocesses"], 1)
+
+    def test_virtualenv(self):
+        """
+        Commands are started from the virtualenv bin folder with the virtualenv environment.
+        """
+        venv = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(venv, "bin"))
+            tool = os.path.join(venv, "bin", "tool")
+            with open(tool, "wt") as f:
+                f.write("#!%s\nimport os, sys\nprint(sys.argv[0], os.environ['VIRTUAL_ENV'], os.environ['FOO'])\n" % sys.executable)
+            os.chmod(tool, 0o755)
+            exitcode, output = sysdeps.run_virtualenv_command(logger, venv, ["tool"], env=dict(FOO="bar"))
+        finally:
+            shutil.rmtree(venv)
+        self.assertEqual(exitcode, 0)
+        self.assertEqual(output.split(), [tool, venv, "bar"])
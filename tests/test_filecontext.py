@@ -0,0 +1,59 @@
+"""
+
+    Test shared file data.
+
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from vvv.filecontext import FileContext
+
+
+class TestFileContext(unittest.TestCase):
+    """
+    FileContext must see files the same way as reading them with Python file objects.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write(self, data):
+        """
+        :return: FileContext for a file with the given bytes
+        """
+        with open(os.path.join(self.path, "test.txt"), "wb") as f:
+            f.write(data)
+        return FileContext(self.path, "test.txt")
+
+    def test_lines(self):
+        """
+        Lines are split and decoded like io.open() text files.
+        """
+        context = self.write(b"foo\r\nbar\rbaz\n\xa0\xff\x0bend")
+
+        with io.open(context.fullpath, "rt", encoding="utf-8", errors="replace") as f:
+            expected = list(f)
+
+        self.assertEqual(context.get_lines(), expected)
+        self.assertFalse(context.is_binary())
+
+    def test_binary(self):
+        """
+        Null bytes make a file binary.
+        """
+        context = self.write(b"x" * 5000 + b"\0")
+        self.assertTrue(context.is_binary())
+
+    def test_in_memory(self):
+        """
+        Given data is used instead of reading the file.
+        """
+        context = FileContext(self.path, "does-not-exist.txt", data=b"foo\n")
+        self.assertEqual(context.get_lines(), ["foo\n"])
@@ -0,0 +1,175 @@
+"""
+
+    Test validating an explicit list of files in one run, like the git pre-commit hook does.
+
+"""
+
+import io
+import os
+import json
+import shutil
+import tempfile
+
+import plac
+
+from vvv import main
+from vvv.main import expand_targets, group_targets
+
+from helpers import ProjectTestCase, OPTIONS, FILES
+
+
+class TestFileList(ProjectTestCase):
+    """
+    Run VVV against target_files instead of walking the tree.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+
+        self.write("good.txt", "foo\n")
+        self.write("bad.txt", "foo\n\tbar\n")
+        self.write(os.path.join("folder", "bad2.txt"), "\tfoo\n")
+        self.write("unlisted.txt", "\tfoo\n")
+
+    def get_files(self):
+        return [os.path.join(self.path, name) for name in ("good.txt", "bad.txt", os.path.join("folder", "bad2.txt"))]
+
+    def test_only_listed_files(self):
+        """
+        Only the given files are validated.
+        """
+        result, output = self.run_vvv(target_files=self.get_files(), no_cache=True)
+        self.assertEqual(result, 2)
+        self.assertEqual(output.count("Line contains hard tabs"), 2)
+        self.assertNotIn("unlisted.txt", output)
+
+    def test_parallel(self):
+        """
+        The file list can be validated in worker processes.
+        """
+        serial = self.run_vvv(target_files=self.get_files(), no_cache=True)
+        parallel = self.run_vvv(target_files=self.get_files(), no_cache=True, jobs=2)
+        self.assertEqual(serial, parallel)
+
+    def test_blacklisted(self):
+        """
+        Files not whitelisted in validation-files.yaml are skipped.
+        """
+        self.write("validation-files.yaml", "all: |\n  *\n  !folder\n")
+        result, output = self.run_vvv(target_files=self.get_files(), no_cache=True)
+        self.assertEqual(output.count("Line contains hard tabs"), 1)
+
+    def test_all_good(self):
+        """
+        Nothing to report.
+        """
+        result, output = self.run_vvv(target_files=[os.path.join(self.path, "good.txt")])
+        self.assertEqual(result, 0)
+
+
+class TestTargets(ProjectTestCase):
+    """
+    Many targets, file lists and NUL separated stdin on the command line.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+
+        self.write("good.txt", "foo\n")
+        self.write("bad.txt", "\tfoo\n")
+        self.write(os.path.join("folder", "bad2.txt"), "\tfoo\n")
+        self.write(os.path.join("folder", "bad3.txt"), "\tfoo\n")
+
+        # Another project with its own config files
+        self.other = tempfile.mkdtemp()
+        for name, text in (("validation-options.yaml", OPTIONS), ("validation-files.yaml", FILES), ("bad.txt", "\tfoo\n")):
+            with open(os.path.join(self.other, name), "wt") as f:
+                f.write(text)
+
+    def tearDown(self):
+        ProjectTestCase.tearDown(self)
+        shutil.rmtree(self.other)
+
+    def test_expand(self):
+        """
+        @FILE and stdin add paths.
+        """
+        self.write("list.txt", "a.txt\n\nb c.txt\n")
+        stdin = io.BytesIO(b"d.txt\0e\nf.txt\0")
+        targets = expand_targets(["x.txt", "@" + os.path.join(self.path, "list.txt")], True, stdin)
+        self.assertEqual(targets, ["x.txt", "a.txt", "b c.txt", "d.txt", "e\nf.txt"])
+
+    def test_no_targets(self):
+        """
+        Empty stdin validates nothing, no arguments at all the current folder.
+        """
+        self.assertEqual(expand_targets([], True, io.BytesIO(b"")), [])
+        self.assertIsNone(expand_targets([], False))
+
+    def test_group(self):
+        """
+        Targets are grouped by their config files.
+        """
+        a = os.path.join(self.path, "good.txt")
+        b = os.path.join(self.other, "bad.txt")
+        c = os.path.join(self.path, "folder")
+        groups = group_targets([a, b, c])
+        self.assertEqual(groups, [
+            ((os.path.join(self.path, "validation-options.yaml"), os.path.join(self.path, "validation-files.yaml")), [a, c]),
+            ((os.path.join(self.other, "validation-options.yaml"), os.path.join(self.other, "validation-files.yaml")), [b]),
+        ])
+
+    def test_many_targets(self):
+        """
+        Files and folders validated in one run.
+        """
+        targets = [os.path.join(self.path, "good.txt"), os.path.join(self.path, "folder"), os.path.join(self.path, "folder", "bad2.txt")]
+        result, output = self.run_vvv(targets=targets, no_cache=True)
+        self.assertEqual(result, 2)
+        self.assertEqual(output.count("Line contains hard tabs"), 2)
+
+    def test_projects(self):
+        """
+        Command line targets in different projects use their own config files.
+        """
+        argv = ["-q", "-nc", "-i", self.installation, os.path.join(self.path, "good.txt"), os.path.join(self.other, "bad.txt")]
+        vvv = plac.call(main.create, argv)
+        projects = vvv.split_by_project()
+        self.assertEqual(len(projects), 2)
+        self.assertEqual([p.run() for p in projects], [0, 2])
+        self.assertEqual(projects[1].options, os.path.join(self.other, "validation-options.yaml"))
+
+    def test_relative_projects(self):
+        """
+        Targets relative to the current folder in different projects.
+        """
+        cwd = os.getcwd()
+        os.chdir(os.path.dirname(self.other))
+        try:
+            argv = ["-q", "-nc", "-i", self.installation, os.path.relpath(os.path.join(self.path, "bad.txt")), os.path.basename(self.other)]
+            vvv = plac.call(main.create, argv)
+            projects = vvv.split_by_project()
+            self.assertEqual([p.run() for p in projects], [2, 2])
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(projects[0].targets, [os.path.join(self.path, "bad.txt")])
+
+    def test_projects_report(self):
+        """
+        Projects validated in one run give one report and one profile.
+        """
+        report_file = os.path.join(self.installation, "report.sarif")
+        profile_file = os.path.join(self.installation, "profile.json")
+        argv = ["-q", "-nc", "-i", self.installation, "-fmt", "sarif", "-rf", report_file, "-pf", profile_file,
+                os.path.join(self.path, "bad.txt"), os.path.join(self.other, "bad.txt")]
+        vvv = plac.call(main.create, argv)
+        self.assertEqual(vvv.run_projects(), 2)
+
+        with open(report_file, "rt") as f:
+            log = json.load(f)
+        files = [result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] for result in log["runs"][0]["results"]]
+        self.assertEqual(len(files), 2)
+        self.assertIn(os.path.join(self.other, "bad.txt"), files[1])
+
+        with open(profile_file, "rt") as f:
+            self.assertIn("validate", f.read())
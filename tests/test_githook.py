@@ -0,0 +1,154 @@
+"""
+
+    Test git integration: validating the staged content of files and files changed since a revision.
+
+"""
+
+import os
+import logging
+import subprocess
+
+from helpers import ProjectTestCase
+
+from vvv.hooks.git import StagedBlobReader, get_staged_blobs, get_unstaged_files
+
+logger = logging.getLogger("test")
+
+
+class TestStagedBlobs(ProjectTestCase):
+    """
+    Run VVV against git staging area.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+
+        self.git("init", "-q")
+        self.git("config", "user.email", "vvv@example.com")
+        self.git("config", "user.name", "vvv")
+
+        self.write("old.txt", "foo\n")
+        self.write("removed.txt", "foo\n")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "Initial")
+
+        # Bad content is staged, but the working tree copy is good
+        self.write("old.txt", "\tfoo\n")
+        self.git("add", "old.txt")
+        self.write("old.txt", "foo\n")
+
+        # Good content is staged, but the working tree copy is bad
+        self.write("new.txt", "foo\n")
+        self.git("add", "new.txt")
+        self.write("new.txt", "\tfoo\n")
+
+        self.git("rm", "-q", "removed.txt")
+
+    def git(self, *args):
+        subprocess.check_call(("git",) + args, cwd=self.path)
+
+    def create_reader(self):
+        blobs = get_staged_blobs(logger, self.path)
+        return StagedBlobReader(self.path, blobs, get_unstaged_files(logger, self.path))
+
+    def test_staging_list(self):
+        """
+        Removed files are not validated.
+        """
+        reader = self.create_reader()
+        self.assertEqual(sorted(reader.blobs.keys()), [os.path.join(self.path, "new.txt"), os.path.join(self.path, "old.txt")])
+        self.assertEqual(reader.dirty, set(reader.blobs.keys()))
+
+    def test_read_blobs(self):
+        """
+        Blobs are read from one git process.
+        """
+        reader = self.create_reader()
+        try:
+            context = reader.create_context(self.path, "old.txt")
+            self.assertEqual(context.get_data(), b"\tfoo\n")
+            self.assertTrue(context.dirty)
+            process = reader.process
+            self.assertEqual(reader.create_context(self.path, "new.txt").get_data(), b"foo\n")
+            self.assertIs(reader.process, process)
+
+            # Not staged
+            context = reader.create_context(self.path, "validation-files.yaml")
+            self.assertIsNone(context.data)
+        finally:
+            reader.close()
+
+    def test_validate_staged(self):
+        """
+        Errors are reported for the staged content.
+        """
+        reader = self.create_reader()
+        for jobs in (None, 2):
+            result, output = self.run_vvv(target_files=sorted(reader.blobs.keys()), file_reader=reader, jobs=jobs, no_cache=True)
+            self.assertEqual(result, 2)
+            self.assertIn("old.txt", output)
+            self.assertNotIn("new.txt", output)
+        reader.close()
+
+
+class TestChangedSince(ProjectTestCase):
+    """
+    Validate files changed since a git revision.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+
+        self.git("init", "-q")
+        self.git("config", "user.email", "vvv@example.com")
+        self.git("config", "user.name", "vvv")
+
+        self.write("unchanged.txt", "\tfoo\n")
+        self.write("changed.txt", "foo\n")
+        self.write("renamed.txt", "\tfoo\n")
+        self.write("removed.txt", "foo\n")
+        self.write(os.path.join("folder", "changed2.txt"), "foo\n")
+        self.git("add", ".")
+        self.git("commit", "-q", "-m", "Initial")
+
+        self.write("changed.txt", "\tfoo\n")
+        self.write(os.path.join("folder", "changed2.txt"), "\tfoo\n")
+        self.git("mv", "renamed.txt", "renamed2.txt")
+        self.git("rm", "-q", "removed.txt")
+        self.git("commit", "-q", "-a", "-m", "Changes")
+
+    def git(self, *args):
+        subprocess.check_call(("git",) + args, cwd=self.path)
+
+    def test_changed_since(self):
+        """
+        Only changed files are validated.
+        """
+        result, output = self.run_vvv(changed_since="HEAD~1", no_cache=True)
+        self.assertEqual(result, 2)
+        self.assertIn("changed.txt", output)
+        self.assertIn("changed2.txt", output)
+        self.assertIn("renamed2.txt", output)
+        self.assertNotIn("unchanged.txt", output)
+
+    def test_subfolder(self):
+        """
+        Only changed files in the target folder are validated.
+        """
+        result, output = self.run_vvv(changed_since="HEAD~1", no_cache=True, target=os.path.join(self.path, "folder"))
+        self.assertEqual(output.count("Line contains hard tabs"), 1)
+        self.assertIn("changed2.txt", output)
+
+    def test_nothing_changed(self):
+        """
+        Nothing to validate.
+        """
+        result, output = self.run_vvv(changed_since="HEAD", no_cache=True)
+        self.assertEqual(result, 0)
+
+    def test_bad_ref(self):
+        """
+        Unknown revision is a command line error.
+        """
+        vvv = self.create_vvv(changed_since="no-such-branch")
+        self.assertEqual(vvv.run(), 64)
@@ -0,0 +1,104 @@
+"""
+
+    Test file match lists.
+
+"""
+
+import unittest
+
+from vvv.bzrlib.globster import Globster, ExceptionGlobster
+
+
+class TestGlobster(unittest.TestCase):
+    """
+    Patterns looked up without regexes match the same paths as with them.
+    """
+
+    def test_exact(self):
+        """
+        Exact basenames and paths.
+        """
+        g = Globster(["setup.py", "docs/build", "./src/foo"], False)
+        self.assertEqual(g.match("setup.py"), "setup.py")
+        self.assertEqual(g.match("a/b/setup.py"), "setup.py")
+        self.assertEqual(g.match("docs/build"), "docs/build")
+        self.assertEqual(g.match("src/foo"), "./src/foo")
+        self.assertIsNone(g.match("a/docs/build"))
+        self.assertIsNone(g.match("xsetup.py"))
+
+    def test_suffix(self):
+        """
+        Extensions and other suffixes.
+        """
+        g = Globster(["*.py", "*.tar.gz", "*~", "*.egg-info"], False)
+        self.assertEqual(g.match("a/b.py"), "*.py")
+        self.assertEqual(g.match(".py"), "*.py")
+        self.assertEqual(g.match("a/b.tar.gz"), "*.tar.gz")
+        self.assertEqual(g.match("a/b.c~"), "*~")
+        self.assertEqual(g.match("vvv.egg-info"), "*.egg-info")
+        self.assertIsNone(g.match("a.py/b"))
+        self.assertIsNone(g.match("a/b.gz"))
+        self.assertIsNone(g.match("a/bpy"))
+
+    def test_wildcards(self):
+        """
+        Real wildcards and regexes still work together with the lookups.
+        """
+        g = Globster(["*.p?", "b?r", "RE:.*\\.css$", "src/**/*.c", "foo"], False)
+        self.assertEqual(g.match("a/x.pl"), "*.p?")
+        self.assertEqual(g.match("a/bar"), "b?r")
+        self.assertEqual(g.match("a/b.css"), "RE:.*\\.css$")
+        self.assertEqual(g.match("src/a/b/c.c"), "src/**/*.c")
+        self.assertIsNone(g.match("a/x.c"))
+
+    def test_match_all(self):
+        """
+        Star matches everything.
+        """
+        g = Globster(["*"], False)
+        self.assertEqual(g.match("a/b/c"), "*")
+
+    def test_extensions(self):
+        """
+        Which file extensions patterns can match.
+        """
+        self.assertEqual(Globster(["*.py", "*.tar.gz", "Makefile", "docs/conf.py"], False).get_extensions(), set(["py", "gz", None]))
+        self.assertIsNone(Globster(["*.py", "*~"], False).get_extensions())
+        self.assertIsNone(Globster(["*.p?"], False).get_extensions())
+        self.assertTrue(Globster(["*.py", "*.js"], False).is_extension_only())
+        self.assertFalse(Globster(["*.min.js"], False).is_extension_only())
+        self.assertEqual(ExceptionGlobster(["*.py", "!foo.txt", "!!*.js"], False).get_extensions(), set(["py", "js"]))
+
+
+class TestExceptionGlobster(unittest.TestCase):
+    """
+    ! and !! precedence.
+    """
+
+    def test_precedence(self):
+        """
+        ! excludes and !! overrides the exclusion.
+        """
+        g = ExceptionGlobster(["*", "!*.pyc", "!build", "!!build/keep.pyc"], False)
+        self.assertEqual(g.match("a.py"), "*")
+        self.assertIsNone(g.match("a.pyc"))
+        self.assertIsNone(g.match("x/build"))
+        self.assertEqual(g.match("build/keep.pyc"), "!!build/keep.pyc")
+
+    def test_empty(self):
+        """
+        Nothing matches without patterns.
+        """
+        self.assertIsNone(ExceptionGlobster([], False).match("a.py"))
+        self.assertIsNone(ExceptionGlobster(["!*.py"], False).match("a.txt"))
+
+    def test_many(self):
+        """
+        Thousands of patterns.
+        """
+        patterns = ["*"] + ["!name%d" % i for i in range(5000)] + ["!*.ext%d" % i for i in range(5000)]
+        g = ExceptionGlobster(patterns, False)
+        self.assertIsNone(g.match("a/name4999"))
+        self.assertIsNone(g.match("a/b.ext123"))
+        self.assertEqual(g.match("a/b.ext"), "*")
+        self.assertEqual(g.match("a/name5000"), "*")
@@ -0,0 +1,79 @@
+"""
+
+    Test running pyflakes and pep8 inside VVV process.
+
+"""
+
+from vvv import utils
+from vvv.filecontext import FileContext
+
+from helpers import ProjectTestCase, OPTIONS
+
+#: Run pyflakes and pep8 from VVV Python environment
+INPROCESS_OPTIONS = OPTIONS.replace("""pep8:
+  enabled: false
+pyflakes:
+  enabled: false
+""", """pep8:
+  host-python-env: true
+  command-line: --ignore=E302
+pyflakes:
+  host-python-env: true
+""")
+
+BAD_PYTHON = """import os
+def foo():
+    return  1
+"""
+
+
+class StagedReader(object):
+    """
+    Give bad content for all files.
+    """
+
+    def create_context(self, project_path, relative):
+        return FileContext(project_path, relative, data=BAD_PYTHON.encode("utf-8"), dirty=True)
+
+
+class TestInProcess(ProjectTestCase):
+    """
+    pyflakes and pep8 messages are reported with line and column numbers.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+        self.write("validation-options.yaml", INPROCESS_OPTIONS)
+        self.write("bad.py", BAD_PYTHON)
+        self.write("good.py", "import os\n\nprint(os)\n")
+
+        # No validator processes are started
+        self.orig_run = utils.executor.run
+        utils.executor.run = self.run_command
+
+    def tearDown(self):
+        utils.executor.run = self.orig_run
+        ProjectTestCase.tearDown(self)
+
+    def run_command(self, logger, args, **kwargs):
+        raise AssertionError("Started a process: %s" % args)
+
+    def test_report(self):
+        """
+        Errors are reported for the right files.
+        """
+        result, output = self.run_vvv(no_cache=True)
+        self.assertEqual(result, 2)
+        self.assertIn("bad.py 1:1: [UnusedImport] 'os' imported but unused", output)
+        self.assertIn("bad.py 3:11: [E271] multiple spaces after keyword", output)
+        self.assertNotIn("E302", output)
+        self.assertNotIn("good.py", output)
+
+    def test_context(self):
+        """
+        The content given by VVV is checked, not the file on the disk.
+        """
+        vvv = self.create_vvv(no_cache=True, target_files=[self.path + "/good.py"], file_reader=StagedReader())
+        result = vvv.run()
+        self.assertEqual(result, 2)
+        self.assertIn("good.py 1:1: [UnusedImport]", vvv.output)
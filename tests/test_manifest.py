@@ -0,0 +1,120 @@
+"""
+
+    Test installation state resolved once per run and recorded in the toolchain manifest.
+
+"""
+
+import os
+import logging
+import shutil
+import tempfile
+import unittest
+
+from vvv.config import Config
+from vvv.manifest import ToolchainManifest
+from vvv.plugin import Plugin
+
+logger = logging.getLogger("test")
+
+
+class ToolPlugin(Plugin):
+    """
+    Plug-in whose tool is a file in the installation folder.
+    """
+
+    def __init__(self, tool):
+        Plugin.__init__(self)
+        self.tool = tool
+        self.checks = 0
+        self.installs = 0
+
+    def check_is_installed(self):
+        self.checks += 1
+        return os.path.exists(self.tool)
+
+    def install(self):
+        self.installs += 1
+        with open(self.tool, "wt") as f:
+            f.write("1.0")
+
+    def get_tool_path(self):
+        return self.tool
+
+    def get_tool_version(self):
+        with open(self.tool, "rt") as f:
+            return f.read()
+
+
+class TestManifest(unittest.TestCase):
+    """
+    Later runs trust the manifest instead of probing.
+    """
+
+    def setUp(self):
+        self.installation = tempfile.mkdtemp()
+        self.tool = os.path.join(self.installation, "tool")
+
+    def tearDown(self):
+        shutil.rmtree(self.installation)
+
+    def create_plugin(self):
+        """
+        :return: Plug-in as set up in a new run
+        """
+        plugin = ToolPlugin(self.tool)
+        plugin.id = "tool"
+        plugin.logger = logger
+        plugin.options = Config()
+        plugin.installation_path = os.path.join(self.installation, "tool-installation")
+        plugin.manifest = ToolchainManifest(logger, self.installation)
+        return plugin
+
+    def test_once_per_run(self):
+        """
+        The installation is checked once however many files are validated.
+        """
+        plugin = self.create_plugin()
+        for i in range(3):
+            plugin.install_on_demand()
+        self.assertEqual(plugin.checks, 1)
+        self.assertEqual(plugin.installs, 1)
+        self.assertEqual(plugin.toolchain["version"], "1.0")
+
+    def test_next_run(self):
+        """
+        The next run does not probe the installation.
+        """
+        self.create_plugin().install_on_demand()
+
+        plugin = self.create_plugin()
+        plugin.install_on_demand()
+        self.assertEqual(plugin.checks, 0)
+        self.assertEqual(plugin.installs, 0)
+        self.assertEqual(plugin.toolchain["version"], "1.0")
+
+    def test_upgraded(self):
+        """
+        Upgraded tool is noticed and changes the cache keys.
+        """
+        plugin = self.create_plugin()
+        plugin.install_on_demand()
+        old_hash = plugin.get_options_hash()
+
+        with open(self.tool, "wt") as f:
+            f.write("2.00")
+
+        plugin = self.create_plugin()
+        self.assertNotEqual(plugin.get_options_hash(), old_hash)
+        self.assertEqual(plugin.checks, 1)
+        self.assertEqual(plugin.toolchain["version"], "2.00")
+
+    def test_options_changed(self):
+        """
+        Entries are per plug-in options.
+        """
+        self.create_plugin().install_on_demand()
+
+        plugin = self.create_plugin()
+        plugin.options.config = dict(tool={"host-python-env": True})
+        plugin.install_on_demand()
+        self.assertEqual(plugin.checks, 1)
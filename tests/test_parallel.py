@@ -0,0 +1,44 @@
+"""
+
+    Test that running validators in worker processes gives the same output as a serial run.
+
+"""
+
+import os
+
+from helpers import ProjectTestCase
+
+
+class TestParallel(ProjectTestCase):
+    """
+    Compare --jobs runs against serial runs.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+
+        for i in range(20):
+            self.write(os.path.join("folder%d" % (i % 3), "file%d.txt" % i), "foo\n\tbar\n" if i % 2 else "foo\n")
+
+    def test_same_as_serial(self):
+        """
+        Parallel output is deterministic and contains the same reports as a serial run.
+        """
+        serial_result, serial_output = self.run_vvv(no_cache=True)
+        result, output = self.run_vvv(jobs=4, no_cache=True)
+
+        self.assertEqual(serial_result, 2)
+        self.assertEqual(result, 2)
+        self.assertEqual(sorted(serial_output.split("\n")), sorted(output.split("\n")))
+        self.assertEqual(output.count("Line contains hard tabs"), 10)
+
+        # Reports are in the path order
+        self.assertEqual(output, self.run_vvv(jobs=2, no_cache=True)[1])
+
+    def test_suicidal(self):
+        """
+        Only the first error is reported when dying on the first error.
+        """
+        result, output = self.run_vvv(jobs=4, suicidal=True)
+        self.assertEqual(result, 2)
+        self.assertEqual(output.count("Line contains hard tabs"), 1)
@@ -0,0 +1,74 @@
+"""
+
+    Test picking the plug-ins for a file.
+
+"""
+
+import unittest
+
+from vvv.pluginindex import PluginIndex
+from vvv.bzrlib.globster import ExceptionGlobster
+
+
+class Walker(object):
+    """ Walker without debugging """
+    debug = False
+
+
+class DummyPlugin(object):
+    """
+    Plug-in counting match list calls.
+    """
+
+    def __init__(self, plugin_id, patterns, enabled=True):
+        self.id = plugin_id
+        self.matchlist = ExceptionGlobster(patterns, False)
+        self.enabled = enabled
+        self.walker = Walker()
+        self.calls = 0
+
+    def is_active(self):
+        return self.enabled
+
+    def match(self, fpath):
+        self.calls += 1
+        return self.matchlist.match(fpath)
+
+
+class TestPluginIndex(unittest.TestCase):
+    """
+    Plug-ins which cannot match are not consulted.
+    """
+
+    def setUp(self):
+        self.python = DummyPlugin("python", ["*.py"])
+        self.js = DummyPlugin("js", ["*.js", "!*.min.js"])
+        self.tabs = DummyPlugin("tabs", ["*", "!Makefile"])
+        self.disabled = DummyPlugin("disabled", ["*"], enabled=False)
+        self.index = PluginIndex([self.python, self.js, self.tabs, self.disabled])
+
+    def get_ids(self, fpath):
+        return [p.id for p in self.index.get_plugins(fpath)]
+
+    def test_plugins(self):
+        """
+        The right plug-ins in the right order.
+        """
+        self.assertEqual(self.get_ids("a/b.py"), ["python", "tabs"])
+        self.assertEqual(self.get_ids("a/b.js"), ["js", "tabs"])
+        self.assertEqual(self.get_ids("a/b.min.js"), ["tabs"])
+        self.assertEqual(self.get_ids("a/Makefile"), [])
+        self.assertEqual(self.get_ids("a/b.png"), ["tabs"])
+
+    def test_memoized(self):
+        """
+        Extension only match lists are consulted once per extension.
+        """
+        for i in range(10):
+            self.get_ids("a%d/b.py" % i)
+            self.get_ids("a%d/b.css" % i)
+
+        self.assertEqual(self.python.calls, 1)
+        self.assertEqual(self.js.calls, 0)
+        self.assertEqual(self.tabs.calls, 20)
+        self.assertEqual(self.disabled.calls, 0)
@@ -0,0 +1,70 @@
+"""
+
+    Test collecting timing information with --profile.
+
+"""
+
+import os
+import json
+import logging
+
+from vvv import profiler
+from vvv import utils
+
+from helpers import ProjectTestCase
+
+
+class TestProfiler(ProjectTestCase):
+    """
+    Timings are collected in serial and parallel runs.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+        for i in range(4):
+            self.write("file%d.txt" % i, "foo\n")
+
+    def tearDown(self):
+        profiler.stop()
+        ProjectTestCase.tearDown(self)
+
+    def run_profiled(self, **kwargs):
+        profile_file = os.path.join(self.installation, "profile.json")
+        result, output = self.run_vvv(profile_file=profile_file, no_cache=True, **kwargs)
+        self.assertEqual(result, 0)
+        self.assertIsNone(profiler.active)
+        with open(profile_file, "rt") as f:
+            return json.load(f)
+
+    def test_serial(self):
+        """
+        Walker, config loading and validators are timed.
+        """
+        report = self.run_profiled()
+        for plugin_id in ("tabs", "linelength", "evil-spacebar"):
+            self.assertEqual(report["timings"]["validate"][plugin_id][0], 6)
+        self.assertIn("walk_project_files", report["timings"]["walker"])
+        self.assertIn("validation-options.yaml", report["timings"]["config"])
+        # Config files are validated too
+        self.assertEqual(len(report["slowest"]), 6)
+        self.assertEqual(report["subprocesses"], 0)
+
+    def test_parallel(self):
+        """
+        Worker timings are merged.
+        """
+        report = self.run_profiled(jobs=2)
+        for plugin_id in ("tabs", "linelength", "evil-spacebar"):
+            self.assertEqual(report["timings"]["validate"][plugin_id][0], 6)
+        # Config files are validated too
+        self.assertEqual(len(report["slowest"]), 6)
+
+    def test_subprocess(self):
+        """
+        Subprocesses are counted.
+        """
+        p = profiler.start()
+        utils.shell(logging.getLogger("test"), "true ; echo foo")
+        self.assertEqual(p.get_report()["subprocesses"], 1)
+        self.assertIn("echo", p.timings["subprocess"])
+        self.assertIn("echo", p.format_report())
@@ -0,0 +1,179 @@
+"""
+
+    Test keeping several validator commands running at once with the asyncio scheduler.
+
+"""
+
+import os
+import sys
+import time
+import logging
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from vvv import utils
+from vvv.plugin import Plugin
+from vvv.reporter import Reporter, FirstError
+from vvv.scheduler import AsyncScheduler
+
+from helpers import ProjectTestCase
+
+logger = logging.getLogger("test")
+
+
+class SleepPlugin(Plugin):
+    """
+    Validator running a command which sleeps as many seconds as the file says
+    and fails files having "bad" in their name.
+    """
+
+    def __init__(self, project_path, reporter):
+        Plugin.__init__(self)
+        self.id = "sleep"
+        self.logger = logger
+        self.reporter = reporter
+        self.project_path = project_path
+        self.installed = True
+        self.enabled = True
+
+    def validate(self, fullpath):
+        code = "import sys, time; time.sleep(float(open(sys.argv[1]).read())); print(sys.argv[1])"
+        exitcode, output = self.run_command([sys.executable, "-c", code, fullpath])
+        if "bad" in fullpath:
+            self.reporter.report_unstructured(self.id, output, fname=fullpath)
+            return False
+        return True
+
+
+class TestScheduler(unittest.TestCase):
+    """
+    Commands run concurrently, reports come in the submission order.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def write(self, name, seconds):
+        """ Create a file telling how long its validation takes """
+        with open(os.path.join(self.path, name), "wt") as f:
+            f.write(str(seconds))
+
+    def validate(self, files, processes, suicidal=False):
+        """
+        Validate files with the scheduler.
+
+        :param files: List of (file name, seconds) tuples
+
+        :return: Tuple (reporter, seconds it took)
+        """
+        for name, seconds in files:
+            self.write(name, seconds)
+
+        reporter = Reporter(suicidal)
+        plugin = SleepPlugin(self.path, reporter)
+        scheduler = AsyncScheduler(logger, reporter, processes)
+
+        started = time.monotonic()
+        scheduler.start([plugin])
+        try:
+            for name, seconds in files:
+                plugin.run(name, matched=True)
+            scheduler.finish()
+        finally:
+            scheduler.stop()
+
+        self.assertIs(plugin.reporter, reporter)
+        self.assertIsNone(utils.executor.loop)
+
+        return reporter, time.monotonic() - started
+
+    def test_concurrent(self):
+        """
+        Commands are in flight at the same time.
+        """
+        files = [("file%d.txt" % i, 0.5) for i in range(4)]
+        reporter, elapsed = self.validate(files, 4)
+        self.assertLess(elapsed, 1.5)
+        self.assertFalse(reporter.has_errors())
+
+    def test_order(self):
+        """
+        Reports are in the submission order, not in the finishing order.
+        """
+        files = [("bad1.txt", 0.6), ("bad2.txt", 0), ("good.txt", 0), ("bad3.txt", 0.3)]
+        reporter, elapsed = self.validate(files, 4)
+        output = reporter.get_output_as_text()
+        self.assertEqual(reporter.error_count, 3)
+        positions = [output.index(os.path.join(self.path, name) + " validation output") for name in ("bad1.txt", "bad2.txt", "bad3.txt")]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_main_thread_order(self):
+        """
+        Reports made in the main thread, e.g. by inline checks, come after the pending jobs.
+        """
+        self.write("bad.txt", 0.5)
+        reporter = Reporter(False)
+        plugin = SleepPlugin(self.path, reporter)
+        scheduler = AsyncScheduler(logger, reporter, 4)
+
+        scheduler.start([plugin])
+        try:
+            plugin.run("bad.txt", matched=True)
+            plugin.reporter.report_unstructured("inline", "Inline check output")
+            scheduler.finish()
+        finally:
+            scheduler.stop()
+
+        output = reporter.get_output_as_text()
+        self.assertEqual(reporter.error_count, 2)
+        self.assertLess(output.index("bad.txt validation output"), output.index("Inline check output"))
+
+    def test_suicidal(self):
+        """
+        The first error cancels the queued jobs and kills the running commands.
+        """
+        files = [("slow%d.txt" % i, 10) for i in range(3)] + [("bad.txt", 0)] + [("queued%d.txt" % i, 10) for i in range(3)]
+        started = time.monotonic()
+        self.assertRaises(FirstError, self.validate, files, 4, True)
+        self.assertLess(time.monotonic() - started, 5)
+
+
+class TestSchedulerProject(ProjectTestCase):
+    """
+    Compare --processes runs against serial runs.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+
+        for i in range(10):
+            self.write("file%d.txt" % i, "foo\n\tbar\n" if i % 2 else "foo\n")
+
+    def test_same_as_serial(self):
+        """
+        Text line checks run inline and give the same output.
+        """
+        serial_result, serial_output = self.run_vvv(no_cache=True)
+        result, output = self.run_vvv(processes=4, no_cache=True)
+        self.assertEqual(result, serial_result)
+        self.assertEqual(output, serial_output)
+        self.assertEqual(output.count("Line contains hard tabs"), 5)
+
+    def test_suicidal_file_list(self):
+        """
+        The queued jobs are not replayed after the first error in a file list.
+        """
+        files = [os.path.join(self.path, "file%d.txt" % i) for i in range(10)]
+        vvv = self.create_vvv(processes=4, suicidal=True, target_files=files, no_cache=True)
+        vvv.setup()
+
+        with mock.patch.object(AsyncScheduler, "finish") as finish:
+            vvv.validate_files()
+
+        finish.assert_not_called()
+        self.assertEqual(vvv.reporter.error_count, 1)
@@ -0,0 +1,80 @@
+"""
+
+    Test start up: cached plug-in discovery and modules imported only when needed.
+
+"""
+
+import os
+import json
+import logging
+import shutil
+import tempfile
+import unittest
+
+from vvv import entrypoints
+
+from benchmarks.importtime import measure
+
+logger = logging.getLogger("test")
+
+
+class TestEntryPoints(unittest.TestCase):
+    """
+    Installed plug-ins are cached in the installation folder.
+    """
+
+    def setUp(self):
+        self.installation = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.installation, entrypoints.CACHE_FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.installation)
+
+    def test_cache(self):
+        """
+        The cache is written and used.
+        """
+        found = entrypoints.find_entry_points(logger, self.installation)
+        self.assertIn(("tabs", "vvv.validators.tabs:TabsPlugin"), found)
+
+        with open(self.cache_file, "rt") as f:
+            data = json.load(f)
+
+        data["entry_points"] = [["foo", "vvv.validators.tabs:TabsPlugin"]]
+        with open(self.cache_file, "wt") as f:
+            json.dump(data, f)
+
+        self.assertEqual(entrypoints.find_entry_points(logger, self.installation), [("foo", "vvv.validators.tabs:TabsPlugin")])
+
+    def test_invalidated(self):
+        """
+        Changed environment is scanned again.
+        """
+        with open(self.cache_file, "wt") as f:
+            json.dump(dict(key=["old"], entry_points=[["foo", "bar:Baz"]]), f)
+
+        found = entrypoints.find_entry_points(logger, self.installation)
+        self.assertIn("tabs", dict(found))
+        self.assertNotIn("foo", dict(found))
+
+    def test_load(self):
+        """
+        Entry point values are imported.
+        """
+        from vvv.validators.tabs import TabsPlugin
+        self.assertIs(entrypoints.load_entry_point("vvv.validators.tabs:TabsPlugin"), TabsPlugin)
+
+
+class TestStartup(unittest.TestCase):
+    """
+    Slow imports are not done when nothing is downloaded.
+    """
+
+    def test_lazy_imports(self):
+        """
+        Neither the first run scanning the plug-ins nor later runs import requests, tarfile or pkg_resources.
+        """
+        data = measure(1)
+        for name in ("first", "best"):
+            self.assertEqual(data[name]["exit_code"], 0)
+            self.assertEqual(data[name]["lazy_modules_imported"], [])
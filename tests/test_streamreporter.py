@@ -0,0 +1,124 @@
+"""
+
+    Test JSON Lines and SARIF output.
+
+"""
+
+import io
+import os
+import json
+import logging
+import unittest
+
+from vvv.streamreporter import JSONLinesReporter, SARIFReporter
+
+from helpers import ProjectTestCase
+
+
+class TestStreamReporter(unittest.TestCase):
+    """
+    Reports are written when they come in.
+    """
+
+    def test_jsonl(self):
+        """
+        Each report is one JSON line.
+        """
+        stream = io.StringIO()
+        reporter = JSONLinesReporter(suicidal=False, stream=stream)
+
+        reporter.report_detailed("pep8", logging.ERROR, "foo.py", 3, 11, "E271", "multiple spaces after keyword", excerpt="    return  1")
+        self.assertEqual(len(stream.getvalue().splitlines()), 1)
+
+        reporter.report_unstructured("pylint", "Bad code", fname="foo.py")
+        reporter.hint_user("Fix it")
+        reporter.hint_user("Fix it")
+        reporter.close()
+
+        events = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([event["type"] for event in events], ["detailed", "unstructured", "hint"])
+        self.assertEqual(events[0]["column"], 11)
+        self.assertEqual(events[0]["severity"], "error")
+        self.assertEqual(events[1]["file"], "foo.py")
+
+        self.assertEqual(reporter.error_count, 2)
+        self.assertEqual(reporter.raw_output, [])
+        self.assertEqual(reporter.get_output_as_text(), "")
+
+    def test_sarif(self):
+        """
+        SARIF log is a valid JSON document.
+        """
+        stream = io.StringIO()
+        reporter = SARIFReporter(suicidal=False, stream=stream)
+
+        reporter.report_detailed("pep8", logging.WARNING, "/src/foo.py", 3, 11, "E271", "multiple spaces after keyword")
+        reporter.report_unstructured("pylint", "Bad code")
+        reporter.hint_user("Fix it")
+        reporter.close()
+
+        log = json.loads(stream.getvalue())
+        run = log["runs"][0]
+        self.assertEqual(log["version"], "2.1.0")
+        self.assertEqual(run["properties"]["hints"], ["Fix it"])
+        self.assertEqual(len(run["results"]), 2)
+
+        result = run["results"][0]
+        self.assertEqual(result["ruleId"], "E271")
+        self.assertEqual(result["level"], "warning")
+        self.assertEqual(result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"], "file:///src/foo.py")
+        self.assertEqual(result["locations"][0]["physicalLocation"]["region"], {"startLine": 3, "startColumn": 11})
+
+    def test_empty_sarif(self):
+        """
+        SARIF log without results.
+        """
+        stream = io.StringIO()
+        reporter = SARIFReporter(suicidal=False, stream=stream)
+        reporter.close()
+        self.assertEqual(json.loads(stream.getvalue())["runs"][0]["results"], [])
+
+
+class TestFormat(ProjectTestCase):
+    """
+    Run VVV with --format and --report-file options.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+        self.write("good.txt", "foo\n")
+        self.write("bad.txt", "\tfoo\n")
+
+    def test_jsonl(self):
+        """
+        Reports are written to the report file.
+        """
+        report_file = os.path.join(self.installation, "report.jsonl")
+
+        for jobs in (None, 2):
+            result, output = self.run_vvv(format="jsonl", report_file=report_file, jobs=jobs, no_cache=True)
+            self.assertEqual(result, 2)
+            self.assertEqual(output, "")
+
+            with open(report_file, "rt") as f:
+                events = [json.loads(line) for line in f]
+            self.assertEqual([event["type"] for event in events], ["detailed", "hint"])
+            self.assertEqual(events[0]["file"], os.path.join(self.path, "bad.txt"))
+
+    def test_text_file(self):
+        """
+        Text output can be written to a file.
+        """
+        report_file = os.path.join(self.installation, "report.txt")
+        result, output = self.run_vvv(report_file=report_file, no_cache=True)
+        self.assertEqual(result, 2)
+        with open(report_file, "rt") as f:
+            self.assertEqual(f.read(), output + "\n")
+
+    def test_all_good(self):
+        """
+        Exit code tells there were no errors.
+        """
+        os.unlink(os.path.join(self.path, "bad.txt"))
+        result, output = self.run_vvv(format="sarif", report_file=os.path.join(self.installation, "report.sarif"))
+        self.assertEqual(result, 0)
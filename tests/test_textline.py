@@ -0,0 +1,67 @@
+"""
+
+    Test running text line validators in one pass.
+
+"""
+
+from helpers import ProjectTestCase
+
+from vvv.reporter import Reporter
+from vvv.textlineplugin import TextLinePlugin
+from vvv.validators.pdb import PdbPlugin
+
+TEXT = """import pdb ; pdb.set_trace()
+\tindented
+%s
+evil\xa0space
+""" % ("x" * 100)
+
+
+class TestTextLine(ProjectTestCase):
+    """
+    Compare one pass validation against running each plug-in alone.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+        self.write("foo.py", TEXT)
+        self.vvv = self.create_vvv(no_cache=True)
+        self.vvv.setup()
+
+    def get_line_plugins(self):
+        """
+        :return: Text line plug-ins in the order of the main loop
+        """
+        return [p for p in self.vvv.plugins.values() if isinstance(p, TextLinePlugin)]
+
+    def test_same_as_separate(self):
+        """
+        All plug-ins report the same errors and hints.
+        """
+        self.vvv.process("foo.py")
+        fused = self.vvv.reporter
+
+        separate = Reporter(suicidal=False)
+        for p in self.get_line_plugins():
+            p.reporter = separate
+            p.run("foo.py")
+
+        self.assertEqual(sorted(fused.raw_output), sorted(separate.raw_output))
+        self.assertEqual(sorted(fused.hints), sorted(separate.hints))
+        self.assertEqual(len(fused.hints), 4)
+
+    def test_crash(self):
+        """
+        One failing plug-in does not prevent others to run.
+        """
+
+        def process_line(self, fname, line_number, line):
+            raise RuntimeError("Boom")
+
+        self.vvv.plugins["pdb"].process_line = process_line.__get__(self.vvv.plugins["pdb"], PdbPlugin)
+
+        self.vvv.process("foo.py")
+        output = self.vvv.reporter.get_output_as_text()
+
+        self.assertEqual(output.count("Internal error occured when running validator pdb"), 1)
+        self.assertTrue("Line contains hard tabs" in output)
@@ -0,0 +1,59 @@
+"""
+
+    Test project tree walker.
+
+"""
+
+import os
+import logging
+
+from helpers import ProjectTestCase
+
+from vvv.config import Config
+from vvv.walker import Walker
+
+
+class TestWalker(ProjectTestCase):
+    """
+    Walk generated project folders.
+    """
+
+    def setUp(self):
+        ProjectTestCase.setUp(self)
+        self.write(os.path.join("src", "foo.py"), "")
+        self.write(os.path.join("src", "sub", "bar.py"), "")
+        self.write(os.path.join("build", "lib", "foo.py"), "")
+        self.walker = Walker(logging.getLogger("vvv"), False)
+
+    def get_matchlist(self, patterns):
+        """
+        :return: ExceptionGlobster for the patterns
+        """
+        config = Config(None)
+        config.config = dict(all=patterns)
+        return config.get_match_option("all")
+
+    def test_walk(self):
+        """
+        Ignored folders are not entered and paths are project root relative.
+        """
+        matchlist = self.get_matchlist("*\n!build\n!*.yaml")
+        files = self.walker.walk_project_files(self.path, self.path, matchlist)
+        self.assertEqual(sorted(files), [os.path.join("src", "foo.py"), os.path.join("src", "sub", "bar.py")])
+
+    def test_walk_subfolder(self):
+        """
+        Walking a subfolder gives paths relative to the project root.
+        """
+        matchlist = self.get_matchlist("*")
+        files = self.walker.walk_project_files(os.path.join(self.path, "src", "sub"), self.path, matchlist)
+        self.assertEqual(list(files), [os.path.join("src", "sub", "bar.py")])
+
+    def test_streaming(self):
+        """
+        Files are given out before the walk is complete.
+        """
+        matchlist = self.get_matchlist("*")
+        files = self.walker.walk_project_files(self.path, self.path, matchlist)
+        self.assertTrue(next(files))
+        files.close()
@@ -0,0 +1,441 @@
+"""
+
+    Test long running validator processes.
+
+"""
+
+import os
+import sys
+import time
+import logging
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from vvv import sysdeps
+from vvv.cache import ResultCache
+from vvv.config import Config
+from vvv.filecontext import FileContext
+from vvv.reporter import Reporter
+from vvv.worker import WorkerProcess, WorkerPool, WorkerFailed, WorkerStartFailed
+from vvv.validators.pylint import PylintPlugin
+from vvv.validators.jshint import JSHintPlugin
+from vvv.validators.rst import RestructuredTextPlugin
+
+logger = logging.getLogger("test")
+
+#: Worker answering with its process id, the request and how many requests it has served
+ECHO_WORKER = """
+import sys, os, json, time
+sys.stdout.write(json.dumps(dict(ready=True)) + "\\n")
+sys.stdout.flush()
+count = 0
+for line in iter(sys.stdin.readline, ""):
+    request = json.loads(line)
+    count += 1
+    if request.get("exit"):
+        sys.stderr.write("bye")
+        sys.exit(1)
+    time.sleep(request.get("sleep", 0))
+    sys.stdout.write(json.dumps(dict(pid=os.getpid(), count=count, echo=request)) + "\\n")
+    sys.stdout.flush()
+"""
+
+#: Fake pylint package for the pylint worker script
+FAKE_PYLINT = {
+    "pylint/__init__.py": "",
+    "pylint/reporters/__init__.py": "",
+    "pylint/reporters/text.py": """
+class TextReporter(object):
+    def __init__(self, output):
+        self.output = output
+""",
+    "pylint/lint.py": """
+import sys
+runs = []
+def Run(args, reporter=None):
+    runs.append(args)
+    fname = args[-1]
+    if "bad" in fname:
+        reporter.output.write("************* Module bad\\nC0111: run %d %s\\n" % (len(runs), args[0]))
+        sys.exit(16)
+    sys.exit(0)
+""",
+}
+
+
+def echo_worker(timeout=None):
+    """
+    :return: WorkerProcess running ECHO_WORKER
+    """
+    return WorkerProcess(logger, [sys.executable, "-c", ECHO_WORKER], timeout=timeout)
+
+
+class TestWorkerProcess(unittest.TestCase):
+    """
+    JSON lines over a pipe to a process started once.
+    """
+
+    def test_request(self):
+        """
+        Requests go to the same process.
+        """
+        worker = echo_worker()
+        try:
+            first = worker.request(dict(foo="bar"))
+            second = worker.request(dict(foo="baz"))
+        finally:
+            worker.close()
+
+        self.assertEqual(first["echo"], dict(foo="bar"))
+        self.assertEqual(second["count"], 2)
+        self.assertEqual(first["pid"], second["pid"])
+        self.assertFalse(worker.is_alive())
+
+    def test_died(self):
+        """
+        Died worker is reported with its stderr and started again for the next request.
+        """
+        worker = echo_worker()
+        try:
+            pid = worker.request({})["pid"]
+            with self.assertRaises(WorkerFailed) as cm:
+                worker.request(dict(exit=True))
+            self.assertIn("bye", str(cm.exception))
+            response = worker.request({})
+        finally:
+            worker.close()
+
+        self.assertNotEqual(response["pid"], pid)
+        self.assertEqual(response["count"], 1)
+
+    def test_timeout(self):
+        """
+        Stuck worker is killed.
+        """
+        worker = echo_worker(timeout=0.5)
+        started = time.monotonic()
+        try:
+            self.assertRaises(WorkerFailed, worker.request, dict(sleep=10))
+        finally:
+            worker.close()
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_start_failed(self):
+        """
+        Worker saying it cannot work.
+        """
+        worker = WorkerProcess(logger, [sys.executable, "-c", "print('{\"error\": \"no pylint\"}')"])
+        with self.assertRaises(WorkerStartFailed) as cm:
+            worker.request({})
+        self.assertIn("no pylint", str(cm.exception))
+
+    def test_pool(self):
+        """
+        Concurrent requests get workers of their own, up to the pool size.
+        """
+        pool = WorkerPool(echo_worker, size=2)
+        pids = []
+        try:
+            threads = [threading.Thread(target=lambda: pids.append(pool.request(dict(sleep=0.3))["pid"])) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            pool.close()
+
+        self.assertEqual(len(pids), 4)
+        self.assertEqual(len(set(pids)), 2)
+
+
+class TestPluginWorkers(unittest.TestCase):
+    """
+    Plug-in worker pool shared by the scheduler threads.
+    """
+
+    def test_one_pool(self):
+        """
+        Threads validating at once use the same pool.
+        """
+        plugin = PylintPlugin()
+        plugin.id = "pylint"
+        plugin.logger = logger
+
+        pools = []
+
+        class SlowPool(WorkerPool):
+            """ Pool taking its time to be created """
+            def __init__(self, create, size=1):
+                time.sleep(0.1)
+                WorkerPool.__init__(self, create, size)
+                pools.append(self)
+
+            def request(self, message):
+                return {}
+
+        with mock.patch("vvv.plugin.WorkerPool", SlowPool):
+            threads = [threading.Thread(target=plugin.validate_in_worker, args=({},)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        plugin.close()
+        self.assertEqual(len(pools), 1)
+        self.assertIsNone(plugin.workers)
+
+
+class TestPylintWorker(unittest.TestCase):
+    """
+    pylint validates files in one process.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.installation = tempfile.mkdtemp()
+
+        for name, text in FAKE_PYLINT.items():
+            fpath = os.path.join(self.installation, "lib", name)
+            os.makedirs(os.path.dirname(fpath), exist_ok=True)
+            with open(fpath, "wt") as f:
+                f.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        shutil.rmtree(self.installation)
+
+    def create_plugin(self):
+        """
+        :return: pylint plug-in using the host Python
+        """
+        plugin = PylintPlugin()
+        plugin.id = "pylint"
+        plugin.logger = logger
+        plugin.reporter = Reporter(suicidal=False)
+        plugin.options = Config()
+        plugin.options.config = dict(pylint={"host-python-env": True})
+        plugin.installation_path = self.installation
+        plugin.project_path = self.path
+        plugin.setup_local_options()
+        return plugin
+
+    def test_validate(self):
+        """
+        Messages come from the same pylint process and the configuration is passed as rc file.
+        """
+        plugin = self.create_plugin()
+        self.assertTrue(plugin.uses_worker())
+        self.assertFalse(plugin.is_batch_friendly())
+
+        with mock.patch.dict(os.environ, PYTHONPATH=os.path.join(self.installation, "lib")):
+            try:
+                self.assertTrue(plugin.validate(os.path.join(self.path, "good.py")))
+                self.assertFalse(plugin.validate(os.path.join(self.path, "bad.py")))
+            finally:
+                plugin.close()
+
+        output = plugin.reporter.get_output_as_text()
+        self.assertIn("C0111: run 2 --reports=n", output)
+        self.assertTrue(os.path.exists(plugin.get_config_file()))
+        self.assertIn("--rcfile=%s" % plugin.get_config_file(), plugin.get_worker_options())
+
+    def test_fallback(self):
+        """
+        Without pylint the worker is not used.
+        """
+        plugin = self.create_plugin()
+        no_pylint = WorkerProcess(logger, [sys.executable, "-c", "print('{\"error\": \"No module named pylint\"}')"])
+        with mock.patch.object(plugin, "create_worker", return_value=no_pylint), \
+                mock.patch.object(plugin, "run_pylint", return_value=(0, "")) as run_pylint:
+            try:
+                self.assertTrue(plugin.validate(os.path.join(self.path, "good.py")))
+            finally:
+                plugin.close()
+
+        run_pylint.assert_called_once_with([os.path.join(self.path, "good.py")])
+        self.assertFalse(plugin.uses_worker())
+        self.assertTrue(plugin.is_batch_friendly())
+
+
+#: Fake jshint npm package complaining about each "var" statement
+FAKE_JSHINT = """
+function JSHINT(source, options, globals) {
+    JSHINT.errors = [];
+    source.split("\\n").forEach(function(line, i) {
+        if (line.indexOf("var") === 0) {
+            JSHINT.errors.push({line: i + 1, character: 4, code: "W001", reason: "eqeqeq " + options.eqeqeq + " foo " + globals.foo, evidence: line});
+        }
+    });
+    JSHINT.errors.push(null);
+}
+exports.JSHINT = JSHINT;
+"""
+
+
+@unittest.skipUnless(sysdeps.which("node"), "Node.js is not installed")
+class TestJSHintWorker(unittest.TestCase):
+    """
+    jshint validates file contents in one Node.js process.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.installation = tempfile.mkdtemp()
+
+        fpath = os.path.join(self.installation, "node_modules", "jshint", "index.js")
+        os.makedirs(os.path.dirname(fpath))
+        with open(fpath, "wt") as f:
+            f.write(FAKE_JSHINT)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+        shutil.rmtree(self.installation)
+
+    def test_validate(self):
+        """
+        Errors are reported with line numbers, the configuration is loaded once.
+        """
+        plugin = JSHintPlugin()
+        plugin.id = "jshint"
+        plugin.logger = logger
+        plugin.reporter = Reporter(suicidal=False)
+        plugin.options = Config()
+        plugin.options.config = dict(jshint=dict(configuration='{"eqeqeq": true, "globals": {"foo": false}}'))
+        plugin.installation_path = self.installation
+        plugin.setup_local_options()
+        self.assertTrue(plugin.uses_worker())
+
+        try:
+            good = FileContext(self.path, "good.js", data=b"foo();\n")
+            bad = FileContext(self.path, "bad.js", data=b"foo();\nvar a\n")
+            self.assertTrue(plugin.validate_context(good))
+            self.assertFalse(plugin.validate_context(bad))
+            pid = plugin.workers.workers[0].process.pid
+            self.assertFalse(plugin.validate_context(bad))
+            self.assertEqual(plugin.workers.workers[0].process.pid, pid)
+        finally:
+            plugin.close()
+
+        self.assertEqual(plugin.reporter.error_count, 2)
+        self.assertIn("bad.js 2:4: [W001] eqeqeq true foo false", plugin.reporter.get_output_as_text())
+
+
+class TestWorkerFallback(unittest.TestCase):
+    """
+    Files the worker could not validate are validated with the validator command.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_dirty(self):
+        """
+        The staged content is not on the disk, so the result of the version on the disk is not cached.
+        """
+        with open(os.path.join(self.path, "foo.js"), "wt") as f:
+            f.write("var a\n")
+
+        plugin = JSHintPlugin()
+        plugin.id = "jshint"
+        plugin.logger = logger
+        plugin.reporter = Reporter(suicidal=False)
+        plugin.options = Config()
+        plugin.installation_path = self.path
+        plugin.cache = ResultCache(logger, os.path.join(self.path, "cache"))
+        plugin.setup_local_options()
+
+        failing = WorkerProcess(logger, [sys.executable, "-c", "print('{\"error\": \"no node\"}')"])
+        context = FileContext(self.path, "foo.js", data=b"foo();\n", dirty=True)
+
+        with mock.patch.object(plugin, "create_worker", return_value=failing), \
+                mock.patch.object(plugin, "install_on_demand"), \
+                mock.patch.object(plugin, "validate", return_value=False) as validate:
+            try:
+                self.assertFalse(plugin.validate_cached(context))
+            finally:
+                plugin.close()
+
+        validate.assert_called_once_with(context.fullpath)
+        self.assertFalse(context.cacheable)
+        self.assertIsNone(plugin.cache.get(plugin.get_cache_key(context)))
+
+
+def rst_worker():
+    """
+    :return: vvv-validate-rst in worker mode using the host Python
+    """
+    return WorkerProcess(logger, [sys.executable, "-m", "vvv.scripts.validaterst", "--worker"])
+
+
+class TestRestructuredTextWorker(unittest.TestCase):
+    """
+    docutils validates many documents in one process.
+    """
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_reports_reset(self):
+        """
+        Reports of a document do not bleed to the next one.
+        """
+        worker = rst_worker()
+        try:
+            bad = worker.request(dict(file=os.path.join(self.path, "bad.rst"), source="Title\n=====\n\n`Text\n"))
+            good = worker.request(dict(file=os.path.join(self.path, "good.rst"), source="Title\n=====\n\nText\n"))
+        finally:
+            worker.close()
+
+        self.assertEqual(len(bad["reports"]), 1)
+        self.assertIn("without end-string", bad["reports"][0]["message"])
+        self.assertEqual(bad["reports"][0]["line"], 4)
+        self.assertEqual(bad["reports"][0]["level"], "WARNING/2")
+        self.assertEqual(good["reports"], [])
+
+    def test_include(self):
+        """
+        Includes are relative to the document.
+        """
+        os.makedirs(os.path.join(self.path, "docs"))
+        with open(os.path.join(self.path, "docs", "included.rst"), "wt") as f:
+            f.write("Included\n")
+
+        worker = rst_worker()
+        try:
+            response = worker.request(dict(file=os.path.join(self.path, "docs", "index.rst"), source=".. include:: included.rst\n"))
+        finally:
+            worker.close()
+
+        self.assertEqual(response["reports"], [])
+
+    def test_plugin(self):
+        """
+        The plug-in reports the document with errors.
+        """
+        plugin = RestructuredTextPlugin()
+        plugin.id = "rst"
+        plugin.logger = logger
+        plugin.reporter = Reporter(suicidal=False)
+        plugin.options = Config()
+        plugin.installation_path = self.path
+        plugin.setup_local_options()
+
+        with mock.patch.object(plugin, "create_worker", side_effect=rst_worker):
+            try:
+                self.assertTrue(plugin.validate_context(FileContext(self.path, "good.rst", data=b"Title\n=====\n")))
+                self.assertFalse(plugin.validate_context(FileContext(self.path, "bad.rst", data=b"Title\n=====\n\n`Text\n")))
+            finally:
+                plugin.close()
+
+        self.assertEqual(plugin.reporter.error_count, 1)
+        self.assertIn("bad.rst 4: [WARNING/2] Inline interpreted text or phrase reference start-string without end-string.",
+                      plugin.reporter.get_output_as_text())
@@ -24,6 +24,7 @@ from __future__ import absolute_import
 
 import re
 import logging
+import itertools
 
 logger = logging.getLogger("globster")
 
@@ -160,13 +161,47 @@ def _sub_extension(pattern):
     return _sub_basename(pattern[2:])
 
 
+# Characters which make a pattern a real wildcard needing a regex
+_wildcard_chars = frozenset('*?[\\')
+
+
+def _is_literal(text):
+    """Returns True if text has no glob wildcards and matches only itself."""
+    for c in text:
+        if c in _wildcard_chars:
+            return False
+    return True
+
+
+def _is_canonical_path(pattern):
+    """Returns True if a fullpath pattern needs no canonicalization.
+
+    The fullpath translator strips ``./`` and empty path segments.
+    """
+    for segment in pattern.split('/'):
+        if segment in ('', '.'):
+            return False
+    return True
+
+
 class Globster(object):
     """A simple wrapper for a set of glob patterns.
 
     Provides the capability to search the patterns to find a match for
     a given filename (including the full path).
 
-    Patterns are translated to regular expressions to expidite matching.
+    Patterns which do not need a regular expression are looked up
+    without one:
+
+    * exact paths and exact basenames are kept in dicts
+
+    * ``*.ext`` and ``*suffix`` patterns are kept in a dict keyed by the
+      text after the last dot of the suffix, dotless suffixes in a tuple
+      for ``str.endswith()``
+
+    * ``*`` matches everything
+
+    Other patterns are translated to regular expressions.
 
     The regular expressions for multiple patterns are aggregated into
     a super-regex containing groups of up to 99 patterns.
@@ -184,6 +219,9 @@ class Globster(object):
     Also, the extension patterns are more likely to find a match and
     so are matched first, then the basename patterns, then the fullpath
     patterns.
+
+    The lookups are tried before the regular expressions, so when several
+    patterns match the returned one is not necessarily the first one given.
     """
     # We want to _add_patterns in a specific order (as per type_list below)
     # starting with the shortest and going to the longest.
@@ -206,9 +244,17 @@ class Globster(object):
         },
     }
 
-    def __init__(self, patterns, debug):
-        self._regex_patterns = []
+    def __init__(self, patterns, debug, translations=None):
+        """Constructor.
+
+        :param patterns: sequence of glob patterns
+        :param translations: optional dict of pattern -> translated regex
+            source, consulted before translating a pattern and filled with
+            the new translations, so they can be cached between runs
+        """
+        self._init_lookups()
         self.debug = debug
+        self._translations = translations
         pattern_lists = {
             "extension" : [],
             "basename" : [],
@@ -216,16 +262,73 @@ class Globster(object):
         }
         for pat in patterns:
             pat = normalize_pattern(pat)
-            pattern_lists[Globster.identify(pat)].append(pat)
+            t = Globster.identify(pat)
+            if not self._add_lookup(pat, t):
+                pattern_lists[t].append(pat)
+        self._endings = tuple(self._ending_suffixes)
         pi = Globster.pattern_info
         for t in Globster.pattern_types:
             self._add_patterns(pattern_lists[t], pi[t]["translator"],
                 pi[t]["prefix"])
 
+    def _init_lookups(self):
+        self._regex_patterns = []
+        # Pattern matching everything or None
+        self._match_all = None
+        # Exact fullpath -> pattern
+        self._paths = {}
+        # Exact basename -> pattern
+        self._basenames = {}
+        # Text after the last dot of the suffix -> [(suffix, pattern)]
+        self._suffixes = {}
+        # Suffixes without a dot and their patterns
+        self._ending_suffixes = []
+        self._ending_patterns = []
+        # The same suffixes as a tuple for str.endswith()
+        self._endings = ()
+
+    def _add_lookup(self, pattern, pattern_type):
+        """Add a pattern which can be matched without a regex.
+
+        :return: True if the pattern was added, False if it needs a regex.
+        """
+        if pattern_type == "fullpath":
+            if pattern.startswith('RE:') or not _is_literal(pattern) \
+                    or not _is_canonical_path(pattern):
+                return False
+            self._paths.setdefault(pattern, pattern)
+            return True
+
+        if pattern_type == "extension":
+            suffix = pattern[1:]
+        else:
+            suffix = pattern.lstrip('*')
+            if suffix == pattern:
+                # No leading star, an exact basename
+                if not _is_literal(pattern):
+                    return False
+                self._basenames.setdefault(pattern, pattern)
+                return True
+
+        if not _is_literal(suffix):
+            return False
+
+        if not suffix:
+            if self._match_all is None:
+                self._match_all = pattern
+        elif '.' in suffix:
+            key = suffix[suffix.rfind('.') + 1:]
+            self._suffixes.setdefault(key, []).append((suffix, pattern))
+        else:
+            self._ending_suffixes.append(suffix)
+            self._ending_patterns.append(pattern)
+        return True
+
     def _add_patterns(self, patterns, translator, prefix=''):
         while patterns:
             grouped_rules = [
-                '(%s)' % translator(pat) for pat in patterns[:99]]
+                '(%s)' % self._translate(pat, translator)
+                for pat in patterns[:99]]
             joined_rule = '%s(?:%s)$' % (prefix, '|'.join(grouped_rules))
             # Explicitly use lazy_compile here, because we count on its
             # nicer error reporting.
@@ -234,26 +337,60 @@ class Globster(object):
                 patterns[:99]))
             patterns = patterns[99:]
 
+    def _translate(self, pattern, translator):
+        translations = getattr(self, '_translations', None)
+        if translations is None:
+            return translator(pattern)
+        translated = translations.get(pattern)
+        if translated is None:
+            translated = translations[pattern] = translator(pattern)
+        return translated
+
     def match(self, filename):
         """Searches for a pattern that matches the given filename.
 
         :return A matching pattern or None if there is no matching pattern.
         """
+        result = self._match(filename)
+        if self.debug:
+            if result is None:
+                logger.info("%s: miss", filename)
+            else:
+                logger.info("%s against %s: hit", filename, result)
+        return result
+
+    def _match(self, filename):
+        if self._match_all is not None:
+            return self._match_all
+
+        if self._paths:
+            pattern = self._paths.get(filename)
+            if pattern is not None:
+                return pattern
+
+        if self._endings and filename.endswith(self._endings):
+            for suffix, pattern in zip(self._ending_suffixes, self._ending_patterns):
+                if filename.endswith(suffix):
+                    return pattern
+
+        if self._suffixes:
+            candidates = self._suffixes.get(filename[filename.rfind('.') + 1:])
+            if candidates is not None:
+                for suffix, pattern in candidates:
+                    if filename.endswith(suffix):
+                        return pattern
+
+        if self._basenames:
+            pattern = self._basenames.get(filename[filename.rfind('/') + 1:])
+            if pattern is not None:
+                return pattern
 
         try:
             for regex, patterns in self._regex_patterns:
                 match = regex.match(filename)
-
-                debug_template = "%s against %s: %%s" % (filename, regex._real_regex.pattern)
-
                 if match:
-                    if self.debug:
-                        logger.info(debug_template % "hit")
                     return patterns[match.lastindex -1]
 
-                if self.debug:
-                    logger.info(debug_template % "miss")
-
         except Exception as e:
             # We can't show the default e.msg to the user as thats for
             # the combined pattern we sent to regex. Instead we indicate to
@@ -267,10 +404,40 @@ class Globster(object):
                         bad_patterns += ('\n  %s' % p)
             e.msg += bad_patterns
             raise e
-        
 
         return None
 
+    def is_empty(self):
+        """Returns True if there are no patterns and nothing ever matches."""
+        return (self._match_all is None and not self._paths
+            and not self._basenames and not self._suffixes
+            and not self._endings and not self._regex_patterns)
+
+    def get_extensions(self):
+        """Returns the set of file extensions the patterns can match.
+
+        The extension is the text after the last dot of the basename,
+        None for basenames without a dot, see get_extension().
+
+        :return: set of extensions or None if any file can match
+        """
+        if self._match_all is not None or self._endings or self._regex_patterns:
+            return None
+        extensions = set(self._suffixes)
+        for name in itertools.chain(self._basenames, self._paths):
+            extensions.add(get_extension(name))
+        return extensions
+
+    def is_extension_only(self):
+        """Returns True if the match only depends on the file extension."""
+        if self._paths or self._basenames or self._endings or self._regex_patterns:
+            return False
+        for key, candidates in self._suffixes.items():
+            for suffix, pattern in candidates:
+                if suffix != '.' + key:
+                    return False
+        return True
+
     @staticmethod
     def identify(pattern):
         """Returns pattern category.
@@ -316,7 +483,7 @@ class ExceptionGlobster(object):
     that apply under paths specified by '!' exception patterns.
     """
     
-    def __init__(self,patterns, debug):
+    def __init__(self,patterns, debug, translations=None):
         ignores = [[], [], []]
         for p in patterns:
             if p.startswith('!!'):
@@ -325,23 +492,51 @@ class ExceptionGlobster(object):
                 ignores[1].append(p[1:])
             else:
                 ignores[0].append(p)
-        self._ignores = [Globster(i, debug) for i in ignores]
+        self._ignores = [Globster(i, debug, translations) for i in ignores]
+        # Skip the globsters without patterns when matching
+        self._pos, self._neg, self._double_neg = [
+            None if g.is_empty() else g for g in self._ignores]
         
+    def get_extensions(self):
+        """Returns the set of file extensions the patterns can match.
+
+        Exception patterns only narrow the match and are not included.
+
+        :return: set of extensions or None if any file can match
+        """
+        extensions = set()
+        for g in (self._pos, self._double_neg):
+            if g is not None:
+                g_extensions = g.get_extensions()
+                if g_extensions is None:
+                    return None
+                extensions |= g_extensions
+        return extensions
+
+    def is_extension_only(self):
+        """Returns True if the match only depends on the file extension."""
+        for g in self._ignores:
+            if not g.is_extension_only():
+                return False
+        return True
+
     def match(self, filename):
         """Searches for a pattern that matches the given filename.
 
         :return A matching pattern or None if there is no matching pattern.
         """
-            
-        double_neg = self._ignores[2].match(filename)
-        if double_neg:
-            return "!!%s" % double_neg
-        elif self._ignores[1].match(filename):
-            #print("Ignores")
+        if self._double_neg is not None:
+            double_neg = self._double_neg.match(filename)
+            if double_neg:
+                return "!!%s" % double_neg
+
+        if self._neg is not None and self._neg.match(filename):
             return None
-        else:
-            #print("Normal match")
-            return self._ignores[0].match(filename)
+
+        if self._pos is not None:
+            return self._pos.match(filename)
+
+        return None
 
 class _OrderedGlobster(Globster):
     """A Globster that keeps pattern order."""
@@ -352,7 +547,8 @@ class _OrderedGlobster(Globster):
         :param patterns: sequence of glob patterns
         """
         # Note: This could be smarter by running like sequences together
-        self._regex_patterns = []
+        self._init_lookups()
+        self.debug = False
         for pat in patterns:
             pat = normalize_pattern(pat)
             t = Globster.identify(pat)
@@ -360,6 +556,18 @@ class _OrderedGlobster(Globster):
                 Globster.pattern_info[t]["prefix"])
 
 
+def get_extension(filename):
+    """Returns the text after the last dot of the basename.
+
+    None is returned if the basename has no dot.
+    """
+    basename = filename[filename.rfind('/') + 1:]
+    dot = basename.rfind('.')
+    if dot < 0:
+        return None
+    return basename[dot + 1:]
+
+
 _slashes = lazy_regex.lazy_compile(r'[\\/]+')
 def normalize_pattern(pattern):
     """Converts backslashes in path patterns to forward slashes.
@@ -0,0 +1,210 @@
+"""
+
+    Persistent validation result cache.
+
+    Validation results are stored in the installation folder (``~/.vvv/cache``)
+    keyed by the file content, the file path, the plug-in and the plug-in options.
+    When none of these have changed since the last run, the reported errors
+    are replayed from the cache instead of running the validator again.
+
+"""
+
+# Python imports
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+#: Bump this when the format of cache entries changes
+CACHE_FORMAT_VERSION = 1
+
+#: Default maximum cache size on disk in bytes
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+#: Seconds between walking through the cache entries to evict the old ones
+EVICT_INTERVAL = 24 * 60 * 60
+
+#: Evict anyway after writing this many entries in one run
+EVICT_PUTS = 1000
+
+#: File in the cache folder telling when the cache was last evicted
+EVICT_MARKER = "evicted"
+
+
+def hash_data(*parts):
+    """
+    Create a hex digest out of several strings.
+    """
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Content addressed on-disk storage for validation results.
+
+    Each entry is a small JSON file. Entries are evicted least recently used first
+    when the cache grows over its size limit. Finding out the size means a stat() for
+    each entry, so this is done only once in a while, see :py:meth:`evict_if_due`.
+    """
+
+    def __init__(self, logger, path, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param path: Folder where cache entries are stored
+
+        :param max_size: Maximum total size of the cache entries in bytes
+        """
+        self.logger = logger
+        self.path = path
+        self.max_size = max_size
+
+        #: How many entries this instance has written
+        self.puts = 0
+
+    def get_key(self, content_hash, fpath, plugin_id, options_hash):
+        """
+        Build a cache key for validating a file with a plug-in.
+
+        Reports mention the file path, so the same content in another file gets its own entry.
+
+        :param content_hash: Hash of the file content, see FileContext.get_content_hash()
+
+        :param fpath: Full path to the validated file
+
+        :param options_hash: Hash of the plug-in options, see Plugin.get_options_hash()
+        """
+        return hash_data(str(CACHE_FORMAT_VERSION), content_hash, fpath, plugin_id, options_hash)
+
+    def get_entry_path(self, key):
+        """
+        Spread entries to subfolders so that we do not end up with one huge folder.
+        """
+        return os.path.join(self.path, key[:2], key)
+
+    def get(self, key):
+        """
+        :return: Stored entry as dict(events, success) or None if there is no entry for the key
+        """
+        fpath = self.get_entry_path(key)
+
+        try:
+            with open(fpath, "rt") as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        # Mark recently used for eviction
+        try:
+            os.utime(fpath, None)
+        except OSError:
+            pass
+
+        return entry
+
+    def put(self, key, events, success):
+        """
+        Store validation result.
+
+        The entry is first written to a temporary file and then renamed,
+        so that parallel worker processes never see half written entries.
+
+        :param events: Reporter events recorded during the validation
+
+        :param success: What validate() returned
+        """
+        fpath = self.get_entry_path(key)
+        folder = os.path.dirname(fpath)
+
+        os.makedirs(folder, exist_ok=True)
+
+        self.puts += 1
+
+        fd, temp = tempfile.mkstemp(dir=folder)
+        try:
+            with os.fdopen(fd, "wt") as f:
+                json.dump(dict(events=events, success=bool(success)), f)
+            os.replace(temp, fpath)
+        except (IOError, OSError, TypeError, ValueError) as e:
+            # Reports which cannot be serialized are not cached
+            self.logger.debug("Could not write cache entry %s: %s", fpath, e)
+            if os.path.exists(temp):
+                os.unlink(temp)
+
+    def evict_if_due(self):
+        """
+        Evict if the cache was last evicted more than EVICT_INTERVAL ago, or this run has written many entries.
+
+        :return True: If the cache was evicted
+        """
+
+        marker = os.path.join(self.path, EVICT_MARKER)
+
+        if self.puts < EVICT_PUTS:
+            try:
+                if time.time() - os.path.getmtime(marker) < EVICT_INTERVAL:
+                    return False
+            except OSError:
+                # Never evicted
+                pass
+
+        self.evict()
+
+        if os.path.exists(self.path):
+            with open(marker, "wt"):
+                pass
+
+        self.puts = 0
+
+        return True
+
+    def evict(self):
+        """
+        Delete least recently used entries until the cache fits in its size limit.
+        """
+
+        if not os.path.exists(self.path):
+            return
+
+        entries = []
+        total = 0
+
+        # W:100,10:Unused variable'
+        # pylint: disable = W0612
+
+        for root, dirs, files in os.walk(self.path):
+
+            # Entries are in the subfolders, the top folder has the eviction marker
+            if root == self.path:
+                continue
+
+            for name in files:
+                fpath = os.path.join(root, name)
+                try:
+                    stat = os.stat(fpath)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, fpath))
+                total += stat.st_size
+
+        if total <= self.max_size:
+            return
+
+        entries.sort()
+
+        self.logger.debug("Evicting validation result cache, size %d bytes", total)
+
+        for mtime, size, fpath in entries:
+
+            if total <= self.max_size:
+                break
+
+            try:
+                os.unlink(fpath)
+            except OSError:
+                continue
+
+            total -= size
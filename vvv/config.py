@@ -10,13 +10,18 @@
 
 # Python imports
 import os
+import json
+import hashlib
+import tempfile
 
-# Third party
-import yaml
+# yaml is imported only when a config file must be parsed, see Config.parse()
 
 # Local imports
 from .bzrlib.globster import ExceptionGlobster
 
+#: Bump when the cached data format or the pattern translation changes
+CONFIG_CACHE_VERSION = 1
+
 
 class ConfigException(Exception):
     """
@@ -42,7 +47,7 @@ class Config:
 
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename=None):
         """
         :param filename: Full path to the config file or None if we don't read any options
         """
@@ -53,9 +58,17 @@ class Config:
         #: parsed config data as Python dict - default to empty
         self.config = dict()
 
-    def load(self):
+        #: File match pattern -> translated regular expression source, shared by all match lists of the file
+        self.translations = {}
+
+        #: Match lists already built, (pattern tuple, debug) -> ExceptionGlobster
+        self.match_lists = {}
+
+    def load(self, cache=None):
         """
         Try to load YAML config file and return empty dict if the file does not exist.
+
+        :param cache: ConfigCache where the parsed data is looked up first, or None
         """
         fpath = self.filename
 
@@ -67,16 +80,28 @@ class Config:
             if not os.path.exists(fpath):
                 return
 
-            f = open(fpath, "rt")
-            try:
-                self.config = yaml.safe_load(f)
-            finally:
-                f.close()
+            if cache and cache.load(self):
+                return
+
+            with open(fpath, "rt") as f:
+                self.config = self.parse(f)
 
         # If the file is empty yaml.safe_load() sets result to None
         if self.config is None:
             self.config = dict()
 
+    @staticmethod
+    def parse(stream):
+        """
+        Parse YAML, using the fast libyaml based loader if PyYAML has been compiled with it.
+        """
+
+        import yaml
+
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+        return yaml.load(stream, Loader=loader)
+
     def get_option(self, section_name, entry, default=None):
         """
         Convert YAML tree entry to a Python list.
@@ -142,17 +167,24 @@ class Config:
         else:
             raise ConfigException("Bad option data for %s %s" % (section, entry))
 
-        g = ExceptionGlobster(opt, debug)
+        key = (tuple(opt), debug)
 
-        g.orignal_pattern = opt
+        g = self.match_lists.get(key)
+
+        if g is None:
+            g = self.match_lists[key] = ExceptionGlobster(opt, debug, translations=self.translations)
+            g.orignal_pattern = opt
 
         return g
 
     @classmethod
-    def find_config_file(cls, start_path, filename):
+    def find_config_file(cls, start_path, filename, found=None):
         """
         Recurses to parent paths and tries to find a filename.
 
+        :param found: Optional dict folder -> result of earlier look-ups of the same filename.
+            Filled with every visited folder, so that look-ups for many files in the same tree are fast.
+
         :return: Full path to found config file or None
         """
 
@@ -163,21 +195,127 @@ class Config:
 
         path = start_path
 
+        # Folders visited in this look-up
+        visited = []
+
+        result = None
+
         while not os.path.ismount(path):
 
+            if found is not None and path in found:
+                result = found[path]
+                break
+
+            visited.append(path)
+
             config_file = os.path.join(path, filename)
             if os.path.exists(config_file):
-                return config_file
+                result = config_file
+                break
 
             old_path = path
             path = os.path.abspath(os.path.join(path, os.path.pardir))
             if old_path == path:
                 # Hit the C:\ root?
-                return None
+                break
 
             levels -= 1
             if levels <= 0:
                 raise ConfigException("Too much recursion to parents when trying to find a config file: %s" % filename)
 
-        # Hit a mount point
-        return None
+        # Otherwise we hit a mount point
+
+        if found is not None:
+            for folder in visited:
+                found[folder] = result
+
+        return result
+
+
+class ConfigCache(object):
+    """
+    Keep parsed config files and translated file match patterns on the disk.
+
+    Entries are keyed by the config file path and valid as long as the file modification time
+    and size stay the same.
+    """
+
+    def __init__(self, logger, path):
+        """
+        :param path: Folder where the entries are stored
+        """
+        self.logger = logger
+        self.path = path
+
+    def get_entry_path(self, filename):
+        """
+        :return: Path to the cache entry of a config file
+        """
+        name = hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()
+        return os.path.join(self.path, name + ".json")
+
+    def get_stamp(self, filename):
+        """
+        :return: What must not change for the cached entry to be valid
+        """
+        stat = os.stat(filename)
+        return [CONFIG_CACHE_VERSION, os.path.abspath(filename), stat.st_mtime_ns, stat.st_size]
+
+    def load(self, config):
+        """
+        Set config data from the cache.
+
+        :return: True if the data was found in the cache
+        """
+        try:
+            stamp = self.get_stamp(config.filename)
+            with open(self.get_entry_path(config.filename), "rt") as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return False
+
+        if not isinstance(entry, dict) or entry.get("stamp") != stamp:
+            return False
+
+        config.config = entry["config"]
+        config.translations = entry["translations"]
+        config.cached_translations = len(config.translations)
+
+        return True
+
+    def save(self, config):
+        """
+        Store parsed config data and pattern translations made so far, if they are not cached yet.
+        """
+
+        if not config.filename or len(config.translations) == getattr(config, "cached_translations", -1):
+            return
+
+        # YAML can have data which does not survive JSON, e.g. integer keys and dates
+        try:
+            if json.loads(json.dumps(config.config)) != config.config:
+                self.logger.debug("Config %s cannot be cached", config.filename)
+                return
+            data = json.dumps(dict(stamp=self.get_stamp(config.filename), config=config.config, translations=config.translations))
+        except (IOError, OSError, TypeError, ValueError) as e:
+            self.logger.debug("Config %s cannot be cached: %s", config.filename, e)
+            return
+
+        fpath = self.get_entry_path(config.filename)
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.path)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not write config cache %s: %s", fpath, e)
+            return
+
+        try:
+            with os.fdopen(fd, "wt") as f:
+                f.write(data)
+            os.replace(temp, fpath)
+            config.cached_translations = len(config.translations)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not write config cache %s: %s", fpath, e)
+            if os.path.exists(temp):
+                os.unlink(temp)
@@ -8,10 +8,9 @@
 
 # Python imports
 import os
-import tarfile
 
-# Third party
-import requests
+# requests and tarfile are imported only when something is downloaded,
+# as they are slow to import and most runs do not need them
 
 
 def download(logger, towhere, url):
@@ -28,6 +27,8 @@ def download(logger, towhere, url):
     if os.path.exists(towhere):
         return False
 
+    import requests
+
     response = requests.get(url)
 
     #if os.path.exists(towhere):
@@ -77,6 +78,7 @@ def download_and_extract_java_dep(logger, towhere, url):
 
         os.makedirs(folder)
 
+        import tarfile
         tar = tarfile.open(towhere)
         tar.extractall(path=folder)
         tar.close()
@@ -111,6 +113,7 @@ def download_and_extract_gz(logger, towhere, url):
 
     os.makedirs(folder)
 
+    import tarfile
     tar = tarfile.open(towhere)
     tar.extractall(path=folder)
     tar.close()
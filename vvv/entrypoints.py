@@ -0,0 +1,170 @@
+"""
+
+    Find plug-ins installed as ``vvv`` entry points.
+
+    Scanning all installed distributions takes longer than the rest of VVV start up,
+    so the found entry points are cached in ``entry-points.json`` in the VVV installation folder.
+    The cache is invalidated when the modification time of any ``sys.path`` folder changes,
+    which happens when packages are installed or removed.
+
+    Entry points are scanned with ``importlib.metadata``, or ``pkg_resources``
+    on Python versions not having it.
+
+"""
+
+# Python imports
+import os
+import sys
+import json
+import tempfile
+import importlib
+
+#: Entry point group of VVV plug-ins
+ENTRY_POINT_GROUP = "vvv"
+
+#: Cache file name in the installation folder
+CACHE_FILE = "entry-points.json"
+
+
+def get_cache_key():
+    """
+    :return: List identifying the Python environment: interpreter and sys.path folder modification times
+    """
+
+    key = [sys.executable, sys.version]
+
+    for path in sys.path:
+
+        # The current working directory changes all the time and does not contain installed packages
+        if not path:
+            continue
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+
+        key.append([path, mtime])
+
+    return key
+
+
+def scan_entry_points():
+    """
+    Go through the installed distributions.
+
+    :return: List of (name, "module:attr") pairs
+    """
+
+    try:
+        from importlib import metadata
+    except ImportError:
+        metadata = None
+
+    if metadata:
+        found = metadata.entry_points()
+        if hasattr(found, "select"):
+            found = found.select(group=ENTRY_POINT_GROUP)
+        else:
+            # Python 3.8 and 3.9 give a dict
+            found = found.get(ENTRY_POINT_GROUP, [])
+        entry_points = [(ep.name, ep.value) for ep in found]
+    else:
+        import pkg_resources
+        entry_points = [(ep.name, "%s:%s" % (ep.module_name, ".".join(ep.attrs)))
+                        for ep in pkg_resources.iter_entry_points(group=ENTRY_POINT_GROUP)]
+
+    # The same distribution can be found several times through sys.path
+    names = set()
+    unique = []
+    for name, value in entry_points:
+        if name not in names:
+            names.add(name)
+            unique.append((name, value))
+
+    return unique
+
+
+def load_entry_point(value):
+    """
+    Import the object an entry point refers to.
+
+    :param value: Entry point value like ``vvv.validators.tabs:TabsPlugin``
+    """
+
+    # Drop extras like [foo]
+    value = value.split("[", 1)[0].strip()
+
+    module_name, _, attrs = value.partition(":")
+
+    obj = importlib.import_module(module_name.strip())
+
+    if attrs:
+        for attr in attrs.strip().split("."):
+            obj = getattr(obj, attr)
+
+    return obj
+
+
+def read_cache(fpath, key):
+    """
+    :return: Cached entry points or None if there is no valid cache
+    """
+    try:
+        with open(fpath, "rt") as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+
+    return [tuple(entry_point) for entry_point in data.get("entry_points", [])]
+
+
+def write_cache(logger, fpath, key, entry_points):
+    """
+    Store the found entry points.
+
+    Written to a temporary file first, so that other VVV processes never see half written cache.
+    """
+    folder = os.path.dirname(fpath)
+
+    try:
+        os.makedirs(folder, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=folder)
+    except (IOError, OSError) as e:
+        logger.debug("Could not write entry point cache %s: %s", fpath, e)
+        return
+
+    try:
+        with os.fdopen(fd, "wt") as f:
+            json.dump(dict(key=key, entry_points=entry_points), f)
+        os.replace(temp, fpath)
+    except (IOError, OSError) as e:
+        logger.debug("Could not write entry point cache %s: %s", fpath, e)
+        if os.path.exists(temp):
+            os.unlink(temp)
+
+
+def find_entry_points(logger, installation):
+    """
+    Get the installed plug-ins, scanning the distributions only if the environment has changed.
+
+    :param installation: VVV installation folder where the cache is kept
+
+    :return: List of (name, "module:attr") pairs
+    """
+
+    fpath = os.path.join(installation, CACHE_FILE)
+
+    key = get_cache_key()
+
+    entry_points = read_cache(fpath, key)
+
+    if entry_points is None:
+        logger.debug("Scanning installed packages for plug-ins")
+        entry_points = scan_entry_points()
+        write_cache(logger, fpath, key, entry_points)
+
+    return entry_points
@@ -0,0 +1,96 @@
+"""
+
+    File data shared between plug-ins.
+
+    A file is read from the disk once and all plug-ins validating it use the same buffer.
+
+"""
+
+# Python imports
+import io
+import os
+import hashlib
+
+
+class FileContext:
+    """
+    One file under validation.
+
+    Raw bytes, the binary file check and the decoded text are computed on the first use
+    and then remembered.
+    """
+
+    def __init__(self, project_path, relative, data=None, dirty=False):
+        """
+        :param project_path: Project root folder
+
+        :param relative: Project root relative path of the file
+
+        :param data: File content as bytes if already available, otherwise read from the disk
+
+        :param dirty: True if the file on the disk differs from the given data, e.g. a partially staged file
+        """
+        self.relative = relative
+        self.fullpath = os.path.join(project_path, relative)
+
+        self.data = data
+        self.dirty = dirty
+
+        #: Set to False when a validator read the file from the disk instead of using the data,
+        #: so the results do not belong to the content hash and must not be cached
+        self.cacheable = True
+        self.binary = None
+        self.text = None
+        self.lines = None
+        self.content_hash = None
+
+    def get_data(self):
+        """
+        :return: Raw file content as bytes
+        """
+        if self.data is None:
+            with open(self.fullpath, "rb") as f:
+                self.data = f.read()
+        return self.data
+
+    def is_binary(self):
+        """
+        Check if file is binary or not.
+
+        The same logic as with git diff: a file containing null bytes is binary.
+
+        http://stackoverflow.com/a/3002505/315168
+        """
+        if self.binary is None:
+            self.binary = b"\0" in self.get_data()
+        return self.binary
+
+    def get_text(self):
+        """
+        Decode the file as UTF-8 text.
+
+        Ignore UTF-8 errors. Don't try to undertand other encodings.
+
+        :return: File content as unicode string
+        """
+        if self.text is None:
+            self.text = self.get_data().decode("utf-8", "replace")
+        return self.text
+
+    def get_lines(self):
+        """
+        Split text to lines like iterating an opened text file would.
+
+        :return: List of unicode lines with universal newlines translated to \\n
+        """
+        if self.lines is None:
+            self.lines = list(io.StringIO(self.get_text(), newline=None))
+        return self.lines
+
+    def get_content_hash(self):
+        """
+        :return: Hex digest of the file content
+        """
+        if self.content_hash is None:
+            self.content_hash = hashlib.sha1(self.get_data()).hexdigest()
+        return self.content_hash
@@ -17,6 +17,7 @@ import os
 import sys
 import stat
 import logging
+import subprocess
 
 # Third party
 import plac
@@ -24,11 +25,28 @@ import plac
 # Local
 from vvv import utils
 from vvv import main
+from vvv.filecontext import FileContext
 
 
-#: Command giving you git staging list
+#: Command giving you git staging list with blob ids of the staged content
 #: http://stackoverflow.com/a/10164204/315168
-GIT_COMMIT_LIST = "git diff-index -z --cached HEAD --name-only"
+GIT_STAGED_BLOBS = ["git", "diff-index", "-z", "--cached", "--no-renames", "HEAD"]
+
+#: Command giving you files whose working tree copy differs from the staged one
+GIT_UNSTAGED_LIST = ["git", "diff-files", "-z", "--name-only"]
+
+#: Command reading object contents, fed with object ids one per line
+GIT_CAT_FILE = ["git", "cat-file", "--batch"]
+
+#: Command giving you files changed since the merge base of a revision and the working tree.
+#: Removed files are left out and renamed files are listed with their new name.
+GIT_CHANGED_SINCE = ["git", "diff", "-z", "--name-only", "--no-renames", "--diff-filter=d", "--relative", "--merge-base"]
+
+#: git mode of submodules, which have no content to validate
+GIT_SUBMODULE_MODE = "160000"
+
+#: Validate staged files in parallel when there are at least this many of them
+PARALLEL_THRESHOLD = 20
 
 PRECOMMIT_HOOK_TEMPLATE = """#!/bin/sh
 #
@@ -116,68 +134,224 @@ def setup_hook():
     sys.exit(0)
 
 
-        
-def precommit_hook():
+class StagedBlobReader(object):
     """
-    Run pre-commit hook.
+    Give validators the staged content of files instead of the working tree copy.
 
-    Pass all command line options to VVV main process and add filename as the last paramter to these. 
+    Blobs are streamed from one long-lived ``git cat-file --batch`` process.
+    Each worker process starts its own git process when it reads its first blob.
+    """
 
-    Validate all files. If any of the files fail then abort the commit.
+    def __init__(self, repo_path, blobs, dirty):
+        """
+        :param repo_path: Git repository root
+
+        :param blobs: Dict full path -> blob id of the staged content
+
+        :param dirty: Set of full paths whose working tree copy differs from the staged one
+        """
+        self.repo_path = repo_path
+        self.blobs = blobs
+        self.dirty = dirty
+        self.process = None
+
+        #: Id of the process which started the git process
+        self.pid = None
+
+    def __getstate__(self):
+        """
+        Pickled for worker processes without the running git process.
+        """
+        state = self.__dict__.copy()
+        state["process"] = None
+        return state
+
+    def get_process(self):
+        """
+        :return: Running git cat-file process
+        """
+        # Forked worker processes inherit the object with the parent's pipes,
+        # which they must not share
+        if self.process is None or self.pid != os.getpid():
+            self.process = subprocess.Popen(GIT_CAT_FILE, cwd=self.repo_path, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            self.pid = os.getpid()
+        return self.process
+
+    def read_blob(self, blob):
+        """
+        :param blob: Object id
+
+        :return: Blob content as bytes
+        """
+        process = self.get_process()
+
+        process.stdin.write(blob.encode("ascii") + b"\n")
+        process.stdin.flush()
+
+        header = process.stdout.readline().decode("ascii").split()
+        if len(header) != 3:
+            raise RuntimeError("git cat-file could not read object %s: %s" % (blob, " ".join(header)))
+
+        size = int(header[2])
+        data = process.stdout.read(size)
+
+        # Object content is followed by a newline
+        process.stdout.read(1)
+
+        return data
+
+    def create_context(self, project_path, relative):
+        """
+        :return: FileContext having the staged content of the file
+        """
+        fullpath = os.path.abspath(os.path.join(project_path, relative))
+
+        blob = self.blobs.get(fullpath)
+        if blob is None:
+            return FileContext(project_path, relative)
+
+        return FileContext(project_path, relative, data=self.read_blob(blob), dirty=fullpath in self.dirty)
+
+    def close(self):
+        """
+        Stop git process.
+        """
+        if self.process and self.pid == os.getpid():
+            self.process.stdin.close()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+
+def get_staged_blobs(logger, repo_path):
     """
+    Read the staging list with blob ids of the staged content.
 
+    Deleted files and submodules are left out.
 
-    logging.basicConfig(level=logging.INFO, stream=sys.stdout, format="%(message)s")
-    logger = logging.getLogger("precommit-hook")
+    :return: Dict full path -> blob id
+    """
 
-    # Assume repository root is the single argument
-    if len(sys.argv) < 2:
-        sys.exit("Missing git repository as argument")
+    exit_code, diff_output = utils.run_command(logger, GIT_STAGED_BLOBS, cwd=repo_path)
 
-    repo_path = sys.argv[-1]
+    if exit_code != 0:
+        print("Failed to execute: %s" % " ".join(GIT_STAGED_BLOBS))
+        print(diff_output)
+        sys.exit(1)
 
-    if not os.path.exists(repo_path):
-        sys.exit("Repositoty path does not exist: %s" % repo_path)
+    # Output is null separated list of ":old-mode new-mode old-blob new-blob status" and filename pairs
+    parts = diff_output.split("\0")
+
+    blobs = {}
+
+    for info, f in zip(parts[0::2], parts[1::2]):
+
+        # W0612 Unused variable
+        # pylint: disable=W0612
+        old_mode, new_mode, old_blob, new_blob, status = info.lstrip(":").split()
+
+        if status == "D" or new_mode == GIT_SUBMODULE_MODE:
+            continue
+
+        blobs[os.path.abspath(os.path.join(repo_path, f))] = new_blob
 
-    # Get git diff-index output for the repo
-    with utils.temporary_working_directory(repo_path):
-        exit_code, diff_output = utils.shell(logger, GIT_COMMIT_LIST) 
+    return blobs
+
+
+def get_unstaged_files(logger, repo_path):
+    """
+    :return: Set of full paths whose working tree copy differs from the staged one
+    """
+
+    exit_code, diff_output = utils.run_command(logger, GIT_UNSTAGED_LIST, cwd=repo_path)
 
     if exit_code != 0:
-        print("Failed to execute: %s" % GIT_COMMIT_LIST)
+        print("Failed to execute: %s" % " ".join(GIT_UNSTAGED_LIST))
         print(diff_output)
-        sys.exit(1) 
+        sys.exit(1)
+
+    return set(os.path.abspath(os.path.join(repo_path, f)) for f in diff_output.split("\0") if f)
+
+
+def get_changed_files(logger, path, ref):
+    """
+    Ask git which files have been changed since the merge base of a revision.
+
+    :param path: Folder inside a git repository, only files in this folder are listed
+
+    :param ref: git revision, e.g. origin/master
+
+    :return: List of full paths of changed files which exist on the disk
+    """
 
-    # Output is just new line separated list of filenames
-    files = diff_output.split("\0")
+    cmdline = GIT_CHANGED_SINCE + [ref, "--"]
 
-    success = True
+    exit_code, output = utils.run_command(logger, cmdline, cwd=path, raise_error=True)
 
-    for f in files:
+    fpaths = []
+
+    for f in output.split("\0"):
 
-        # Empty newline after list
         if f == "":
             continue
 
-        f = os.path.join(repo_path, f)
+        f = os.path.join(path, f)
 
-        if not os.path.exists(f):
-            # Cannot validate files which do not exist
-            # Git delete list?
+        # Files can be changed in the working tree too
+        if not os.path.isfile(f):
             continue
 
-        # Pass arguments to VVV + add file from commit list
-        args = sys.argv[1:-1] + [f]
+        fpaths.append(f)
 
-        # Call VVV for this file
-        result = plac.call(main.main, args)
+    return fpaths
 
-        # Validation failed
-        if result != 0:
-            success = False
 
+def precommit_hook():
+    """
+    Run pre-commit hook.
+
+    Pass all command line options to VVV main process and add the repository as the last paramter to these.
+
+    Validate the staged content of all staged files in one VVV run. If any of the files fail then abort the commit.
+    """
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout, format="%(message)s")
+    logger = logging.getLogger("precommit-hook")
+
+    # Assume repository root is the single argument
+    if len(sys.argv) < 2:
+        sys.exit("Missing git repository as argument")
+
+    repo_path = sys.argv[-1]
+
+    if not os.path.exists(repo_path):
+        sys.exit("Repositoty path does not exist: %s" % repo_path)
+
+    blobs = get_staged_blobs(logger, repo_path)
+
+    if not blobs:
+        sys.exit(0)
+
+    fpaths = sorted(blobs.keys())
+
+    # Validate what is going to be committed, not what is on the disk
+    reader = StagedBlobReader(repo_path, blobs, get_unstaged_files(logger, repo_path))
+
+    # Parse command line once, config and plug-ins are set up once for all files
+    vvv = plac.call(main.create, sys.argv[1:])
+
+    vvv.target_files = fpaths
+    vvv.file_reader = reader
+
+    # Big commits are validated using all CPUs unless told otherwise
+    if vvv.jobs is None and len(fpaths) >= PARALLEL_THRESHOLD:
+        vvv.jobs = 0
+
+    try:
+        result = vvv.run()
+    finally:
+        reader.close()
 
     # Signal git that the fecal has hitted the rotatory device etc.
-    if not success:
+    if result != 0:
         sys.exit("VVV validatoin and linting failed")
-
@@ -16,12 +16,21 @@ import shutil
 
 # Third party
 import plac
-from pkg_resources import iter_entry_points
 
 # Local imports
 from .reporter import Reporter, FirstError
+from .streamreporter import STREAM_REPORTERS
 from .walker import Walker
-from .config import Config
+from .config import Config, ConfigCache
+from .cache import ResultCache
+from .manifest import ToolchainManifest
+from . import utils
+from . import entrypoints
+from .utils import ShellCommandFailed
+from .filecontext import FileContext
+from . import profiler
+from .textlineplugin import TextLinePlugin, run_text_line_plugins
+from .pluginindex import PluginIndex
 
 # XXX: Factor this to VVV main class attribute
 logger = logging.getLogger("vvv")
@@ -45,6 +54,44 @@ DEFAULT_MATCHLIST = [
 #: sys.exit() value used for bad command line options
 BAD_COMMAND_LINE_EXIT_CODE = 64
 
+#: VVV instance used by a worker process in parallel mode
+_worker = None
+
+
+def _init_worker(kwargs, project_path, limiter):
+    """
+    Set up plug-ins in a freshly started worker process.
+
+    :param limiter: Semaphore capping validator processes running at once in all workers
+    """
+    # pylint: disable=W0603
+    global _worker
+    utils.executor.set_limiter(limiter)
+    _worker = VVV(**kwargs)
+    _worker.set_project_path(project_path)
+
+    if _worker.profile:
+        profiler.start()
+
+    _worker.setup()
+
+
+def _process_in_worker(fpaths):
+    """
+    Validate a chunk of files in a worker process.
+
+    :return: Tuple (recorded reporter events, abort flag, profiler data or None)
+    """
+    reporter = _worker.reporter
+    events = reporter.start_recording()
+    try:
+        abort = _worker.process_all(fpaths)
+    finally:
+        reporter.stop_recording(events)
+    reporter.clear()
+    profile = profiler.active.pop_data() if profiler.active else None
+    return events, abort, profile
+
 
 class BadCommmandLineError(RuntimeError):
     """
@@ -52,6 +99,84 @@ class BadCommmandLineError(RuntimeError):
     """
 
 
+def read_file_list(fpath):
+    """
+    Read paths from a file list given as @FILE on the command line, one path per line.
+    """
+    try:
+        with open(fpath, "rt") as f:
+            return [line.rstrip("\r\n") for line in f if line.strip()]
+    except (IOError, OSError) as e:
+        raise BadCommmandLineError("Could not read file list %s: %s" % (fpath, e))
+
+
+def read_stdin0(stream=None):
+    """
+    Read NUL separated paths, e.g. from ``git ls-files -z`` or ``find -print0``.
+    """
+    if stream is None:
+        stream = sys.stdin.buffer
+    return [os.fsdecode(path) for path in stream.read().split(b"\0") if path]
+
+
+def expand_targets(args, stdin0=False, stream=None):
+    """
+    Expand the targets given on the command line.
+
+    :param args: Files and folders, ``@FILE`` reads more paths from FILE
+
+    :param stdin0: Read more NUL separated paths from stdin
+
+    :return: List of paths or None if no targets were given at all
+    """
+
+    if not args and not stdin0:
+        return None
+
+    targets = []
+
+    for arg in args:
+        if arg.startswith("@"):
+            targets += read_file_list(arg[1:])
+        else:
+            targets.append(arg)
+
+    if stdin0:
+        targets += read_stdin0(stream)
+
+    return targets
+
+
+def group_targets(targets, options=None, files=None):
+    """
+    Group targets by the config files which apply to them.
+
+    :param options: validation-options.yaml used for all targets or None to look up one per target
+
+    :param files: validation-files.yaml used for all targets or None to look up one per target
+
+    :return: List of ((options path, files path), targets) in the order the groups were first seen
+    """
+
+    groups = {}
+    order = []
+
+    # Folder -> found config file, shared between the targets
+    found_options = {}
+    found_files = {}
+
+    for target in targets:
+        path = os.path.abspath(target)
+        key = (options or Config.find_config_file(path, "validation-options.yaml", found_options),
+               files or Config.find_config_file(path, "validation-files.yaml", found_files))
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(target)
+
+    return [(key, groups[key]) for key in order]
+
+
 class VVV(object):
     """
     Vi like this main class vor this project.
@@ -72,7 +197,19 @@ class VVV(object):
         #: Command line options
         self.options = self.files = self.verbose = self.target = \
         self.installation = self.reinstall = self.suicidal = \
-        self.include = self.regex_debug = self.quiet = self.print_files = None
+        self.include = self.regex_debug = self.quiet = self.print_files = \
+        self.jobs = self.processes = self.no_cache = self.changed_since = self.format = self.report_file = \
+        self.profile = self.profile_file = None
+
+        #: Files and folders given on the command line, validated with the same config files, or None
+        self.targets = None
+
+        #: List of files to validate instead of the target, or None
+        self.target_files = None
+
+        #: Object with create_context(project_path, relative) method giving
+        #: file content from somewhere else than the disk, e.g. git staging area, or None
+        self.file_reader = None
 
         #: Parsed option file data as Config object
         self.options_data = self.files_data = None
@@ -83,9 +220,27 @@ class VVV(object):
         #: Reporter instance collecting output
         self.reporter = None
 
+        #: Opened report file or None
+        self.report_stream = None
+
         #: File tree walker and match helper
         self.walker = None
 
+        #: Validation result cache or None if caching is disabled
+        self.cache = None
+
+        #: Installed validator software recorded in the installation folder
+        self.manifest = None
+
+        #: PluginIndex telling which plug-ins validate a file
+        self.plugin_index = None
+
+        #: Project root relative folder -> is it whitelisted in validation-files.yaml
+        self.whitelisted_folders = {}
+
+        #: Arguments given to the constructor, used to create VVV instances for other projects
+        self.arguments = kwargs
+
         # Copy in all arguments given to the constructor
         self.__dict__.update(kwargs)
 
@@ -106,21 +261,26 @@ class VVV(object):
         Scan all system installed eggs for plug-ins.
 
         We use entry point "vvv" where each entry point points to a constructor of a plug-in.
+        The found entry points are cached, see :py:mod:`vvv.entrypoints`.
 
         http://wiki.pylonshq.com/display/pylonscookbook/Using+Entry+Points+to+Write+Plugins
         """
 
-        for loader in iter_entry_points(group='vvv', name=None):
+        for name, value in entrypoints.find_entry_points(logger, self.installation):
+
+            # Do not import validators which are not used
+            if not self.options_data.get_boolean_option(name, "enabled", True):
+                logger.debug("Skipping disabled plug-in: %s", name)
+                continue
 
             try:
                 # Construct the plug-in instance
-                name = loader.name
-                klass = loader.load()
+                klass = entrypoints.load_entry_point(value)
                 instance = klass()
                 logger.debug("Loaded plug-in: %s", name)
                 self.plugins[name] = instance
             except Exception as e:
-                logger.error("Could not load plug-in: %s", loader)
+                logger.error("Could not load plug-in: %s = %s", name, value)
                 raise e
 
     def set_project_path(self, path):
@@ -155,6 +315,113 @@ class VVV(object):
         else:
             self.project_tree_scan = False
 
+        if self.changed_since:
+            self.target_files = self.get_changed_files(self.changed_since)
+        elif self.targets is not None and self.targets != [self.target]:
+            self.target_files = self.get_target_files()
+
+    def get_targets(self):
+        """
+        :return: List of files and folders to validate
+        """
+        if self.targets is not None:
+            return self.targets
+        return [self.target]
+
+    def get_target_files(self):
+        """
+        List the files in all targets, walking the target folders.
+
+        :return: List of full paths
+        """
+
+        fpaths = []
+        seen = set()
+
+        for target in self.get_targets():
+
+            if os.path.isdir(target):
+                found = (os.path.join(self.project_path, relative)
+                         for relative in self.walker.walk_project_files(target, self.project_path, self.matchlist))
+            elif os.path.exists(target):
+                found = [os.path.abspath(target)]
+            else:
+                logger.warn("Target does not exist: %s" % target)
+                continue
+
+            for fpath in found:
+                if fpath not in seen:
+                    seen.add(fpath)
+                    fpaths.append(fpath)
+
+        return fpaths
+
+    def get_changed_files(self, ref):
+        """
+        Ask git which files under the targets have been changed since a revision.
+
+        :param ref: git revision whose merge base with the working tree is compared
+
+        :return: List of full paths
+        """
+
+        # Circular import
+        # pylint: disable=W0404
+        from vvv.hooks import git
+
+        fpaths = []
+        seen = set()
+
+        for target in self.get_targets():
+
+            target = os.path.abspath(target)
+
+            tree_scan = os.path.isdir(target)
+
+            folder = target if tree_scan else os.path.dirname(target)
+
+            try:
+                changed = git.get_changed_files(logger, folder, ref)
+            except (OSError, ShellCommandFailed) as e:
+                raise BadCommmandLineError("Could not get files changed since %s: %s" % (ref, e))
+
+            if not tree_scan:
+                changed = [fpath for fpath in changed if fpath == target]
+
+            for fpath in changed:
+                if fpath not in seen:
+                    seen.add(fpath)
+                    fpaths.append(fpath)
+
+        logger.info("%d files changed since %s" % (len(fpaths), ref))
+
+        return fpaths
+
+    def split_by_project(self):
+        """
+        Group the targets by the config files which apply to them.
+
+        validation-options.yaml and validation-files.yaml are looked up once per folder.
+
+        :return: List of VVV instances, one per group of targets sharing the config files
+        """
+
+        if not self.targets or len(self.targets) == 1:
+            return [self]
+
+        groups = group_targets(self.targets, self.options, self.files)
+
+        if len(groups) == 1:
+            return [self]
+
+        projects = []
+        for (options, files), targets in groups:
+            # Relative targets would be resolved against the project root later on
+            targets = [os.path.abspath(target) for target in targets]
+            projects.append(VVV(**dict(self.arguments, options=options, files=files, target=targets[0], targets=targets)))
+
+        return projects
+
     def init_plugins(self):
         """
         Initialize all plug-ins.
@@ -181,7 +448,9 @@ class VVV(object):
                     files=self.files_data,
                     installation_path=plugin_installation,
                     walker=self.walker,
-                    project_path=self.project_path
+                    project_path=self.project_path,
+                    cache=self.cache,
+                    manifest=self.manifest
                 )
 
                 instance.setup_options()
@@ -198,8 +467,10 @@ class VVV(object):
 
         logger.info("Running vvv against %s" % path)
 
+        fpaths = self.walker.walk_project_files(path, self.project_path, self.matchlist)
+
         # Walk tree
-        for fpath in self.walker.walk_project_files(path, self.project_path, self.matchlist):
+        for fpath in profiler.measure_iterator("walker", "walk_project_files", fpaths):
 
             if self.print_files:
                 logger.info(fpath)
@@ -207,6 +478,140 @@ class VVV(object):
             if self.process(fpath):
                 return True
 
+        return self.flush()
+
+    def process_all(self, fpaths):
+        """
+        Run all validators against a list of files.
+
+        :return True: if the process should be aborted
+        """
+
+        for fpath in fpaths:
+            if self.process(fpath):
+                return True
+
+        return self.flush()
+
+    def get_jobs(self):
+        """
+        How many worker processes we use for validation.
+
+        0 means one worker per CPU.
+        """
+        if self.jobs is None:
+            return 1
+
+        if self.jobs <= 0:
+            return os.cpu_count() or 1
+
+        return self.jobs
+
+    def get_processes(self):
+        """
+        How many validator commands the asyncio scheduler keeps running at once.
+
+        0 means one per CPU. 1 means the scheduler is not used.
+        """
+        if self.processes is None:
+            return 1
+
+        if self.processes <= 0:
+            return os.cpu_count() or 1
+
+        return self.processes
+
+    def get_worker_options(self):
+        """
+        Constructor arguments for VVV instances running in worker processes.
+        """
+        return dict(options=self.options, files=self.files, installation=self.installation,
+                    target=self.target, verbose=self.verbose, quiet=self.quiet,
+                    suicidal=self.suicidal, regex_debug=self.regex_debug, no_cache=self.no_cache,
+                    file_reader=self.file_reader, profile=self.is_profiling())
+
+    def install_plugins(self, fpaths):
+        """
+        Install validators needed for the files before starting worker processes.
+
+        Otherwise several workers would try to download and install the same software simultaneously.
+        """
+        for plugin_id, p in self.plugins.items():
+
+            if not p.is_active():
+                continue
+
+            if not any(p.match(fpath) for fpath in fpaths):
+                continue
+
+            try:
+                p.install_on_demand()
+            except Exception as e:
+                # Workers will retry and report the failure against each file
+                logger.debug("Could not install plug-in %s: %s", plugin_id, e)
+
+    def walk_parallel(self, path):
+        """
+        Walk a project tree and run plug-ins in a pool of worker processes.
+
+        :return True: if the process should be aborted
+        """
+
+        logger.info("Running vvv against %s using %d workers" % (path, self.get_jobs()))
+
+        fpaths = self.walker.walk_project_files(path, self.project_path, self.matchlist)
+
+        return self.process_parallel(profiler.measure_iterator("walker", "walk_project_files", fpaths))
+
+    def process_parallel(self, fpaths):
+        """
+        Run plug-ins against files in a pool of worker processes.
+
+        Each worker sets up its own plug-ins. Reports from workers are collected
+        in the order of sorted file paths, so the output does not depend on scheduling.
+
+        :param fpaths: Project root relative paths
+
+        :return True: if the process should be aborted
+        """
+
+        jobs = self.get_jobs()
+
+        fpaths = sorted(fpaths)
+
+        if self.print_files:
+            for fpath in fpaths:
+                logger.info(fpath)
+
+        self.install_plugins(fpaths)
+
+        # Hand out files in chunks to reduce IPC and to allow batch validation,
+        # but keep chunks small enough for good balance
+        chunksize = max(1, len(fpaths) // (jobs * 4))
+        chunks = [fpaths[i:i + chunksize] for i in range(0, len(fpaths), chunksize)]
+
+        # Imported only when needed to keep the start up fast
+        import multiprocessing
+
+        # Workers share the cap of validator processes running at once
+        limiter = multiprocessing.BoundedSemaphore(os.cpu_count() or 1)
+
+        with multiprocessing.Pool(jobs, _init_worker, (self.get_worker_options(), self.project_path, limiter)) as pool:
+
+            for events, abort, profile in pool.imap(_process_in_worker, chunks):
+
+                if profile:
+                    profiler.active.merge(profile)
+
+                try:
+                    self.reporter.replay(events)
+                except FirstError:
+                    logger.info("Aborting on the first error")
+                    return True
+
+                if abort:
+                    return True
+
         return False
 
     def read_config(self):
@@ -214,11 +619,14 @@ class VVV(object):
         Load config files.
         """
 
+        self.config_cache = ConfigCache(logger, os.path.join(self.installation, "config-cache"))
+
         logger.debug("Using options config file: %s" % self.options)
 
         if self.options and os.path.exists(self.options):
             self.options_data = Config(self.options)
-            self.options_data.load()
+            with profiler.measure("config", "validation-options.yaml"):
+                self.options_data.load(self.config_cache)
         else:
             logger.warn("No validation-options.yaml config file found, using defaults")
             self.options_data = Config()
@@ -227,7 +635,8 @@ class VVV(object):
 
         if self.files and os.path.exists(self.files):
             self.files_data = Config(self.files)
-            self.files_data.load()
+            with profiler.measure("config", "validation-files.yaml"):
+                self.files_data.load(self.config_cache)
         else:
             raise BadCommmandLineError("Given validation-files.yaml does not exist")
 
@@ -241,7 +650,33 @@ class VVV(object):
         """
 
         # XXX: Individual plug-ins need this check also
-        return self.walker.is_whitelisted(fpath, self.project_path, self.matchlist)
+        relative = os.path.relpath(os.path.join(self.project_path, fpath), self.project_path)
+
+        if not utils.match_file(relative, self.matchlist):
+            return False
+
+        return self.is_folder_whitelisted(os.path.dirname(relative))
+
+    def is_folder_whitelisted(self, folder):
+        """
+        Check that a folder and all its parent folders are whitelisted.
+
+        The verdicts are remembered, so that files in the same folders are checked quickly.
+
+        :param folder: Project root relative folder, empty for the project root
+        """
+
+        if not folder:
+            return True
+
+        whitelisted = self.whitelisted_folders.get(folder)
+
+        if whitelisted is None:
+            parent = os.path.dirname(folder)
+            whitelisted = bool(utils.match_file(folder, self.matchlist)) and self.is_folder_whitelisted(parent)
+            self.whitelisted_folders[folder] = whitelisted
+
+        return whitelisted
 
     def process(self, fpath):
         """
@@ -261,19 +696,72 @@ class VVV(object):
         if self.print_files:
             logger.info(abs_path)
 
+        # The file is read only once and shared by all plug-ins
+        context = self.create_context(relative)
+
+        # Only plug-ins whose match lists accept the file are called
+        plugins = self.plugin_index.get_plugins(relative)
+
+        # Cheap in-line checks go first, walking the file lines only once
+        line_plugins = [p for p in plugins if isinstance(p, TextLinePlugin)]
+
+        try:
+            run_text_line_plugins(line_plugins, context, matched=True)
+        except FirstError:
+            logger.info("Aborting on the first error")
+            return True
+
+        for p in plugins:
+
+            if isinstance(p, TextLinePlugin):
+                continue
+
+            if self.call_plugin(p.id, p.run, relative, context, True):
+                return True
+
+        return False
+
+    def create_context(self, relative):
+        """
+        :param relative: Project root relative path
+
+        :return: FileContext for the file
+        """
+        if self.file_reader:
+            return self.file_reader.create_context(self.project_path, relative)
+        return FileContext(self.project_path, relative)
+
+    def flush(self):
+        """
+        Validate files queued by batch friendly plug-ins.
+
+        :return True: if the process should be aborted
+        """
+
         for plugin_id, p in self.plugins.items():
-            try:
-                p.run(relative)
-            except FirstError:
-                logger.info("Aborting on the first error")
+            if self.call_plugin(plugin_id, p.flush):
                 return True
-            except Exception as e:
-                etype, value, tb = sys.exc_info()
-                msg = ''.join(format_exception(etype, value, tb))
-                self.reporter.report_internal_error(plugin_id, msg)
 
-                if self.suicidal:
-                    raise e
+        return False
+
+    def call_plugin(self, plugin_id, func, *args):
+        """
+        Call a plug-in method and report any exception as an internal error.
+
+        :return True: if the process should be aborted
+        """
+        try:
+            func(*args)
+        except FirstError:
+            logger.info("Aborting on the first error")
+            return True
+        except Exception as e:
+            etype, value, tb = sys.exc_info()
+            msg = ''.join(format_exception(etype, value, tb))
+            self.reporter.report_internal_error(plugin_id, msg)
+
+            if self.suicidal:
+                raise e
 
         return False
 
@@ -291,7 +779,7 @@ class VVV(object):
         """
 
         if self.target is None:
-            self.target = os.getcwd()
+            self.target = self.targets[0] if self.targets else os.getcwd()
 
         if self.options is None:
             self.options = Config.find_config_file(self.target, "validation-options.yaml")
@@ -320,20 +808,56 @@ class VVV(object):
         """
         Prepare for a run.
         """
-        self.reporter = Reporter(suicidal=self.suicidal)
+        # Projects of the same run share the reporter, see run_projects()
+        if self.reporter is None:
+            self.reporter = self.create_reporter()
 
         self.walker = Walker(logger, self.regex_debug)
 
+        if not self.no_cache:
+            self.cache = ResultCache(logger, os.path.join(self.installation, "cache"))
+
+        self.manifest = ToolchainManifest(logger, self.installation)
+
+    def create_reporter(self):
+        """
+        Create reporter for the chosen output format.
+
+        Machine readable formats are written to the report file or stdout as the reports come in.
+        """
+
+        if self.format in (None, "text"):
+            return Reporter(suicidal=self.suicidal)
+
+        klass = STREAM_REPORTERS.get(self.format)
+        if not klass:
+            raise BadCommmandLineError("Unknown output format: %s" % self.format)
+
+        if self.report_file:
+            self.report_stream = open(self.report_file, "wt")
+            stream = self.report_stream
+        else:
+            stream = sys.stdout
+
+        return klass(suicidal=self.suicidal, stream=stream)
+
     def setup_output(self):
         """
         Set how we deal with output.
         """
+
+        # Keep stdout clean for machine readable output
+        if self.format not in (None, "text") and not self.report_file:
+            stream = sys.stderr
+        else:
+            stream = sys.stdout
+
         if self.quiet:
-            logging.basicConfig(level=logging.ERROR, stream=sys.stdout, format=LOG_FORMAT)
+            logging.basicConfig(level=logging.ERROR, stream=stream, format=LOG_FORMAT)
         elif self.verbose:
-            logging.basicConfig(level=logging.DEBUG, stream=sys.stdout, format=LOG_FORMAT)
+            logging.basicConfig(level=logging.DEBUG, stream=stream, format=LOG_FORMAT)
         else:
-            logging.basicConfig(level=logging.INFO, stream=sys.stdout, format=LOG_FORMAT)
+            logging.basicConfig(level=logging.INFO, stream=stream, format=LOG_FORMAT)
 
     def validate_files(self):
         """
@@ -342,73 +866,253 @@ class VVV(object):
         http://www.youtube.com/watch?v=He82NBjJqf8
         """
 
-        if self.project_tree_scan:
+        if self.get_processes() <= 1 or self.get_jobs() > 1:
+            self.validate_targets()
+            return
+
+        # Imported only when needed to keep the start up fast
+        from .scheduler import AsyncScheduler
+
+        logger.debug("Running up to %d validator commands at once" % self.get_processes())
+
+        scheduler = AsyncScheduler(logger, self.reporter, self.get_processes())
+        scheduler.start(self.plugins.values())
+
+        try:
+            if not self.validate_targets():
+                scheduler.finish()
+        except FirstError:
+            logger.info("Aborting on the first error")
+        finally:
+            scheduler.stop()
+
+    def validate_targets(self):
+        """
+        Validate the target files, folders or the project tree.
+
+        :return True: if the process should be aborted
+        """
+
+        if self.target_files is not None:
+            # Explicit list of files, e.g. from a commit hook
+            return self.validate_file_list(self.target_files)
+        elif self.project_tree_scan:
             # Full tree
             logger.debug("Scanning tree: %s" % self.target)
-            self.walk(self.target)
+            if self.get_jobs() > 1:
+                return self.walk_parallel(self.target)
+            else:
+                return self.walk(self.target)
         else:
             # Single file
             if not self.check_is_processable(self.target):
                 logger.warn("Single target was not scan whitelist: %s" % self.target)
-                return
+                return False
 
             logger.debug("Scanning single file: %s" % self.target)
-            self.process(self.target)
+            return self.process_all([self.target])
+
+    def validate_file_list(self, fpaths):
+        """
+        Validate a list of files in one run.
+
+        Files not whitelisted in validation-files.yaml are skipped.
+
+        :param fpaths: Absolute paths or paths relative to the current working directory
+
+        :return True: if the process should be aborted
+        """
+
+        relatives = []
+
+        for fpath in fpaths:
+            relative = os.path.relpath(os.path.abspath(fpath), self.project_path)
+            if self.check_is_processable(relative):
+                relatives.append(relative)
+            else:
+                logger.debug("Not on scan whitelist: %s" % fpath)
+
+        logger.debug("Scanning %d files" % len(relatives))
+
+        if self.get_jobs() > 1 and len(relatives) > 1:
+            return self.process_parallel(relatives)
+
+        return self.process_all(relatives)
+
+    def setup(self):
+        """
+        Read configuration and initialize plug-ins.
+
+        Also used to set up worker processes.
+        """
+
+        self.post_process_options()
+
+        self.setup_output()
+
+        self.read_config()
+
+        with profiler.measure("config", "find_plugins"):
+            self.find_plugins()
+
+        self.prepare()
+
+        self.setup_options()
+
+        self.determine_project_path()
+
+        self.determine_target()
+
+        with profiler.measure("config", "init_plugins"):
+            self.init_plugins()
+
+        self.plugin_index = PluginIndex(self.plugins.values())
+
+        # All match lists have been built, store their pattern translations for the next run
+        for config in (self.options_data, self.files_data):
+            self.config_cache.save(config)
 
     def run(self):
         """
         Run the show.
 
-        XXX: Split to several parts which can be called individually,
-        so that we can have better control over this from unit tests.
-
         :return: System exit return code
         """
 
+        if self.is_profiling():
+            profiler.start()
+
         try:
-            self.post_process_options()
+            self.validate_project()
+        except BadCommmandLineError as cmd_line_error:
+            print(cmd_line_error, file=sys.stderr)
+            return BAD_COMMAND_LINE_EXIT_CODE
 
-            self.setup_output()
+        result = self.report()
 
-            self.read_config()
+        if self.is_profiling():
+            self.report_profile()
 
-            self.find_plugins()
+        return result
 
-            self.prepare()
+    def run_projects(self):
+        """
+        Run the show for targets in different projects, see :py:meth:`split_by_project`.
 
-            self.setup_options()
+        The projects share the reporter, the report file and the profiler,
+        so the run gives one report and one profile.
 
-            self.determine_project_path()
+        :return: System exit return code
+        """
 
-            self.determine_target()
+        projects = self.split_by_project()
 
-            self.init_plugins()
+        if len(projects) == 1:
+            return projects[0].run()
 
-            if self.reinstall:
-                self.nuke()
+        first = projects[0]
+
+        if self.is_profiling():
+            profiler.start()
+
+        try:
+            for project in projects:
+                project.reporter = first.reporter
+                project.validate_project()
+
+                if self.suicidal and first.reporter.has_errors():
+                    break
 
         except BadCommmandLineError as cmd_line_error:
             print(cmd_line_error, file=sys.stderr)
             return BAD_COMMAND_LINE_EXIT_CODE
 
-        self.validate_files()
+        result = first.report()
+
+        if self.is_profiling():
+            first.report_profile()
+
+        return result
+
+    def validate_project(self):
+        """
+        Set up and validate the files without reporting the results.
+
+        Raises BadCommmandLineError if the options do not make sense.
+        """
+
+        self.setup()
+
+        if self.reinstall:
+            self.nuke()
+
+        try:
+            self.validate_files()
+        finally:
+            self.close_plugins()
+
+        if self.cache:
+            self.cache.evict_if_due()
+
+    def close_plugins(self):
+        """
+        Let plug-ins stop their worker processes.
+        """
+        for plugin_id, p in self.plugins.items():
+            try:
+                p.close()
+            except Exception as e:
+                logger.debug("Could not close plug-in %s: %s", plugin_id, e)
+
+    def is_profiling(self):
+        """
+        :return True: If we collect timing information
+        """
+        return bool(self.profile or self.profile_file)
+
+    def report_profile(self):
+        """
+        Output timing information and stop profiling.
+        """
+
+        if self.profile:
+            logger.info(profiler.active.format_report())
+
+        if self.profile_file:
+            profiler.active.save(self.profile_file)
 
-        return self.report()
+        profiler.stop()
 
     def report(self):
         """
         Give output what we found and set sys exit code.
         """
+        self.reporter.close()
+
+        if self.report_stream:
+            self.report_stream.close()
+            self.report_stream = None
+
         self.output = self.reporter.get_output_as_text()
 
         if self.output != "":
-            logger.info(self.output)
+            if self.report_file:
+                with open(self.report_file, "wt") as f:
+                    f.write(self.output + "\n")
+            else:
+                logger.info(self.output)
+
+        if self.reporter.has_errors() or self.reporter.hints:
             return 2
         else:
             #logger.info("All files ok")
             return 0
 
-@plac.annotations( \
+# W0622 Redefining built-in format: plac takes option names from the argument names
+# pylint: disable=W0622
+
+#: Command line options for plac
+COMMAND_LINE_OPTIONS = dict(
     options=("Validation options file. Default is validation-options.yaml", 'option', 'o', None, None, "validation-options.yaml"),
     files=("Validation allowed files list file. Default is validation-files.yaml", "option", "f", None, None, "validation-files.yaml"),
     installation=("Where automatically downloaded files are kept. Defaults to hidden .vvv directory in home folder", "option", "i", None, None, ".vvv"),
@@ -418,9 +1122,44 @@ class VVV(object):
     printfiles=("Output scanned files to stdout", "flag", "print"),
     regexdebug=("Print out regex matching information to debug file list regular expressions", "flag", "rd"),
     quiet=("Only output fatal internal errors to stdout", "flag", "q"),
-    target=("Path to a project folder or a file. Use . for the current working directory.", "positional", None, None, None, "YOUR-SOURCE-CODE-FOLDER"),
-    )
-def main(options, files, installation, verbose, reinstall, suicidal, printfiles, regexdebug, quiet, target):
+    no_cache=("Always run validators instead of using results cached from the previous runs", "flag", "nc"),
+    jobs=("Validate files using N parallel worker processes. 0 uses all CPUs. Default is 1.", "option", "j", int, None, "N"),
+    processes=("Keep N validator commands running at once in one process. 0 uses all CPUs. Default is 1.", "option", "p", int, None, "N"),
+    format=("Output format: text, jsonl (JSON Lines) or sarif. Default is text.", "option", "fmt", None, ("text", "jsonl", "sarif"), "FORMAT"),
+    report_file=("Write the report to FILE instead of stdout", "option", "rf", None, None, "FILE"),
+    profile=("Print timing information of validators, subprocesses and the slowest files at the end of the run", "flag", "prof"),
+    profile_file=("Write timing information as JSON to FILE", "option", "pf", None, None, "FILE"),
+    changed_since=("Only validate files changed in git since the merge base with REF, e.g. origin/master", "option", "cs", None, None, "REF"),
+    stdin0=("Read more NUL separated paths to validate from stdin, e.g. from git ls-files -z", "flag", "0"),
+    target=("Paths to project folders or files. Use . for the current working directory. @FILE reads paths from FILE, one per line.", "positional", None, None, None, "YOUR-SOURCE-CODE-FOLDER"),
+)
+
+
+@plac.annotations(**COMMAND_LINE_OPTIONS)
+def create(options, files, installation, verbose, reinstall, suicidal, printfiles, regexdebug, quiet, no_cache, jobs, processes, format, report_file, profile, profile_file, changed_since, stdin0, *target):
+    """
+    Create VVV instance from command line options without running it.
+
+    Targets are grouped by the validation-options.yaml and validation-files.yaml
+    which apply to them and each group is validated with its own config files,
+    see :py:meth:`VVV.run_projects`.
+    """
+    try:
+        targets = expand_targets(target, stdin0)
+    except BadCommmandLineError as cmd_line_error:
+        print(cmd_line_error, file=sys.stderr)
+        sys.exit(BAD_COMMAND_LINE_EXIT_CODE)
+
+    return VVV(options=options, files=files, verbose=verbose,
+               target=targets[0] if targets and len(targets) == 1 else None, targets=targets,
+               installation=installation, reinstall=reinstall, quiet=quiet,
+               suicidal=suicidal, include=None, regex_debug=regexdebug, print_files=printfiles,
+               no_cache=no_cache, jobs=jobs, processes=processes, format=format, report_file=report_file,
+               profile=profile, profile_file=profile_file, changed_since=changed_since)
+
+
+@plac.annotations(**COMMAND_LINE_OPTIONS)
+def main(options, files, installation, verbose, reinstall, suicidal, printfiles, regexdebug, quiet, no_cache, jobs, processes, format, report_file, profile, profile_file, changed_since, stdin0, *target):
     """
     A convenience utility for software source code validation and linting.
 
@@ -429,16 +1168,20 @@ def main(options, files, installation, verbose, reinstall, suicidal, printfiles,
     Example how to scan the current source tree for issues:
 
         vvv .
+
+    Example how to validate all files known to git:
+
+        git ls-files -z | vvv --stdin0
     """
 
     # Application starting point without parsing the command line.
 
     # http://plac.googlecode.com/hg/doc/plac.html#scripts-with-default-arguments
 
-    vvv = VVV(options=options, files=files, verbose=verbose, target=target,
-              installation=installation, reinstall=reinstall, quiet=quiet,
-              suicidal=suicidal, include=None, regex_debug=regexdebug, print_files=printfiles)
-    sys.exit(vvv.run())
+    vvv = create(options, files, installation, verbose, reinstall, suicidal, printfiles, regexdebug, quiet, no_cache, jobs, processes, format, report_file, profile, profile_file, changed_since, stdin0, *target)
+
+    # Targets in different projects are validated one project at a time in the same process
+    sys.exit(vvv.run_projects())
 
 
 def entry_point():
@@ -0,0 +1,144 @@
+"""
+
+    Toolchain manifest.
+
+    Records which validator software is installed, where and which version,
+    in ``toolchain.json`` in the installation folder (``~/.vvv``).
+    Later runs trust the manifest instead of probing the installation
+    with ``check_is_installed()``, which may scan the whole ``PATH``.
+
+    An entry is used only when
+
+    * the plug-in options and ``PATH`` are the same as when the entry was written
+
+    * the recorded tool file has the same modification time and size,
+      so upgrading the tool outside VVV is noticed with one ``stat()`` call
+
+    The recorded version is part of the validation result cache keys,
+    so cached results are not used after the tool has been upgraded.
+
+"""
+
+# Python imports
+import os
+import json
+import tempfile
+
+#: Bump this when the format of the manifest changes
+MANIFEST_FORMAT_VERSION = 1
+
+#: Manifest file name in the installation folder
+MANIFEST_FILE = "toolchain.json"
+
+
+def get_stamp(fpath):
+    """
+    :return: [modification time, size] of a file or None if it does not exist
+    """
+    if not fpath:
+        return None
+
+    try:
+        stat = os.stat(fpath)
+    except OSError:
+        return None
+
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class ToolchainManifest(object):
+    """
+    Installed validator software, stored as JSON.
+
+    Entries are kept per plug-in id and installation key, so that projects
+    with different options do not overwrite each other's entries.
+    """
+
+    def __init__(self, logger, installation):
+        """
+        :param installation: VVV installation folder
+        """
+        self.logger = logger
+        self.path = os.path.join(installation, MANIFEST_FILE)
+
+        #: Plug-in id -> entry, read when first needed
+        self.entries = None
+
+    def read(self):
+        """
+        :return: Dict of entries on the disk
+        """
+        try:
+            with open(self.path, "rt") as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_FORMAT_VERSION:
+            return {}
+
+        return data.get("tools", {})
+
+    def get(self, plugin_id, key):
+        """
+        Look up a valid entry.
+
+        :param key: Installation key of the plug-in, see Plugin.get_installation_key()
+
+        :return: Entry as dict(path, stamp, version) or None
+        """
+
+        if self.entries is None:
+            self.entries = self.read()
+
+        entry = self.entries.get(plugin_id, {}).get(key)
+
+        if not entry:
+            return None
+
+        if entry.get("path") and get_stamp(entry["path"]) != entry.get("stamp"):
+            self.logger.debug("Installed tool of %s has changed: %s", plugin_id, entry["path"])
+            return None
+
+        return entry
+
+    def put(self, plugin_id, key, path, version):
+        """
+        Record installed tool and write the manifest.
+
+        Entries written by other VVV processes in the meanwhile are kept.
+
+        :param path: Main executable or file of the tool, checked on later runs, or None
+
+        :param version: Tool version string or None
+
+        :return: Recorded entry
+        """
+
+        entry = dict(path=path, stamp=get_stamp(path), version=version)
+
+        entries = self.read()
+        entries.setdefault(plugin_id, {})[key] = entry
+
+        if self.entries is not None:
+            self.entries.setdefault(plugin_id, {})[key] = entry
+
+        folder = os.path.dirname(self.path)
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=folder)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not write toolchain manifest %s: %s", self.path, e)
+            return entry
+
+        try:
+            with os.fdopen(fd, "wt") as f:
+                json.dump(dict(version=MANIFEST_FORMAT_VERSION, tools=entries), f, indent=2, sort_keys=True)
+            os.replace(temp, self.path)
+        except (IOError, OSError) as e:
+            self.logger.debug("Could not write toolchain manifest %s: %s", self.path, e)
+            if os.path.exists(temp):
+                os.unlink(temp)
+
+        return entry
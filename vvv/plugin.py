@@ -16,12 +16,21 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 # Python imports
 import logging
 import os
-import subprocess
+import json
+import shlex
+import threading
 
 # Local imports
 from vvv import utils
 # TODO: Factor there to use utils. prefix
-from .utils import is_binary_file, match_file
+from .utils import match_file
+from .cache import hash_data
+from .filecontext import FileContext
+from .worker import WorkerPool, WorkerFailed, WorkerStartFailed
+from vvv import profiler
+
+#: How many files batch friendly plug-ins validate at once by default
+DEFAULT_BATCH_SIZE = 200
 
 
 class Plugin(object):
@@ -44,7 +53,43 @@ class Plugin(object):
 
         self.id = self.main = self.reporter = self.options = self.files = self.installation_path = self.project_path = self.walker = None
 
-    def init(self, plugin_id, main, reporter, options, files, installation_path, walker, project_path):
+        #: ResultCache instance or None if validation results are not cached
+        self.cache = None
+
+        #: Memoized get_options_hash() result
+        self.options_hash = None
+
+        #: How many files are passed to validate_batch() at once
+        self.batch_size = None
+
+        #: Files waiting for validate_batch() as (full path, cache key) tuples
+        self.batch = []
+
+        #: Seconds after which an external validator command is killed, or None to wait forever
+        self.timeout = None
+
+        #: ToolchainManifest instance or None if installations are not recorded
+        self.manifest = None
+
+        #: Is the validator software installed, None if not resolved yet during this run
+        self.installed = None
+
+        #: Toolchain manifest entry of the installed software or None
+        self.toolchain = None
+
+        #: AsyncScheduler running validator commands concurrently, or None to run them right away
+        self.scheduler = None
+
+        #: Validate files in a long running process if the plug-in supports it
+        self.worker_enabled = True
+
+        #: WorkerPool started on the first use, or None
+        self.workers = None
+
+        #: Guards creating the WorkerPool, AsyncScheduler validates files of a plug-in in several threads
+        self.workers_lock = threading.Lock()
+
+    def init(self, plugin_id, main, reporter, options, files, installation_path, walker, project_path, cache=None, manifest=None):
         """
 
         :param plugin_id: internal id is externally set and comes from setup.py entry point name
@@ -60,6 +105,10 @@ class Plugin(object):
         :param files: Config instance of files whitelist / blacklist
 
         :param project_path: Path to the project root directory (where the config files are)
+
+        :param cache: ResultCache instance for storing validation results between runs or None
+
+        :param manifest: ToolchainManifest instance for recording installed validator software or None
         """
         assert project_path
         self.id = plugin_id
@@ -71,6 +120,8 @@ class Plugin(object):
         self.installation_path = installation_path
         self.walker = walker
         self.project_path = project_path
+        self.cache = cache
+        self.manifest = manifest
 
     def is_active(self):
         """
@@ -84,12 +135,91 @@ class Plugin(object):
         """
         return False
 
+    def is_batch_friendly(self):
+        """
+        :return True: If this plug-in can validate many files at once with validate_batch()
+        """
+        return False
+
+    def is_context_friendly(self):
+        """
+        :return True: If this plug-in validates the content of FileContext and never reads the file from the disk
+        """
+        return False
+
+    def is_worker_friendly(self):
+        """
+        :return True: If this plug-in can validate files in a long running process, see create_worker()
+        """
+        return False
+
+    def uses_worker(self):
+        """
+        :return True: If files are validated with validate_in_worker()
+        """
+        return self.worker_enabled and self.is_worker_friendly()
+
+    def is_subprocess_bound(self):
+        """
+        :return True: If validation mostly waits for an external command, so it can be run concurrently by AsyncScheduler
+        """
+        return not self.is_context_friendly()
+
     def get_default_matchlist(self):
         """
         Plug-in specific whitelist
         """
         return []
 
+    def create_worker(self):
+        """
+        Subclass **must** override this if is_worker_friendly() is True.
+
+        :return: vvv.worker.WorkerProcess instance, not started yet
+        """
+        raise NotImplementedError("Subclass must implement")
+
+    def validate_in_worker(self, request):
+        """
+        Send a request to a long running validator process.
+
+        If the worker cannot be started, workers are not used for the rest of the run.
+
+        :param request: JSON serializable dict
+
+        :return: Response dict, or None if the worker failed and the validator command should be run instead
+        """
+
+        with self.workers_lock:
+            if self.workers is None:
+                size = self.scheduler.processes if self.scheduler else 1
+                self.workers = WorkerPool(self.create_worker, size)
+            workers = self.workers
+
+        try:
+            response = workers.request(request)
+            if "error" in response:
+                raise WorkerFailed(response["error"])
+            return response
+        except WorkerStartFailed as e:
+            self.logger.warn("%s: running the validator command for each file, as the worker could not be started: %s" % (self.id, e))
+            self.worker_enabled = False
+        except WorkerFailed as e:
+            self.logger.warn("%s: running the validator command, as the worker failed: %s" % (self.id, e))
+
+        return None
+
+    def close(self):
+        """
+        All files have been validated, release what was kept for the run, e.g. worker processes.
+        """
+        with self.workers_lock:
+            workers = self.workers
+            self.workers = None
+
+        if workers is not None:
+            workers.close()
+
     def match(self, fullpath):
         """
         Check if a path matches plug-in filtering options.
@@ -124,6 +254,12 @@ class Plugin(object):
         # Hint message how to fix errors
         self.hint = self.options.get_string_option(self.id, "hint", None)
 
+        self.batch_size = self.options.get_int_option(self.id, "batch-size", DEFAULT_BATCH_SIZE)
+
+        self.timeout = self.options.get_int_option(self.id, "timeout", None)
+
+        self.worker_enabled = self.options.get_boolean_option(self.id, "worker", True)
+
     def setup_local_options(self):
         """
         Subclass **should** override this for
@@ -161,17 +297,93 @@ class Plugin(object):
         Download & install the validator app.
         """
 
+    def get_tool_path(self):
+        """
+        Main executable or file of the installed validator software.
+
+        Recorded in the toolchain manifest. If the file changes, e.g. the tool is upgraded,
+        the installation is checked again and cached validation results are not used.
+
+        :return: Path or None
+        """
+        return None
+
+    def get_tool_version(self):
+        """
+        :return: Version string of the installed validator software, if known without running it, or None
+        """
+        return None
+
+    def get_installation_key(self):
+        """
+        What the installation depends on: plug-in options like ``host-python-env`` and commands looked up from ``PATH``.
+        """
+        section = self.options.config.get(self.id)
+        return hash_data(json.dumps([self.__class__.__name__, section, os.environ.get("PATH", "")], sort_keys=True, default=str))
+
+    def resolve_installation(self):
+        """
+        Find out if the validator software is installed, once per run.
+
+        The toolchain manifest is trusted if it has an entry, otherwise check_is_installed() is called.
+
+        :return: True if installed
+        """
+
+        if self.installed is not None:
+            return self.installed
+
+        key = self.get_installation_key()
+
+        if self.manifest:
+            self.toolchain = self.manifest.get(self.id, key)
+            if self.toolchain:
+                self.installed = True
+                return True
+
+        self.installed = bool(self.check_is_installed())
+
+        if self.installed:
+            self.record_installation()
+
+        return self.installed
+
+    def record_installation(self):
+        """
+        Store the installed software in the toolchain manifest.
+        """
+
+        path = self.get_tool_path()
+        version = self.get_tool_version()
+
+        if self.manifest:
+            self.toolchain = self.manifest.put(self.id, self.get_installation_key(), path, version)
+        else:
+            self.toolchain = dict(path=path, version=version)
+
+        # The options hash includes the tool version
+        self.options_hash = None
+
     def install_on_demand(self):
         """
         See if we are already installed. If not install required binary blobs and other crap to run this validator.
+
+        The installation is checked only once per run.
         """
-        if not self.check_is_installed():
-            self.logger.info("Installing software for validator: %s" % self.id)
-            self.check_requirements()
-            self.init_installation()
-            self.install()
-        else:
-            self.logger.debug("Plug-in was already installed: %s" % self.id)
+
+        if self.installed:
+            return
+
+        with profiler.measure("install", self.id):
+            if not self.resolve_installation():
+                self.logger.info("Installing software for validator: %s" % self.id)
+                self.check_requirements()
+                self.init_installation()
+                self.install()
+                self.installed = True
+                self.record_installation()
+            else:
+                self.logger.debug("Plug-in was already installed: %s" % self.id)
 
     def validate(self, fullpath):
         """
@@ -183,6 +395,316 @@ class Plugin(object):
         """
         raise NotImplementedError("Subclass must implement")
 
+    def validate_context(self, context):
+        """
+        Run the validator against a file already loaded in memory.
+
+        Override this if the validator can use the file content read by VVV.
+        By default validate() is called with the file path.
+
+        :param context: FileContext instance
+
+        :return: True if the validation success
+        """
+        return self.validate(context.fullpath)
+
+    def validate_batch(self, fullpaths):
+        """
+        Run the validator against several files at once.
+
+        Output results to the self.reporter per file.
+
+        Batch friendly plug-ins override this to run the validator command once for many files.
+        By default validate() is called for each file.
+
+        :param fullpaths: List of file paths
+
+        :return: Dict file path -> True if the validation success
+        """
+        return dict((fullpath, self.validate(fullpath)) for fullpath in fullpaths)
+
+    def run_batch_command(self, fullpaths, command, get_fname):
+        """
+        Helper for validate_batch() running a validator command for several files at once.
+
+        File names are split to several command lines if needed.
+        The combined output is split back to files and reported per file.
+        If the command fails and the failure cannot be traced back to any file,
+        or some output belongs to an unrecognized file, the files are validated one by one with validate().
+
+        :param command: Function(list of file paths) returning tuple (failed, output)
+
+        :param get_fname: Function(list of file paths) returning a get_fname function for utils.split_output()
+
+        :return: Dict file path -> True if the validation success
+        """
+
+        results = {}
+
+        for chunk in utils.split_arguments(fullpaths):
+
+            failed, output = command(chunk)
+
+            outputs = utils.split_output(output, get_fname(chunk))
+
+            chunk_results = dict((fname, not outputs.get(fname, "").strip()) for fname in chunk)
+
+            # Output for something we did not recognize as one of our files
+            unknown = [key for key in outputs if key is not None and key not in chunk_results]
+
+            if unknown or (failed and all(chunk_results.values())):
+                self.logger.debug("%s: could not split batch output, validating files one by one" % self.id)
+                results.update(Plugin.validate_batch(self, chunk))
+                continue
+
+            for fname in chunk:
+                if not chunk_results[fname]:
+                    self.reporter.report_unstructured(self.id, outputs[fname], fname=fname)
+
+            results.update(chunk_results)
+
+        return results
+
+    def queue(self, context):
+        """
+        Add a file to be validated with validate_batch().
+
+        Cached results are replayed immediately.
+        """
+
+        key, cached = self.lookup_cached(context)
+
+        if cached:
+            return
+
+        self.batch.append((context.fullpath, key))
+
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def lookup_cached(self, context):
+        """
+        Replay the cached result of a file if we have one.
+
+        :return: Tuple (cache key or None if caching is disabled, True if the cached result was replayed)
+        """
+
+        if not self.cache:
+            return None, False
+
+        key = self.get_cache_key(context)
+        entry = self.cache.get(key)
+
+        if entry is None:
+            return key, False
+
+        if not self.replay_cached(context, entry):
+            self.hint_to_fix_errors()
+
+        return key, True
+
+    def submit(self, context):
+        """
+        Validate a file with validate_context() in AsyncScheduler, unless the result is cached.
+        """
+
+        key, cached = self.lookup_cached(context)
+
+        if cached:
+            return
+
+        self.install_on_demand()
+
+        self.scheduler.submit(self, [(context.fullpath, key)], context)
+
+    def flush(self):
+        """
+        Validate all files waiting in the batch queue.
+        """
+
+        if not self.batch:
+            return
+
+        batch = self.batch
+        self.batch = []
+
+        self.install_on_demand()
+
+        if self.scheduler and self.is_subprocess_bound():
+            self.scheduler.submit(self, batch)
+            return
+
+        events, results = self.validate_recorded([fullpath for fullpath, key in batch])
+
+        self.finish_batch(batch, events, results)
+
+    def validate_recorded(self, fullpaths, context=None):
+        """
+        Validate files with validate_batch(), or one file with validate_context(), recording the reports.
+
+        :param context: FileContext of the only file, or None
+
+        :return: Tuple (recorded reporter events, dict file path -> True if the validation success)
+        """
+
+        self.logger.debug("Applying plug-in %s on %d files" % (self.id, len(fullpaths)))
+
+        events = self.reporter.start_recording()
+        try:
+            with profiler.measure("validate", self.id, fullpaths):
+                if context is not None:
+                    results = {context.fullpath: self.validate_context(context)}
+                else:
+                    results = self.validate_batch(fullpaths)
+        finally:
+            self.reporter.stop_recording(events)
+
+        return events, results
+
+    def finish_batch(self, batch, events, results):
+        """
+        Store the validation results in the cache and hint the user if any file failed.
+
+        :param batch: List of (full path, cache key) tuples
+
+        :param events: Reporter events recorded during the validation
+
+        :param results: Dict file path -> True if the validation success
+        """
+
+        failed = False
+
+        for fullpath, key in batch:
+
+            success = results.get(fullpath, True)
+
+            if key:
+                if len(batch) == 1:
+                    file_events = events
+                else:
+                    file_events = [event for event in events if event[1][2:3] == (fullpath,)]
+                self.cache.put(key, file_events, success)
+
+            if not success:
+                failed = True
+
+        if failed:
+            self.hint_to_fix_errors()
+
+    def get_options_hash(self):
+        """
+        Hash the options of this plug-in from validation-options.yaml.
+
+        Cached validation results are not used if the options or the installed validator software change.
+        """
+        if not self.options_hash:
+            self.resolve_installation()
+            toolchain = self.toolchain or {}
+            section = self.options.config.get(self.id)
+            data = json.dumps([self.__class__.__name__, section, toolchain.get("version"), toolchain.get("stamp")], sort_keys=True, default=str)
+            self.options_hash = hash_data(data)
+        return self.options_hash
+
+    def get_cache_key(self, context):
+        """
+        :param context: FileContext instance
+
+        :return: Key for storing the validation result of the file in the cache
+        """
+        return self.cache.get_key(context.get_content_hash(), context.fullpath, self.id, self.get_options_hash())
+
+    def replay_cached(self, context, entry):
+        """
+        Report a validation result stored in the cache.
+
+        :return: True if the validation success
+        """
+        self.logger.debug("Using cached result of plug-in %s on %s" % (self.id, context.fullpath))
+        self.reporter.replay(entry["events"])
+        return entry["success"]
+
+    def validate_cached(self, context):
+        """
+        Run the validator unless we have a result for the same file content stored in the cache.
+
+        On a cache hit the stored reports are replayed.
+
+        :param context: FileContext instance
+
+        :return: True if the validation success
+        """
+
+        key = self.get_cache_key(context)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            return self.replay_cached(context, entry)
+
+        self.install_on_demand()
+
+        self.logger.debug("Applying plug-in %s on %s" % (self.id, context.fullpath))
+
+        events = self.reporter.start_recording()
+        try:
+            with profiler.measure("validate", self.id, [context.fullpath]):
+                success = self.validate_context(context)
+        finally:
+            self.reporter.stop_recording(events)
+
+        if context.cacheable:
+            self.cache.put(key, events, success)
+
+        return success
+
+    def validate_fallback(self, context):
+        """
+        Run the validator command for a file the worker could not validate.
+
+        The command reads the file from the disk. A dirty context is validated like
+        in validate_dirty() and the result is not cached.
+
+        :return: True if the validation success
+        """
+
+        if not context.dirty:
+            return self.validate(context.fullpath)
+
+        context.cacheable = False
+
+        if not os.path.exists(context.fullpath):
+            self.logger.warn("%s: cannot validate %s, it does not exist on the disk" % (self.id, context.fullpath))
+            return True
+
+        self.logger.warn("%s: validating the version on the disk of %s" % (self.id, context.fullpath))
+
+        return self.validate(context.fullpath)
+
+    def validate_dirty(self, context):
+        """
+        Validate a file whose content on the disk differs from the content given in the context.
+
+        The validator reads the file from the disk, so we can only validate what is on the disk.
+        The result is not cached, as it does not belong to the content in the context.
+
+        :return: True if file was processed
+        """
+
+        if not os.path.exists(context.fullpath):
+            self.logger.warn("%s: cannot validate %s, it does not exist on the disk" % (self.id, context.fullpath))
+            return False
+
+        self.logger.warn("%s: validating the version on the disk of %s" % (self.id, context.fullpath))
+
+        self.install_on_demand()
+
+        with profiler.measure("validate", self.id, [context.fullpath]):
+            success = self.validate(context.fullpath)
+
+        if not success:
+            self.hint_to_fix_errors()
+
+        return True
+
     def hint_to_fix_errors(self):
         """
         Give user the note how to fix errors after a failed validation.
@@ -191,70 +713,130 @@ class Plugin(object):
         if self.hint:
             self.reporter.hint_user(self.hint)
 
-    def run(self, project_root_relative_path):
-        """
-        :return: True if file was processed
+    def accepts(self, context, matched=False):
         """
+        Check if this plug-in should validate a file.
 
-        assert self.project_path, "Project path must be determined before a plug-in can run"
+        :param context: FileContext instance
 
-        assert not project_root_relative_path.startswith("/"), "Cannot work on absolute paths"
+        :param matched: The match list has already been checked, e.g. by PluginIndex
+
+        :return: True if the plug-in is enabled, matches the file and can handle its content
+        """
 
         if not self.enabled:
             return False
 
-        if not self.match(project_root_relative_path):
+        if not matched and not self.match(context.relative):
             if self.walker.debug:
-                self.logger.info("No plug-in match %s on %s" % (self.id, project_root_relative_path))
+                self.logger.info("No plug-in match %s on %s" % (self.id, context.relative))
             return False
 
-        fullpath = os.path.join(self.project_path, project_root_relative_path)
+        if context.is_binary() and not self.is_binary_friendly():
+            self.logger.debug("%s: skipping binary file %s" % (self.id, context.fullpath))
+            return False
+
+        return True
+
+    def run(self, project_root_relative_path, context=None, matched=False):
+        """
+        :param context: FileContext shared between plug-ins or None to read the file here
+
+        :param matched: The match list has already been checked, e.g. by PluginIndex
+
+        :return: True if file was processed
+        """
+
+        assert self.project_path, "Project path must be determined before a plug-in can run"
+
+        assert not project_root_relative_path.startswith("/"), "Cannot work on absolute paths"
+
+        if context is None:
+            context = FileContext(self.project_path, project_root_relative_path)
 
-        if is_binary_file(fullpath) and not self.is_binary_friendly():
-            self.logger.debug("%s: skipping binary file %s" % (self.id, fullpath))
+        if not self.accepts(context, matched):
             return False
 
-        self.install_on_demand()
+        if context.dirty and not self.is_context_friendly():
+            return self.validate_dirty(context)
+
+        if self.is_batch_friendly():
+            self.queue(context)
+            return True
+
+        if self.scheduler and self.is_subprocess_bound():
+            self.submit(context)
+            return True
+
+        if self.cache:
+            success = self.validate_cached(context)
+        else:
+            self.install_on_demand()
 
-        self.logger.debug("Applying plug-in %s on %s" % (self.id, fullpath))
+            self.logger.debug("Applying plug-in %s on %s" % (self.id, context.fullpath))
 
-        if not self.validate(fullpath):
+            with profiler.measure("validate", self.id, [context.fullpath]):
+                success = self.validate_context(context)
+
+        if not success:
             self.hint_to_fix_errors()
 
-    def run_command_line(self, cmdline, env={}, bad_string=None, snip_string=None):
+        return True
+
+    def split_command(self, command):
         """
-        Run a command line command and capture output to the reporter.
+        Split a command or options given in validation-options.yaml to a list of arguments.
+
+        Commands are not run through a shell, so only shell-like quoting is supported.
+        """
+        return shlex.split(command or "")
+
+    def run_command(self, args, env=None, cwd=None, raise_error=False):
+        """
+        Run an external command with the shared executor, see :py:class:`vvv.utils.Executor`.
+
+        :param args: List of arguments
+
+        :param env: Complete environment or None to use the current environment
+
+        :return: Tuple (exit code, stdout output followed by stderr output as string)
+        """
+        return utils.run_command(self.logger, args, env=env, cwd=cwd, timeout=self.timeout, raise_error=raise_error)
+
+    def capture_command_line(self, cmdline, env={}):
+        """
+        Run a command line command and capture its output.
 
         :param cmdline: List of arguments
 
-        :param bad_string: If detected in output assume there were validation errors. One string of list of strings.
+        :param env: Environment variables added to the current environment
+
+        :return: Combined stdout and stderr output as a string
         """
 
-        success = True
+        exitcode, combined = self.run_command(cmdline, env=utils.get_environment(env))
 
-        subenv = os.environ.copy()
-        subenv.update(env)
+        self.logger.debug(combined)
 
-        self.logger.debug("Running command line: %s" % cmdline)
-        self.logger.debug("Env: %s" % subenv)
+        return combined
 
-        if type(bad_string) == str:
-            bad_string = [bad_string]
+    def run_command_line(self, cmdline, env={}, bad_string=None, snip_string=None, fname=None):
+        """
+        Run a command line command and capture output to the reporter.
 
-        process = subprocess.Popen(cmdline, env=subenv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        :param cmdline: List of arguments
 
-        out, err = process.communicate()
+        :param bad_string: If detected in output assume there were validation errors. One string of list of strings.
 
-        # :E1103: *%s %r has no %r member (but some types could not be inferred)*
-        # pylint: disable=E1103
+        :param fname: File the output is reported for, or None
+        """
 
-        out = out.decode("utf-8")
-        err = err.decode("utf-8")
+        success = True
 
-        # TODO: Interleave here?
-        combined = out + "\n" + err
+        if type(bad_string) == str:
+            bad_string = [bad_string]
 
-        self.logger.debug(combined)
+        combined = self.capture_command_line(cmdline, env)
 
         if bad_string:
             for match in bad_string:
@@ -266,6 +848,6 @@ class Plugin(object):
             combined = utils.snip_output(combined, snip_string)
 
         if not success:
-            self.reporter.report_unstructured(self.id, combined)
+            self.reporter.report_unstructured(self.id, combined, fname=fname)
 
         return success
@@ -0,0 +1,82 @@
+"""
+
+    Index telling which plug-ins validate a file.
+
+    Built once after the plug-ins have been initialized. Plug-ins are grouped
+    by the file extensions their match lists can accept, so plug-ins which
+    cannot match a file are never called for it. For plug-ins whose match list
+    depends only on the file extension, e.g. ``*.py``, the verdict is
+    remembered per extension and the match list is consulted only once.
+
+"""
+
+# Local imports
+from .bzrlib.globster import get_extension
+
+
+class PluginIndex(object):
+    """
+    Map a file path to the plug-ins whose match lists accept it.
+    """
+
+    def __init__(self, plugins):
+        """
+        :param plugins: Plug-in instances in the order they are run
+        """
+
+        #: Enabled plug-ins
+        self.plugins = [p for p in plugins if p.is_active()]
+
+        #: Plug-in id -> set of extensions the plug-in may match, or None for any file
+        self.extensions = dict((p.id, p.matchlist.get_extensions()) for p in self.plugins)
+
+        #: Plug-in id -> True if the match depends only on the file extension
+        self.extension_only = dict((p.id, p.matchlist.is_extension_only()) for p in self.plugins)
+
+        #: Extension -> list of plug-ins which may match files with the extension
+        self.candidates = {}
+
+        #: (plug-in id, extension) -> match verdict of an extension only plug-in
+        self.verdicts = {}
+
+    def get_candidates(self, extension):
+        """
+        :return: Plug-ins whose match lists may accept files with the extension
+        """
+        candidates = self.candidates.get(extension)
+
+        if candidates is None:
+            candidates = self.candidates[extension] = [
+                p for p in self.plugins
+                if self.extensions[p.id] is None or extension in self.extensions[p.id]
+            ]
+
+        return candidates
+
+    def get_plugins(self, relative):
+        """
+        :param relative: Project root relative path
+
+        :return: List of plug-ins which accept the file by their match lists
+        """
+
+        extension = get_extension(relative)
+
+        plugins = []
+
+        for p in self.get_candidates(extension):
+
+            if self.extension_only[p.id]:
+                key = (p.id, extension)
+                verdict = self.verdicts.get(key)
+                if verdict is None:
+                    verdict = self.verdicts[key] = bool(p.match(relative))
+            else:
+                verdict = p.match(relative)
+
+            if verdict:
+                plugins.append(p)
+            elif p.walker.debug:
+                p.logger.info("No plug-in match %s on %s" % (p.id, relative))
+
+        return plugins
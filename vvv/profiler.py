@@ -0,0 +1,237 @@
+"""
+
+    Timing information about where VVV spends its time.
+
+    Enabled with ``--profile`` command line option. Timings are collected
+    per category (walker, install, validate, subprocess, config) and name (usually plug-in id)
+    and per validated file.
+
+"""
+
+# Python imports
+import os
+import time
+import json
+import threading
+
+#: Profiler of the current process or None if profiling is not enabled
+active = None
+
+#: How many slowest files are listed in the summary by default
+DEFAULT_SLOWEST = 10
+
+
+class Measurement(object):
+    """
+    Context manager adding the time spent in the with block to the profiler.
+    """
+
+    def __init__(self, profiler, category, name, fpaths):
+        self.profiler = profiler
+        self.category = category
+        self.name = name
+        self.fpaths = fpaths
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.add(self.category, self.name, time.time() - self.started, self.fpaths)
+
+
+class NullMeasurement(object):
+    """
+    Context manager doing nothing when profiling is not enabled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+NULL_MEASUREMENT = NullMeasurement()
+
+
+class Profiler(object):
+    """
+    Collect timings of one VVV run.
+    """
+
+    def __init__(self):
+
+        #: Wall clock and CPU time when the run started
+        self.started = time.time()
+        self.cpu_started = os.times()
+
+        #: Dict category -> dict name -> [count, total seconds]
+        self.timings = {}
+
+        #: Dict file path -> total seconds spent validating it
+        self.files = {}
+
+        #: CPU time used by worker processes and their subprocesses
+        self.workers_cpu = 0.0
+
+        #: Validators may run in scheduler threads
+        self.lock = threading.Lock()
+
+    def measure(self, category, name, fpaths=None):
+        """
+        :param fpaths: List of files the time is spent on, the time is split evenly between them
+
+        :return: Context manager measuring the time spent in the with block
+        """
+        return Measurement(self, category, name, fpaths)
+
+    def add(self, category, name, elapsed, fpaths=None, count=1):
+        """
+        Add time spent on something.
+        """
+        with self.lock:
+            timing = self.timings.setdefault(category, {}).setdefault(name, [0, 0.0])
+            timing[0] += count
+            timing[1] += elapsed
+
+            if fpaths:
+                share = elapsed / len(fpaths)
+                for fpath in fpaths:
+                    self.files[fpath] = self.files.get(fpath, 0.0) + share
+
+    def get_data(self):
+        """
+        :return: Collected timings as JSON serializable dict
+        """
+
+        now = os.times()
+
+        return dict(
+            wall=time.time() - self.started,
+            cpu=(now.user - self.cpu_started.user) + (now.system - self.cpu_started.system),
+            children_cpu=(now.children_user - self.cpu_started.children_user) + (now.children_system - self.cpu_started.children_system),
+            timings=self.timings,
+            files=self.files,
+        )
+
+    def pop_data(self):
+        """
+        Get timings collected so far and start collecting again, e.g. in a worker process.
+
+        Wall clock time is not included, as workers run concurrently.
+        """
+        data = self.get_data()
+        self.timings = {}
+        self.files = {}
+        self.cpu_started = os.times()
+        del data["wall"]
+        return data
+
+    def merge(self, data):
+        """
+        Add timings collected by a worker process.
+        """
+        for category, names in data["timings"].items():
+            for name, (count, elapsed) in names.items():
+                self.add(category, name, elapsed, count=count)
+
+        for fpath, elapsed in data["files"].items():
+            self.files[fpath] = self.files.get(fpath, 0.0) + elapsed
+
+        self.workers_cpu += data["cpu"] + data["children_cpu"]
+
+    def get_report(self, slowest=DEFAULT_SLOWEST):
+        """
+        :return: Report as JSON serializable dict
+        """
+        data = self.get_data()
+        data["workers_cpu"] = self.workers_cpu
+        data["slowest"] = sorted(self.files.items(), key=lambda item: item[1], reverse=True)[:slowest]
+        del data["files"]
+        data["subprocesses"] = sum(count for count, elapsed in self.timings.get("subprocess", {}).values())
+        return data
+
+    def format_report(self, slowest=DEFAULT_SLOWEST):
+        """
+        :return: Human readable summary as a string
+        """
+
+        report = self.get_report(slowest)
+
+        lines = ["VVV profile", "-----------------------------"]
+
+        lines.append("Wall time %.2f s, CPU time %.2f s, subprocess CPU time %.2f s, worker CPU time %.2f s" % (
+            report["wall"], report["cpu"], report["children_cpu"], report["workers_cpu"]))
+
+        lines.append("Subprocesses started: %d" % report["subprocesses"])
+
+        for category in sorted(self.timings):
+            lines.append("")
+            lines.append("%-30s %8s %10s %10s" % (category, "count", "total s", "mean ms"))
+            for name, (count, elapsed) in sorted(self.timings[category].items(), key=lambda item: item[1][1], reverse=True):
+                lines.append("%-30s %8d %10.3f %10.3f" % (name, count, elapsed, elapsed * 1000.0 / count))
+
+        if report["slowest"]:
+            lines.append("")
+            lines.append("Slowest files:")
+            for fpath, elapsed in report["slowest"]:
+                lines.append("%8.3f s %s" % (elapsed, fpath))
+
+        return "\n".join(lines)
+
+    def save(self, fpath, slowest=DEFAULT_SLOWEST):
+        """
+        Write the report as JSON.
+        """
+        with open(fpath, "wt") as f:
+            json.dump(self.get_report(slowest), f, indent=2, sort_keys=True)
+
+
+def start():
+    """
+    Start profiling in this process.
+
+    :return: Profiler instance
+    """
+    # pylint: disable=W0603
+    global active
+    active = Profiler()
+    return active
+
+
+def stop():
+    """
+    Stop profiling in this process.
+    """
+    # pylint: disable=W0603
+    global active
+    active = None
+
+
+def measure(category, name, fpaths=None):
+    """
+    Measure the time spent in a with block if profiling is enabled.
+
+    Usage::
+
+        with profiler.measure("validate", self.id, [fullpath]):
+            ...
+    """
+    if active is None:
+        return NULL_MEASUREMENT
+    return active.measure(category, name, fpaths)
+
+
+def measure_iterator(category, name, iterable):
+    """
+    Measure the time spent in producing the items of an iterator, e.g. a generator walking files.
+    """
+    iterator = iter(iterable)
+    while True:
+        with measure(category, name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
@@ -2,6 +2,8 @@
 
     Plain text output reporter.
 
+    Other output formats are in :py:mod:`vvv.streamreporter`.
+
 """
 
 # :W0613: *Unused argument %r*
@@ -27,6 +29,64 @@ class Reporter:
 
         self.suicidal = suicidal
 
+        #: How many validation errors have been reported
+        self.error_count = 0
+
+        #: Active recordings, see start_recording()
+        self.recordings = []
+
+    def start_recording(self):
+        """
+        Start recording reported events, so that they can be replayed in another reporter.
+
+        Recordings can be nested.
+
+        :return: List where events are recorded as (method name, arguments) tuples
+        """
+        events = []
+        self.recordings.append(events)
+        return events
+
+    def stop_recording(self, events):
+        """
+        Stop recording started by start_recording().
+
+        :return: List of recorded events
+        """
+        assert self.recordings[-1] is events, "Recordings must be stopped in the reverse order"
+        self.recordings.pop()
+        return events
+
+    def record(self, method, *args):
+        """
+        Store one reported event for all active recordings.
+        """
+        for events in self.recordings:
+            events.append((method, args))
+
+    def replay(self, events):
+        """
+        Report events recorded by start_recording() e.g. in a worker process.
+
+        Raises FirstError if we are suicidal, same as the original reports would.
+        """
+        for method, args in events:
+            getattr(self, method)(*args)
+
+    def clear(self):
+        """
+        Forget collected output, e.g. after it has been passed to another reporter.
+        """
+        self.raw_output = []
+        self.hints = []
+        self.error_count = 0
+
+    def has_errors(self):
+        """
+        :return True: If any validation errors have been reported
+        """
+        return self.error_count > 0
+
     def check_seppuku(self):
         """
         Check if we die on the first error.
@@ -55,27 +115,52 @@ class Reporter:
 
         :param details: Multi-line error messags like a traceback (usually hidden in details view) or None
         """
+        self.record("report_detailed", plugin_id, severity, fname, line, pos, error_id, msg, excerpt, details)
+
+        self.error_count += 1
+
+        self.write_detailed(plugin_id, severity, fname, line, pos, error_id, msg, excerpt, details)
+
+        self.check_seppuku()
+
+    def write_detailed(self, plugin_id, severity, fname, line, pos, error_id, msg, excerpt, details):
+        """
+        Output one detailed error. See report_detailed() for the parameters.
+        """
+
         if error_id is None:
             error_id = "validation error"
 
-        self.raw_output.append("%s %d: [%s] %s" % (fname, line, error_id, msg))
+        if pos is None:
+            self.raw_output.append("%s %d: [%s] %s" % (fname, line, error_id, msg))
+        else:
+            self.raw_output.append("%s %d:%d: [%s] %s" % (fname, line, pos, error_id, msg))
 
         if excerpt:
             self.raw_output.append(excerpt)
 
-        self.check_seppuku()
-        
     def report_unstructured(self, plugin_id, output, fname=None):
         """
         Dump text output as is from the validator
         """
 
+        self.record("report_unstructured", plugin_id, output, fname)
+
+        self.error_count += 1
+
+        self.write_unstructured(plugin_id, output, fname)
+
+        self.check_seppuku()
+
+    def write_unstructured(self, plugin_id, output, fname):
+        """
+        Output validator output. See report_unstructured() for the parameters.
+        """
+
         if fname:
             self.raw_output.append("%s validation output:" % fname)
 
         self.raw_output.append(output)
-        
-        self.check_seppuku()
 
     def report_internal_error(self, plugin_id, excerpt):
         """
@@ -95,8 +180,21 @@ class Reporter:
 
         :param hint_message: Hinting info as multi-line string
         """
+        self.record("hint_user", hint_message)
+
         if not (hint_message in self.hints):
             self.hints.append(hint_message)
+            self.write_hint(hint_message)
+
+    def write_hint(self, hint_message):
+        """
+        Output a new hint. Text output gives hints as last in get_output_as_text().
+        """
+
+    def close(self):
+        """
+        All files have been validated.
+        """
 
     def get_output_as_text(self):
         """
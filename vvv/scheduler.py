@@ -0,0 +1,318 @@
+"""
+
+    Scheduler keeping several validator commands running at once in one VVV process.
+
+    Most validators spend their time waiting for an external tool, e.g. ``pylint``
+    or ``node``. With ``--processes K`` the plug-in validation code runs in K threads
+    and the commands are started in an asyncio event loop with
+    ``asyncio.create_subprocess_exec``, so K commands are in flight while
+    the cheap in-Python :py:class:`vvv.textlineplugin.TextLinePlugin` checks
+    run inline in the main thread.
+
+    Each job reports to its own reporter. The recorded reports are replayed
+    to the real reporter in the order the jobs were submitted. Reports made
+    in the main thread, by the inline checks and for the cached results,
+    are queued behind the jobs submitted before them, so the output is
+    the same as in a serial run. With ``--suicidal`` the first error
+    cancels the queued jobs and kills the running commands.
+
+"""
+
+# Python imports
+import sys
+import threading
+import concurrent.futures
+from collections import deque
+from traceback import format_exception
+
+# Local imports
+from . import utils
+from .reporter import Reporter, FirstError
+
+
+class ReporterProxy(object):
+    """
+    Reporter used by plug-ins while the scheduler runs.
+
+    Reports go to the reporter of the job running in the current thread,
+    or in the main thread to the reporter given by :py:meth:`AsyncScheduler.get_main_reporter`.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.local = threading.local()
+
+    def get_reporter(self):
+        """
+        :return: Reporter for the current thread
+        """
+        return getattr(self.local, "reporter", None) or self.scheduler.get_main_reporter()
+
+    def __getattr__(self, name):
+        return getattr(self.get_reporter(), name)
+
+
+class AsyncScheduler(object):
+    """
+    Run subprocess bound validation jobs concurrently, see :py:meth:`vvv.plugin.Plugin.is_subprocess_bound`.
+    """
+
+    def __init__(self, logger, reporter, processes):
+        """
+        :param reporter: The real reporter where the results are replayed
+
+        :param processes: How many jobs and validator commands are in flight at once
+        """
+        self.logger = logger
+        self.reporter = reporter
+        self.processes = processes
+
+        self.proxy = ReporterProxy(self)
+
+        #: Submitted jobs as (plug-in, batch, concurrent.futures.Future) in the submission order.
+        #: Reports made in the main thread meanwhile are queued as (None, recording reporter, finished Future).
+        self.pending = deque()
+
+        #: Set when the first error has been hit in suicidal mode
+        self.aborted = threading.Event()
+
+        self.plugins = []
+        self.loop = self.loop_thread = self.threads = None
+        self.old_limiter = None
+
+    def start(self, plugins):
+        """
+        Start the event loop and route the plug-ins through the scheduler.
+
+        :param plugins: Plug-in instances
+        """
+
+        # Imported only when needed to keep the start up fast
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name="vvv-scheduler", daemon=True)
+        self.loop_thread.start()
+
+        self.threads = ThreadPoolExecutor(self.processes, thread_name_prefix="vvv-validator")
+
+        self.old_limiter = utils.executor.limiter
+        utils.executor.set_limiter(threading.BoundedSemaphore(self.processes))
+        utils.executor.set_loop(self.loop)
+
+        self.plugins = list(plugins)
+        for plugin in self.plugins:
+            plugin.scheduler = self
+            plugin.reporter = self.proxy
+
+    def stop(self):
+        """
+        Stop the event loop and restore the plug-ins, whatever happened.
+        """
+
+        self.cancel()
+
+        for plugin in self.plugins:
+            plugin.scheduler = None
+            plugin.reporter = self.reporter
+
+        if self.threads:
+            self.threads.shutdown(wait=True)
+
+        utils.executor.set_loop(None)
+        utils.executor.set_limiter(self.old_limiter)
+
+        if self.loop:
+            import asyncio
+            # Let the killed commands be reaped before the loop goes away
+            asyncio.run_coroutine_threadsafe(self.wait_tasks(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join()
+            self.loop.close()
+
+        self.pending.clear()
+
+    async def wait_tasks(self):
+        """
+        Wait for all other tasks in the event loop to finish.
+        """
+        import asyncio
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, plugin, batch, context=None):
+        """
+        Queue a validation job.
+
+        Blocks while too many jobs are waiting, replaying the finished ones.
+
+        :param batch: List of (full path, cache key) tuples
+
+        :param context: FileContext when validating one file with validate_context(), or None to use validate_batch()
+        """
+
+        import asyncio
+
+        if self.aborted.is_set():
+            # Replay up to the first error, which raises FirstError
+            self.finish()
+
+        coroutine = self.run_job(plugin, batch, context)
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        self.pending.append((plugin, batch, future))
+
+        self.drain()
+
+        # Do not let the main thread run far ahead of the validators
+        while len(self.pending) > self.processes * 2:
+            self.drain(block=True)
+
+    def get_main_reporter(self):
+        """
+        Reporter for the reports made in the main thread.
+
+        The reports go to the real reporter when no jobs are pending.
+        Otherwise they are recorded and replayed after the jobs submitted before them.
+        Recording reporters do not raise FirstError, it is raised when the reports are replayed.
+
+        :return: Reporter instance
+        """
+
+        if not self.pending:
+            return self.reporter
+
+        plugin, reporter, future = self.pending[-1]
+
+        if plugin is None:
+            # Keep adding to the reports queued since the last job
+            return reporter
+
+        reporter = Reporter(suicidal=False)
+        future = concurrent.futures.Future()
+        future.set_result((reporter.start_recording(), {}))
+        self.pending.append((None, reporter, future))
+
+        return reporter
+
+    async def run_job(self, plugin, batch, context):
+        """
+        Run the plug-in validation code in a thread.
+        """
+        return await self.loop.run_in_executor(self.threads, self.validate, plugin, batch, context)
+
+    def validate(self, plugin, batch, context):
+        """
+        Validate a batch in a scheduler thread with a reporter of its own.
+
+        :return: Tuple (recorded reporter events, dict file path -> True if the validation success),
+            or None if the job was cancelled
+        """
+
+        if self.aborted.is_set():
+            return None
+
+        reporter = Reporter(self.reporter.suicidal)
+        self.proxy.local.reporter = reporter
+
+        # Keep the reports made before the first error
+        recording = reporter.start_recording()
+        try:
+            events, results = plugin.validate_recorded([fullpath for fullpath, key in batch], context)
+        except FirstError:
+            self.abort()
+            return recording, {}
+        except Exception:
+            if self.aborted.is_set():
+                # Killed command
+                return None
+            raise
+        finally:
+            reporter.stop_recording(recording)
+            self.proxy.local.reporter = None
+
+        if self.aborted.is_set():
+            # Results of a killed command are not reliable
+            return None
+
+        if context is not None and not context.cacheable:
+            # Validated from the disk, see Plugin.validate_fallback(). The batch belongs to this job only.
+            batch[:] = [(fullpath, None) for fullpath, key in batch]
+
+        return events, results
+
+    def abort(self):
+        """
+        The first error was hit in suicidal mode, stop the other jobs.
+
+        Called from the scheduler threads too: jobs not started yet return at once
+        and the running commands are killed.
+        """
+        self.aborted.set()
+        utils.executor.cancel_running()
+
+    def cancel(self):
+        """
+        Cancel all jobs and kill the running commands.
+        """
+        self.abort()
+
+        for plugin, batch, future in self.pending:
+            future.cancel()
+
+    def drain(self, block=False):
+        """
+        Replay the finished jobs in the submission order.
+
+        Raises FirstError if we are suicidal and an error is replayed.
+
+        :param block: Wait for the oldest job to finish
+        """
+
+        try:
+            self.replay_finished(block)
+        except FirstError:
+            self.cancel()
+            raise
+
+    def replay_finished(self, block):
+        """
+        See drain().
+        """
+
+        while self.pending:
+
+            plugin, batch, future = self.pending[0]
+
+            if not (block or future.done()):
+                break
+
+            block = False
+
+            self.pending.popleft()
+
+            try:
+                result = future.result()
+            except concurrent.futures.CancelledError:
+                continue
+            except Exception:
+                etype, value, tb = sys.exc_info()
+                self.reporter.report_internal_error(plugin.id, "".join(format_exception(etype, value, tb)))
+                continue
+
+            if result is None:
+                continue
+
+            events, results = result
+
+            self.reporter.replay(events)
+
+            if plugin is not None:
+                plugin.finish_batch(batch, events, results)
+
+    def finish(self):
+        """
+        Wait for all jobs and replay their results.
+        """
+        while self.pending:
+            self.drain(block=True)
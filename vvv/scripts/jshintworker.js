@@ -0,0 +1,109 @@
+/*
+
+    Long running jshint process validating files sent over stdin.
+
+    Started once per run by vvv.validators.jshint.JSHintPlugin, so that Node.js
+    start up and loading jshint are paid once instead of once per file.
+
+    Usage:
+
+        node jshintworker.js /path/to/node_modules/jshint [/path/to/config.json]
+
+    Speaks JSON lines, see vvv/worker.py. Request:
+
+        {"file": "/path/to/foo.js", "source": "file content, read from the file if not given"}
+
+    Response:
+
+        {"errors": [{"line": 1, "character": 5, "code": "W033", "reason": "Missing semicolon.", "evidence": "var a"}]}
+
+*/
+
+var fs = require("fs");
+var readline = require("readline");
+
+function write(message) {
+    process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+function load(modulePath, configPath) {
+    var jshint = require(modulePath);
+    var config = {};
+
+    if (configPath) {
+        config = JSON.parse(fs.readFileSync(configPath, "utf8"));
+    }
+
+    // Globals are given separately from the options, like jshint command line does
+    var globals = config.globals || {};
+    delete config.globals;
+
+    return {
+        JSHINT: jshint.JSHINT || jshint,
+        options: config,
+        globals: globals
+    };
+}
+
+function lint(linter, request) {
+    var source = request.source;
+
+    if (source === undefined || source === null) {
+        source = fs.readFileSync(request.file, "utf8");
+    }
+
+    // jshint modifies the options it is given
+    var options = JSON.parse(JSON.stringify(linter.options));
+    var globals = JSON.parse(JSON.stringify(linter.globals));
+
+    linter.JSHINT(source, options, globals);
+
+    var errors = [];
+
+    linter.JSHINT.errors.forEach(function(error) {
+        // jshint adds null when it gives up
+        if (error) {
+            errors.push({
+                line: error.line,
+                character: error.character,
+                code: error.code || null,
+                reason: error.reason,
+                evidence: error.evidence || null
+            });
+        }
+    });
+
+    return {errors: errors};
+}
+
+function run() {
+    var linter;
+
+    try {
+        linter = load(process.argv[2], process.argv[3]);
+    } catch (e) {
+        write({error: String(e)});
+        process.exit(1);
+    }
+
+    // Anything jshint prints must not go to the protocol stream
+    console.log = console.error;
+
+    write({ready: true});
+
+    var lines = readline.createInterface({input: process.stdin, terminal: false});
+
+    lines.on("line", function(line) {
+        var response;
+
+        try {
+            response = lint(linter, JSON.parse(line));
+        } catch (e) {
+            response = {error: String(e)};
+        }
+
+        write(response);
+    });
+}
+
+run();
@@ -0,0 +1,89 @@
+"""
+
+    Long running pylint process validating files sent over stdin.
+
+    Started once per run by :py:class:`vvv.validators.pylint.PylintPlugin` with the Python
+    of the pylint installation, so this script must not import vvv and must run on Python 2 too.
+    astroid keeps the modules it has inferred in a process wide cache, so shared dependencies
+    are analysed only once per run instead of once per file.
+
+    Speaks JSON lines, see :py:mod:`vvv.worker`. Request::
+
+        {"file": "/path/to/module.py", "args": ["--rcfile=/tmp/pylintrc", "--reports=n"]}
+
+    Response::
+
+        {"status": 0, "output": "pylint messages as text"}
+
+"""
+
+from __future__ import absolute_import, print_function
+
+import sys
+import json
+import importlib
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+def lint(args, fname):
+    """
+    Run pylint like the command line would.
+
+    :return: Tuple (exit status, output)
+    """
+
+    from pylint import lint as pylint_lint
+    from pylint.reporters.text import TextReporter
+
+    output = StringIO()
+
+    try:
+        pylint_lint.Run(list(args) + [fname], reporter=TextReporter(output))
+        status = 0
+    except SystemExit as e:
+        status = e.code or 0
+
+    return status, output.getvalue()
+
+
+def run():
+    """
+    Answer requests until stdin is closed.
+    """
+
+    protocol = sys.stdout
+
+    # Keep anything printed by pylint or plug-ins out of the protocol stream
+    sys.stdout = sys.stderr
+
+    try:
+        importlib.import_module("pylint.lint")
+        importlib.import_module("pylint.reporters.text")
+    except ImportError as e:
+        protocol.write(json.dumps(dict(error=str(e))) + "\n")
+        protocol.flush()
+        sys.exit(1)
+
+    protocol.write(json.dumps(dict(ready=True)) + "\n")
+    protocol.flush()
+
+    for line in iter(sys.stdin.readline, ""):
+
+        request = json.loads(line)
+
+        try:
+            status, output = lint(request["args"], request["file"])
+            response = dict(status=status, output=output)
+        except Exception as e:
+            response = dict(error="%s: %s" % (e.__class__.__name__, e))
+
+        protocol.write(json.dumps(response) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    run()
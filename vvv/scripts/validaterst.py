@@ -4,12 +4,24 @@
 
     Based on rst2html http://docutils.svn.sourceforge.net/viewvc/docutils/trunk/docutils/tools/rst2html.py?revision=4564&view=markup
 
+    With ``--worker`` argument validates many documents, speaking JSON lines, see :py:mod:`vvv.worker`.
+    Request::
+
+        {"file": "/path/to/doc.rst", "source": "file content, read from the file if not given"}
+
+    Response::
+
+        {"reports": [{"line": 3, "level": "WARNING/2", "message": "Title underline too short."}]}
+
+    The line is null for messages which do not point to a line.
+
 
 
 """
 
 import sys
 import os
+import json
 
 # http://const-cast.blogspot.com/2009/04/mercurial-on-mac-os-x-valueerror.html
 
@@ -64,7 +76,9 @@ def system_message(self, level, message, *children, **kwargs):
         if level >= self.WARNING_LEVEL:
 
             # Collect to internal message log
-            reports.append(message)
+            reports.append(dict(line=result.get("line", kwargs.get("line")),
+                                level="%s/%s" % (self.levels[level], level),
+                                message=message))
 
     else:
         # We don't want to see the filtered messages
@@ -84,30 +98,85 @@ def rst2html(value):
     return parts['whole']
 
 
+def validate(fname, text=None):
+    """
+    Validate one document.
+
+    :param text: Document content, read from the file if not given
+
+    :return: List of filtered reports of this document as dicts with line, level and message
+    """
+
+    if text is None:
+        f = open(fname, "rt")
+        text = f.read()
+        f.close()
+
+    # Reports of the previous document must not bleed to this one
+    del reports[:]
+
+    # Relative includes are relative to the document
+    absolute_dir = os.path.dirname(os.path.abspath(fname))
+    prev_work_dir = os.getcwd()
+    os.chdir(absolute_dir)
+    try:
+        rst2html(text)
+    finally:
+        os.chdir(prev_work_dir)
+
+    return list(reports)
+
+
+def format_report(fname, report):
+    """
+    :return: Report as one line the way docutils writes it, e.g. ``doc.rst:3: (WARNING/2) Title underline too short.``
+    """
+    return "%s:%s: (%s) %s" % (fname, report["line"], report["level"], report["message"])
+
+
+def run_worker():
+    """
+    Validate documents sent over stdin until it is closed.
+    """
+
+    protocol = sys.stdout
+
+    # Keep anything printed by docutils out of the protocol stream
+    sys.stdout = sys.stderr
+
+    protocol.write(json.dumps(dict(ready=True)) + "\n")
+    protocol.flush()
+
+    for line in iter(sys.stdin.readline, ""):
+
+        request = json.loads(line)
+
+        try:
+            response = dict(reports=validate(request["file"], request.get("source")))
+        except Exception as e:
+            response = dict(error="%s: %s" % (e.__class__.__name__, e))
+
+        protocol.write(json.dumps(response) + "\n")
+        protocol.flush()
+
+
 def run():
     """
     """
 
     if len(sys.argv) < 2:
         print("Usage: vvv-validate-rst [filename.rst]")
+        print("       vvv-validate-rst --worker")
         sys.exit(2)
 
-    fname = sys.argv[1]
-    f = open(fname, "rt")
-    text = f.read()
-    f.close()
+    if sys.argv[1] == "--worker":
+        run_worker()
+        sys.exit(0)
 
-    # Monkeypatch docutils for simple error/warning output support
-    utils.Reporter.system_message = system_message
-
-    absolute_dir = os.path.dirname(os.path.abspath(fname))
-    prev_work_dir = os.getcwd()
-    os.chdir(absolute_dir)
-    rst2html(text)
-    os.chdir(prev_work_dir)
+    found = validate(sys.argv[1])
 
-    if len(reports) > 0:
-        print(reports)
+    if len(found) > 0:
+        print("\n".join(format_report(sys.argv[1], report) for report in found))
         sys.exit(1)
 
     sys.exit(0)
@@ -0,0 +1,221 @@
+"""
+
+    Machine readable output reporters.
+
+    Reports are written to the output stream as they happen,
+    only the error counters and hints are kept in the memory.
+
+    * JSON Lines - one JSON object per line
+
+    * SARIF - Static Analysis Results Interchange Format understood by code review tools
+
+    http://jsonlines.org/
+
+    http://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html
+
+"""
+
+# :W0613: *Unused argument %r*
+# pylint: disable=W0613
+
+# Python imports
+import os
+import json
+import logging
+from collections import OrderedDict
+
+# Local imports
+from .reporter import Reporter
+
+#: SARIF version we output
+SARIF_VERSION = "2.1.0"
+
+#: SARIF JSON schema
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+#: Python logging levels to SARIF result levels
+SARIF_LEVELS = {
+    logging.CRITICAL: "error",
+    logging.ERROR: "error",
+    logging.WARNING: "warning",
+    logging.INFO: "note",
+    logging.DEBUG: "note",
+}
+
+
+def get_severity_name(severity):
+    """
+    :param severity: Python logging level
+
+    :return: Lowercase level name, e.g. error
+    """
+    return logging.getLevelName(severity).lower()
+
+
+def get_file_uri(fname):
+    """
+    :return: file:// URI for absolute paths, otherwise the path as is
+    """
+    if os.path.isabs(fname):
+        return "file://" + fname
+    return fname
+
+
+class StreamReporter(Reporter):
+    """
+    Base class for reporters writing each event to a stream when it is reported.
+    """
+
+    def __init__(self, suicidal, stream):
+        """
+        :param stream: File-like object where the output is written
+        """
+        Reporter.__init__(self, suicidal)
+        self.stream = stream
+
+    def write(self, data):
+        """
+        Write and flush, so that the output can be followed while VVV runs.
+        """
+        self.stream.write(data)
+        self.stream.flush()
+
+    def get_output_as_text(self):
+        """
+        All output has been already written to the stream.
+        """
+        return ""
+
+
+class JSONLinesReporter(StreamReporter):
+    """
+    Output each report as one JSON object per line.
+
+    Each object has ``type`` field which is ``detailed``, ``unstructured`` or ``hint``.
+    """
+
+    def write_event(self, **event):
+        """
+        Output one JSON line.
+        """
+        self.write(json.dumps(event, sort_keys=True) + "\n")
+
+    def write_detailed(self, plugin_id, severity, fname, line, pos, error_id, msg, excerpt, details):
+        self.write_event(type="detailed", plugin=plugin_id, severity=get_severity_name(severity), file=fname,
+                         line=line, column=pos, id=error_id, message=msg, excerpt=excerpt, details=details)
+
+    def write_unstructured(self, plugin_id, output, fname):
+        self.write_event(type="unstructured", plugin=plugin_id, severity="error", file=fname, output=output)
+
+    def write_hint(self, hint_message):
+        self.write_event(type="hint", message=hint_message)
+
+
+class SARIFReporter(StreamReporter):
+    """
+    Output a SARIF log with one run having all reports as results.
+
+    The results are written when they are reported and the log is finished in close().
+    """
+
+    def __init__(self, suicidal, stream):
+        StreamReporter.__init__(self, suicidal, stream)
+
+        #: Has the beginning of the log been written
+        self.started = False
+
+    def write_result(self, result):
+        """
+        Output one SARIF result object.
+        """
+        if not self.started:
+            self.start()
+        else:
+            self.write(",\n")
+
+        self.write(json.dumps(result, sort_keys=True))
+
+    def get_log_parts(self):
+        """
+        Split the log document at the results list, so that results can be streamed in between.
+
+        :return: Tuple (text before the results, text after the results)
+        """
+        run = OrderedDict()
+        run["tool"] = dict(driver=dict(name="vvv", informationUri="https://github.com/miohtama/vvv"))
+        run["results"] = []
+
+        log = OrderedDict()
+        log["$schema"] = SARIF_SCHEMA
+        log["version"] = SARIF_VERSION
+        log["runs"] = [run]
+
+        head, tail = json.dumps(log).split('"results": []')
+        return head, tail
+
+    def start(self):
+        """
+        Output the beginning of the log up to the results list.
+        """
+        self.started = True
+        head, tail = self.get_log_parts()
+        self.write(head + '"results": [\n')
+
+    def close(self):
+        """
+        Output the end of the log, with hints as run properties.
+        """
+        if not self.started:
+            self.start()
+        head, tail = self.get_log_parts()
+        self.write('\n], "properties": %s%s\n' % (json.dumps(dict(hints=self.hints)), tail))
+
+    def get_location(self, fname, line=None, pos=None):
+        """
+        :return: SARIF location list for the result
+        """
+        if not fname:
+            return []
+
+        location = dict(artifactLocation=dict(uri=get_file_uri(fname)))
+
+        if line:
+            location["region"] = region = dict(startLine=line)
+            if pos:
+                region["startColumn"] = pos
+
+        return [dict(physicalLocation=location)]
+
+    def write_detailed(self, plugin_id, severity, fname, line, pos, error_id, msg, excerpt, details):
+        result = dict(
+            ruleId=error_id or plugin_id,
+            level=SARIF_LEVELS.get(severity, "error"),
+            message=dict(text=msg),
+            locations=self.get_location(fname, line, pos),
+            properties=dict(plugin=plugin_id),
+        )
+
+        if excerpt and result["locations"]:
+            result["locations"][0]["physicalLocation"].setdefault("region", {})["snippet"] = dict(text=excerpt)
+
+        if details:
+            result["properties"]["details"] = details
+
+        self.write_result(result)
+
+    def write_unstructured(self, plugin_id, output, fname):
+        result = dict(
+            ruleId=plugin_id,
+            level="error",
+            message=dict(text=output),
+            locations=self.get_location(fname),
+            properties=dict(plugin=plugin_id),
+        )
+        self.write_result(result)
+
+
+#: --format option values -> reporter classes writing to a stream
+STREAM_REPORTERS = {
+    "jsonl": JSONLinesReporter,
+    "sarif": SARIFReporter,
+}
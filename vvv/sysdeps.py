@@ -12,7 +12,7 @@ import os
 import sys
 
 # Local imports
-from .utils import shell, temporary_working_directory
+from .utils import run_command, get_environment
 from .download import download
 
 class HasNotCommand(Exception):
@@ -202,21 +202,60 @@ def create_virtualenv(logger, venv_target, target, egg_spec=None, py3=True):
             if not venv_cmd:
                 raise RuntimeError("Did not find installed Python 2 on the system")
 
-        venv_cmd += " " + venv_target 
-            
+        venv_args = [venv_cmd, venv_target]
+    else:
+        venv_args = [venv_cmd]
+
     # Execute virtualenv.py
-    shell(logger, "%s %s" % (venv_cmd, target), raise_error=True)
+    run_command(logger, venv_args + [target], raise_error=True)
 
     # Install eny eggs if needed
     if egg_spec:
-        shell(logger, '. %s/bin/activate ; easy_install "%s"' % (target, egg_spec), raise_error=True)
+        run_virtualenv_command(logger, target, ["easy_install", egg_spec], raise_error=True)
+
+#: Virtualenv folder -> environment variables as if the virtualenv was activated
+_virtualenv_environments = {}
+
+def get_virtualenv_environment(target, extra=None):
+    """
+    Environment variables for running commands in a virtualenv, like ``bin/activate`` would set them.
+
+    :param extra: Dict of more environment variables
+    """
+    env = _virtualenv_environments.get(target)
+
+    if env is None:
+        env = get_environment(dict(VIRTUAL_ENV=target), path=os.path.join(target, "bin"))
+        env.pop("PYTHONHOME", None)
+        _virtualenv_environments[target] = env
 
-def run_virtualenv_command(logger, target, command, raise_error=False):
+    if extra:
+        env = dict(env, **extra)
+
+    return env
+
+def get_virtualenv_executable(target, name):
+    """
+    :return: Full path to a command installed in the virtualenv, or the name if the virtualenv does not have it
+    """
+    fpath = os.path.join(target, "bin", name)
+    if os.path.exists(fpath):
+        return fpath
+    return name
+
+def run_virtualenv_command(logger, target, args, raise_error=False, cwd=None, env=None, timeout=None):
     """
-    Run a shell command having target virtualenv active
+    Run a command in the target virtualenv.
+
+    The command is started directly from the virtualenv ``bin`` folder
+    with the environment ``bin/activate`` would set, without a shell.
+
+    :param args: List of arguments, the first being the command name
+
+    :param env: Dict of more environment variables
     """
-    # use "." instead of "source" beacuse Popen uses /bin/sh by default, "source" is /bin/bash specific
-    return shell(logger, '. %s/bin/activate ; %s' % (target, command), raise_error=raise_error)
+    args = [get_virtualenv_executable(target, args[0])] + list(args[1:])
+    return run_command(logger, args, env=get_virtualenv_environment(target, env), cwd=cwd, timeout=timeout, raise_error=raise_error)
 
 def install_npm(logger, target, package, raise_error=False):
     """
@@ -224,8 +263,7 @@ def install_npm(logger, target, package, raise_error=False):
 
     Runs NPM command and creates local package installation under target folder
     """
-    with temporary_working_directory(target):
-        return shell(logger, 'npm install  %s' % package, raise_error=raise_error)
+    return run_command(logger, ["npm", "install", package], cwd=target, raise_error=raise_error)
 
 def get_bin_path():
     """
@@ -7,20 +7,15 @@
 # ABCMeta workarounds, still waiting for pylint patches
 # pylint: disable=R0201, W0102, R0921, W0611
 
-import io
+import os
+import sys
+import time
+from traceback import format_exception
 
 from .plugin import Plugin
-
-
-def _open(file, flags):
-    """
-    Python 2.x / Python 3 cross-compatible file opener.
-
-    Ignore UTF-8 errors (otherwise readline() would raise an exception).
-
-    Don't try to undertand other encodings.
-    """
-    return io.open(file, flags, encoding="utf-8", errors="replace")
+from .filecontext import FileContext
+from .reporter import FirstError
+from vvv import profiler
 
 
 class TextLinePlugin(Plugin):
@@ -44,20 +39,143 @@ class TextLinePlugin(Plugin):
         """
         raise NotImplementedError("Subclass must implement")
 
+    def is_context_friendly(self):
+        """
+        Lines come from FileContext.
+        """
+        return True
+
+    def validate_context(self, context):
+        """
+        Run process_line() for each line of the already loaded file.
+        """
+
+        errors = False
+
+        fname = context.fullpath
+
+        for i, line in enumerate(context.get_lines(), 1):
+            if self.process_line(fname, i, line):
+                errors = True
+
+        return not errors
+
     def validate(self, fname):
         """
         Tabs validator code runs in-line.
         """
+        return self.validate_context(FileContext(os.path.dirname(fname), os.path.basename(fname)))
 
-        errors = False
 
-        i = 0
+def report_crash(reporter, plugin_id):
+    """
+    Report the exception being handled as an internal error of a plug-in.
 
-        with _open(fname, "rt") as f:
+    Re-raise it if we die on the first error.
+    """
+    etype, value, tb = sys.exc_info()
+    reporter.report_internal_error(plugin_id, ''.join(format_exception(etype, value, tb)))
+    if reporter.suicidal:
+        raise value
 
-            for line in f:
-                i += 1
-                if self.process_line(fname, i, line):
-                    errors = True
 
-        return not errors
+def run_text_line_plugins(plugins, context, matched=False):
+    """
+    Run several text line plug-ins against one file walking its lines only once.
+
+    Each plug-in reports its errors, uses the result cache and gives its hint
+    the same way as when run alone with Plugin.run().
+
+    :param plugins: List of TextLinePlugin instances
+
+    :param context: FileContext instance
+
+    :param matched: The match lists have already been checked, e.g. by PluginIndex
+    """
+
+    pending = []
+
+    for p in plugins:
+
+        try:
+            if not p.accepts(context, matched):
+                continue
+
+            key = None
+
+            if p.cache:
+                key = p.get_cache_key(context)
+                entry = p.cache.get(key)
+                if entry is not None:
+                    if not p.replay_cached(context, entry):
+                        p.hint_to_fix_errors()
+                    continue
+
+            p.install_on_demand()
+
+        except FirstError:
+            raise
+        except Exception:
+            report_crash(p.reporter, p.id)
+            continue
+
+        p.logger.debug("Applying plug-in %s on %s" % (p.id, context.fullpath))
+
+        pending.append((p, key))
+
+    if not pending:
+        return
+
+    reporter = pending[0][0].reporter
+
+    fname = context.fullpath
+
+    # Plug-ins which reported errors
+    failed = set()
+
+    # Plug-ins which raised an exception, dropped from the rest of the file
+    crashed = set()
+
+    # Each plug-in is timed separately although they share the pass over the lines
+    active = profiler.active
+    timings = dict((p, 0.0) for p, key in pending) if active else None
+
+    events = reporter.start_recording()
+    try:
+        for i, line in enumerate(context.get_lines(), 1):
+            for p, key in pending:
+
+                if p in crashed:
+                    continue
+
+                if timings is not None:
+                    started = time.perf_counter()
+
+                try:
+                    if p.process_line(fname, i, line):
+                        failed.add(p)
+                except FirstError:
+                    raise
+                except Exception:
+                    crashed.add(p)
+                    report_crash(reporter, p.id)
+
+                if timings is not None:
+                    timings[p] += time.perf_counter() - started
+    finally:
+        reporter.stop_recording(events)
+
+        if timings is not None:
+            for p, elapsed in timings.items():
+                active.add("validate", p.id, elapsed, [fname])
+
+    for p, key in pending:
+
+        if p in crashed:
+            continue
+
+        if key:
+            p.cache.put(key, [event for event in events if event[1][0] == p.id], p not in failed)
+
+        if p in failed:
+            p.hint_to_fix_errors()
@@ -6,12 +6,28 @@
 
 # Python imports
 import os
+import time
+import selectors
+import threading
 import subprocess
 import tempfile
 
+# Local imports
+from vvv import profiler
+from .cache import hash_data
+
+#: How many bytes of stdout and stderr are kept per command by default, the rest is dropped
+DEFAULT_OUTPUT_LIMIT = 4 * 1024 * 1024
+
 class ShellCommandFailed(Exception):
     """ Executing a shell command failed """
 
+class CommandTimeout(ShellCommandFailed):
+    """ Executed command did not finish in time and was killed """
+
+class CommandCancelled(ShellCommandFailed):
+    """ Executed command was killed because the run was aborted """
+
 def match_file(fullpath, matchlist):
     """
     Bzr style file matching.
@@ -53,6 +69,11 @@ def shell(logger, cmdline, raise_error=False):
     """
     Run a shell command.
 
+    .. deprecated:: 0.4.4
+
+        Kept for compatibility with third party plug-ins. Use :py:func:`run_command`
+        with a list of arguments instead, which does not go through a shell.
+
     :param cmd: Shell line to be executed
 
     :return: Tuple (return code, interleaved stdout and stderr output as string)
@@ -60,10 +81,12 @@ def shell(logger, cmdline, raise_error=False):
 
     logger.debug("Running command line: %s" % cmdline)
 
-    process = subprocess.Popen(cmdline, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
+    with profiler.measure("subprocess", get_command_name(cmdline)):
 
-    # XXX: Support stderr interleaving
-    out, err = process.communicate()
+        process = subprocess.Popen(cmdline, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
+
+        # XXX: Support stderr interleaving
+        out, err = process.communicate()
 
     # :E1103: *%s %r has no %r member (but some types could not be inferred)*
     # pylint: disable=E1103 
@@ -77,6 +100,304 @@ def shell(logger, cmdline, raise_error=False):
 
     return (process.returncode, out + err)    
 
+class BoundedBuffer(object):
+    """
+    Collect command output up to a limit.
+
+    Output after the limit is counted but not kept, so that a tool going haywire
+    cannot eat all memory. The command keeps running as its pipes are still drained.
+    """
+
+    def __init__(self, limit=DEFAULT_OUTPUT_LIMIT):
+        self.limit = limit
+        self.chunks = []
+        self.size = 0
+
+        #: Bytes dropped after the limit was hit
+        self.dropped = 0
+
+    def write(self, data):
+        """
+        Add read output.
+        """
+        room = self.limit - self.size
+        if room < len(data):
+            self.dropped += len(data) - max(room, 0)
+            data = data[:max(room, 0)]
+        if data:
+            self.chunks.append(data)
+            self.size += len(data)
+
+    def get_text(self):
+        """
+        :return: Collected output as a string
+        """
+        text = b"".join(self.chunks).decode("utf-8", "replace")
+        if self.dropped:
+            text += "\n[%d bytes of output dropped]\n" % self.dropped
+        return text
+
+
+class Executor(object):
+    """
+    Run external tools without a shell.
+
+    Commands are given as argument lists and started directly, so there is no
+    ``/bin/sh`` process in between and no quoting of file names.
+    stdout and stderr are read as the command runs into bounded buffers.
+    The number of commands running at once is capped by a semaphore,
+    which can be shared between worker processes.
+
+    When an asyncio event loop is set with :py:meth:`set_loop`, commands are started
+    in the loop with ``asyncio.create_subprocess_exec`` and can be cancelled,
+    see :py:class:`vvv.scheduler.AsyncScheduler`.
+    """
+
+    def __init__(self, max_processes=None):
+        """
+        :param max_processes: How many commands may run at once, defaults to the CPU count
+        """
+        self.limiter = threading.BoundedSemaphore(max_processes or os.cpu_count() or 1)
+
+        #: Event loop running in another thread where commands are started, or None
+        self.loop = None
+
+        #: concurrent.futures.Future objects of the commands running in the loop
+        self.running = set()
+
+        self.running_lock = threading.Lock()
+
+    def set_limiter(self, limiter):
+        """
+        Use a semaphore shared with other processes, e.g. multiprocessing.BoundedSemaphore.
+        """
+        self.limiter = limiter
+
+    def set_loop(self, loop):
+        """
+        Start commands in an asyncio event loop running in another thread, or None to start them directly.
+        """
+        self.loop = loop
+
+    def cancel_running(self):
+        """
+        Kill the commands running in the event loop.
+
+        The threads waiting for them get CommandCancelled.
+        """
+        with self.running_lock:
+            running = list(self.running)
+
+        for future in running:
+            future.cancel()
+
+    def run(self, logger, args, env=None, cwd=None, timeout=None, output_limit=DEFAULT_OUTPUT_LIMIT, raise_error=False):
+        """
+        Run a command and capture its output.
+
+        :param args: List of arguments, the first being the executable
+
+        :param env: Complete environment for the command, or None to use the current environment
+
+        :param cwd: Working directory for the command
+
+        :param timeout: Seconds after which the command is killed and CommandTimeout risen, or None
+
+        :param output_limit: Maximum bytes kept of stdout and stderr each
+
+        :return: Tuple (return code, stdout output followed by stderr output as string)
+        """
+
+        logger.debug("Running command line: %s" % args)
+
+        with self.limiter:
+            with profiler.measure("subprocess", os.path.basename(args[0])):
+                if self.loop is not None:
+                    returncode, out, err = self.communicate_in_loop(args, env, cwd, timeout, output_limit)
+                else:
+                    returncode, out, err = self.communicate(args, env, cwd, timeout, output_limit)
+
+        output = out.get_text() + err.get_text()
+
+        if raise_error and returncode != 0:
+            logger.error("Command output:")
+            logger.error(output)
+            raise ShellCommandFailed("The following command did not succeed: %s" % " ".join(args))
+
+        return (returncode, output)
+
+    def communicate(self, args, env, cwd, timeout, output_limit):
+        """
+        Start the command and read its output as it comes.
+
+        :return: Tuple (return code, stdout BoundedBuffer, stderr BoundedBuffer)
+        """
+
+        process = subprocess.Popen(args, env=env, cwd=cwd, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        out = BoundedBuffer(output_limit)
+        err = BoundedBuffer(output_limit)
+
+        deadline = time.monotonic() + timeout if timeout else None
+
+        with selectors.DefaultSelector() as selector:
+
+            selector.register(process.stdout, selectors.EVENT_READ, out)
+            selector.register(process.stderr, selectors.EVENT_READ, err)
+
+            try:
+                while selector.get_map():
+
+                    wait = None
+                    if deadline is not None:
+                        wait = deadline - time.monotonic()
+                        if wait <= 0:
+                            raise subprocess.TimeoutExpired(args, timeout)
+
+                    for key, events in selector.select(wait):
+                        data = os.read(key.fd, 65536)
+                        if data:
+                            key.data.write(data)
+                        else:
+                            selector.unregister(key.fileobj)
+                            key.fileobj.close()
+
+                returncode = process.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise CommandTimeout("The following command did not finish in %s seconds: %s" % (timeout, " ".join(args)))
+
+            finally:
+                for stream in (process.stdout, process.stderr):
+                    if not stream.closed:
+                        stream.close()
+
+        return returncode, out, err
+
+    def communicate_in_loop(self, args, env, cwd, timeout, output_limit):
+        """
+        Run communicate_async() in the event loop and wait for it in this thread.
+
+        :return: Tuple (return code, stdout BoundedBuffer, stderr BoundedBuffer)
+        """
+
+        # Imported only when needed to keep the start up fast
+        import asyncio
+        import concurrent.futures
+
+        future = asyncio.run_coroutine_threadsafe(self.communicate_async(args, env, cwd, timeout, output_limit), self.loop)
+
+        with self.running_lock:
+            self.running.add(future)
+
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise CommandCancelled("The following command was cancelled: %s" % " ".join(args))
+        finally:
+            with self.running_lock:
+                self.running.discard(future)
+
+    async def communicate_async(self, args, env, cwd, timeout, output_limit):
+        """
+        Start the command with ``asyncio.create_subprocess_exec`` and read its output as it comes.
+
+        The command is killed if the coroutine is cancelled.
+
+        :return: Tuple (return code, stdout BoundedBuffer, stderr BoundedBuffer)
+        """
+
+        import asyncio
+
+        process = await asyncio.create_subprocess_exec(*args, env=env, cwd=cwd, stdin=subprocess.DEVNULL,
+                                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        out = BoundedBuffer(output_limit)
+        err = BoundedBuffer(output_limit)
+
+        async def pump(stream, buffer):
+            while True:
+                data = await stream.read(65536)
+                if not data:
+                    break
+                buffer.write(data)
+
+        async def wait():
+            await asyncio.gather(pump(process.stdout, out), pump(process.stderr, err))
+            return await process.wait()
+
+        try:
+            returncode = await asyncio.wait_for(wait(), timeout)
+        except asyncio.TimeoutError:
+            await kill_process(process)
+            raise CommandTimeout("The following command did not finish in %s seconds: %s" % (timeout, " ".join(args)))
+        except asyncio.CancelledError:
+            await kill_process(process)
+            raise
+
+        return returncode, out, err
+
+
+async def kill_process(process):
+    """
+    Kill an asyncio subprocess unless it has already exited and wait for it.
+    """
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+    await process.wait()
+
+
+#: Executor used by all plug-ins
+executor = Executor()
+
+
+def run_command(logger, args, env=None, cwd=None, timeout=None, raise_error=False):
+    """
+    Run a command without a shell using the shared executor, see :py:class:`Executor`.
+
+    :param args: List of arguments, the first being the executable
+
+    :param env: Complete environment for the command, or None to use the current environment
+
+    :return: Tuple (return code, stdout output followed by stderr output as string)
+    """
+    return executor.run(logger, args, env=env, cwd=cwd, timeout=timeout, raise_error=raise_error)
+
+
+def get_environment(extra=None, path=None):
+    """
+    Prepare an environment for a command.
+
+    :param extra: Dict of environment variables to add
+
+    :param path: Folder put first in PATH, or None
+
+    :return: Dict
+    """
+    env = os.environ.copy()
+    if path:
+        env["PATH"] = path + os.pathsep + env.get("PATH", "")
+    if extra:
+        env.update(extra)
+    return env
+
+
+def get_command_name(cmdline):
+    """
+    Get the name of the executed command for profiling, e.g. ``pylint`` for ``. venv/bin/activate ; pylint foo.py``.
+
+    Only used by the deprecated :py:func:`shell`.
+    """
+    words = cmdline.split(";")[-1].split()
+    if not words:
+        return cmdline
+    return os.path.basename(words[0])
+
 class TempConfigFile:
     """
     Content guard which creates a temporary file which can be passed as ini/rc file to the executed command.
@@ -99,12 +420,34 @@ class TempConfigFile:
         return self.f.name
 
     def __exit__(self, exit_type, value, traceback):
-        self.f.unlink(self.f.name)
+        os.unlink(self.f.name)
 
 def temp_config_file(config_data):
     return TempConfigFile(config_data)
 
 
+def get_config_file(folder, prefix, config_data):
+    """
+    Write config data to a file named by its content, e.g. for a worker process used for the whole run.
+
+    Unlike temp_config_file() nothing needs to be removed afterwards,
+    and the same file is used again by the next runs.
+
+    :return: Full path to the config file
+    """
+
+    fpath = os.path.join(folder, "%s-%s" % (prefix, hash_data(config_data)))
+
+    if not os.path.exists(fpath):
+        os.makedirs(folder, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=folder)
+        with os.fdopen(fd, "wt") as f:
+            f.write(config_data)
+        os.replace(temp, fpath)
+
+    return fpath
+
+
 class TemporaryWorkingDirectory:
     """
     Temporary change working directory and fall back to the current directory when the commands have been executed.
@@ -154,3 +497,101 @@ def snip_output(output, marker):
     return "\n".join(passed)
 
 
+def get_max_command_line_length():
+    """
+    How long command lines we can safely pass to the operating system.
+
+    Leave plenty of room for the environment variables.
+    """
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        # Windows
+        arg_max = 32768
+
+    if arg_max <= 0:
+        arg_max = 32768
+
+    return min(arg_max // 2, 128 * 1024)
+
+
+def split_arguments(args, max_length=None):
+    """
+    Split a list of command line arguments to chunks which fit on one command line.
+
+    :param args: List of arguments, e.g. file names
+
+    :param max_length: Maximum total length of the arguments in one chunk
+
+    :return: Generator of argument lists
+    """
+
+    if max_length is None:
+        max_length = get_max_command_line_length()
+
+    chunk = []
+    length = 0
+
+    for arg in args:
+        # Separator and some slack
+        arg_length = len(arg) + 3
+
+        if chunk and length + arg_length > max_length:
+            yield chunk
+            chunk = []
+            length = 0
+
+        chunk.append(arg)
+        length += arg_length
+
+    if chunk:
+        yield chunk
+
+
+def split_output(output, get_fname):
+    """
+    Split output of a validator run against several files back to individual files.
+
+    The output of each file must start with a line which tells the file name.
+    The lines following it belong to the same file until another file name line is found.
+
+    :param output: Command output as a string
+
+    :param get_fname: Function(line) returning the file name if the line starts output for a file, otherwise None.
+        If the file cannot be recognized, return some other key to keep its output apart.
+
+    :return: Dict file name -> output. Output before any file name line is under None key.
+    """
+
+    outputs = {}
+    current = None
+
+    for line in output.split("\n"):
+
+        fname = get_fname(line)
+        if fname is not None:
+            current = fname
+
+        outputs.setdefault(current, []).append(line)
+
+    return dict((fname, "\n".join(lines)) for fname, lines in outputs.items())
+
+
+def get_prefix_matcher(fnames, separator=":"):
+    """
+    Create get_fname function for split_output() for tools which start each message line with the file name.
+
+    E.g. pyflakes and pep8 output ``foo.py:12: undefined name 'bar'``.
+    """
+    fnames = set(fnames)
+
+    def get_fname(line):
+        """
+        :return: File name if the line is a message for a file
+        """
+        fname = line.split(separator, 1)[0]
+        if fname in fnames:
+            return fname
+        return None
+
+    return get_fname
@@ -70,6 +70,7 @@ from collections import OrderedDict
 
 # Local imports
 from vvv.plugin import Plugin
+from vvv import utils
 #from vvv.utils import get_string_option
 
 from vvv import sysdeps
@@ -99,6 +100,15 @@ DOWNLOAD_AND_EXTRACT = OrderedDict(DOWNLOAD_AND_EXTRACT)
 #: If these are found in the output assume CSS validation failed
 VALIDATOR_ERRORS = ["Sorry!", 'Exception in thread "main"']
 
+#: If this is found in the output the validator did not run
+VALIDATOR_CRASH = 'Exception in thread "main"'
+
+#: W3C prints this before the results of each file
+RESULTS_HEADER = "W3C CSS Validator results for "
+
+#: W3C prints out all valid CSS as last and we are not really interested in that...
+VALID_CSS_INFO = "Valid CSS information"
+
 class CSSPlugin(Plugin):
     """
     W3C CSS validator driver.
@@ -109,7 +119,10 @@ class CSSPlugin(Plugin):
         Plugin.__init__(self)
 
         #: Commandl line options passed to the validator from the config file
-        self.extra_options = None        
+        self.extra_options = None
+
+        #: Java CLASSPATH for the validator JARs
+        self.classpath = None
 
     def setup_local_options(self):
         """ """
@@ -139,6 +152,18 @@ class CSSPlugin(Plugin):
         path = os.path.join(self.installation_path, keys[-1])
         return os.path.exists(path)
 
+    def get_tool_path(self):
+        """
+        :return: The last downloaded file
+        """
+        return os.path.join(self.installation_path, list(DOWNLOAD_AND_EXTRACT.keys())[-1])
+
+    def get_tool_version(self):
+        """
+        :return: Downloaded URLs, which contain the versions
+        """
+        return " ".join(DOWNLOAD_AND_EXTRACT.values())
+
     def check_requirements(self):
         """
         """
@@ -153,13 +178,21 @@ class CSSPlugin(Plugin):
             path = os.path.join(self.installation_path, fname)
             download.download_and_extract_java_dep(self.logger, path, url)
 
-    def validate(self, fname):
+    def is_batch_friendly(self):
         """
-        Run installed CSS validator against a file.
+        W3C validator accepts many URLs on one command line, so we start Java only once.
         """
-        classpath = ""
+        return True
 
-        fullpath = os.path.abspath(fname)
+    def get_classpath(self):
+        """
+        :return: CLASSPATH for the validator JARs
+        """
+
+        if self.classpath:
+            return self.classpath
+
+        classpath = ""
 
         # Java @__@ .... remembered why I hated it
 
@@ -172,23 +205,96 @@ class CSSPlugin(Plugin):
         classpath += os.path.join(self.installation_path, "velocity/velocity-1.7/velocity-1.7.jar") + os.pathsep
         classpath += os.path.join(jigsaw, "xerces.jar") + os.pathsep
         classpath += os.path.join(jigsaw, "jigsaw.jar") + os.pathsep
-        classpath += os.path.join(jigsaw, "xp.jar") + os.pathsep                
-        classpath += os.path.join(jigsaw, "sax.jar") + os.pathsep       
-        classpath += os.path.join(jigsaw, "servlet.jar") + os.pathsep       
-        classpath += os.path.join(jigsaw, "Tidy.jar") + os.pathsep      
+        classpath += os.path.join(jigsaw, "xp.jar") + os.pathsep
+        classpath += os.path.join(jigsaw, "sax.jar") + os.pathsep
+        classpath += os.path.join(jigsaw, "servlet.jar") + os.pathsep
+        classpath += os.path.join(jigsaw, "Tidy.jar") + os.pathsep
         classpath += os.path.join(jigsaw, "tagsoup-1.2.jar")
 
-        # XXX: We should not split here, but pass in command line optons
-        # as shell string 
-        options = self.extra_options.split()
+        self.classpath = classpath
+
+        return classpath
+
+    def get_command_line(self, fnames):
+        """
+        :return: Command line validating files
+        """
+
+        options = self.split_command(self.extra_options)
 
         cmdline = ["java", "org.w3c.css.css.CssValidator"]
         cmdline += options
-        cmdline += ["file://" + fullpath]
+        cmdline += ["file://" + os.path.abspath(fname) for fname in fnames]
 
-        # W3C prints out all valid CSS and we are not really interested in that... 
-        # It prints valid CSS as last and we simply crop this tail out
-        snip = "Valid CSS information"
+        return cmdline
+
+    def validate(self, fname):
+        """
+        Run installed CSS validator against a file.
+        """
 
+        cmdline = self.get_command_line([fname])
+
+        # W3C prints out all valid CSS and we are not really interested in that...
+        # It prints valid CSS as last and we simply crop this tail out
         # ...does not even have return code...
-        return self.run_command_line(cmdline, bad_string=VALIDATOR_ERRORS, snip_string=snip, env=dict(CLASSPATH=classpath))
+        return self.run_command_line(cmdline, bad_string=VALIDATOR_ERRORS, snip_string=VALID_CSS_INFO, env=dict(CLASSPATH=self.get_classpath()), fname=fname)
+
+    def validate_batch(self, fnames):
+        """
+        Run CSS validator once for many files.
+
+        The results of each file start with ``W3C CSS Validator results for file:...`` line.
+        If the output cannot be split to files, they are validated one by one.
+        """
+
+        results = {}
+
+        for chunk in utils.split_arguments(fnames):
+
+            output = self.capture_command_line(self.get_command_line(chunk), env=dict(CLASSPATH=self.get_classpath()))
+
+            outputs = utils.split_output(output, get_fname_matcher(chunk))
+
+            if VALIDATOR_CRASH in outputs.get(None, "") or any(key not in chunk for key in outputs if key is not None) \
+                    or any(fname not in outputs for fname in chunk):
+                self.logger.debug("%s: could not split batch output, validating files one by one" % self.id)
+                results.update(Plugin.validate_batch(self, chunk))
+                continue
+
+            for fname in chunk:
+
+                file_output = outputs[fname]
+
+                success = not any(match in file_output for match in VALIDATOR_ERRORS)
+
+                if not success:
+                    self.reporter.report_unstructured(self.id, utils.snip_output(file_output, VALID_CSS_INFO), fname=fname)
+
+                results[fname] = success
+
+        return results
+
+
+def get_fname_matcher(fnames):
+    """
+    Create get_fname function for utils.split_output() matching W3C validator result headers.
+
+    Java may print ``file:///foo.css`` URLs as ``file:/foo.css``, so the paths are compared without the URL scheme and slashes.
+    """
+
+    paths = dict((os.path.abspath(fname).lstrip("/"), fname) for fname in fnames)
+
+    def get_fname(line):
+        """ :return: File name from the header line """
+        if not line.startswith(RESULTS_HEADER):
+            return None
+
+        url = line[len(RESULTS_HEADER):].split(" ")[0]
+
+        path = url[len("file:"):].lstrip("/") if url.startswith("file:") else url
+
+        # Unknown files are kept apart
+        return paths.get(path, url)
+
+    return get_fname
@@ -62,6 +62,15 @@ command-line
 
 Pass in extra arguments for the jshint command line.
 
+worker
+++++++
+
+If ``true`` (default) Node.js is started once per run with jshint and the *configuration*
+loaded, and the files are sent to it one by one. Errors are reported with line and column numbers.
+Not used with *command-line* options.
+
+Set to ``false`` to run jshint command for many files at once instead.
+
 Mass adding global hints
 --------------------------------
 
@@ -77,8 +86,11 @@ More info
 """
 
 import os
+import json
+import logging
 
 from vvv.plugin import Plugin
+from vvv.worker import WorkerProcess
 
 from vvv import utils
 from vvv import sysdeps
@@ -86,6 +98,9 @@ from vvv import sysdeps
 #: Command-line options given to jshint always
 DEFAULT_COMMAND_LINE = ""
 
+#: Node.js script validating files with jshint loaded once
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "jshintworker.js")
+
 class JSHintPlugin(Plugin):
     """
     jshint driver
@@ -144,32 +159,135 @@ class JSHintPlugin(Plugin):
         """
         return os.path.exists(self.get_jshint_bin())
 
+    def get_tool_path(self):
+        """
+        :return: npm package manifest of the installed jshint
+        """
+        return os.path.join(self.jshint_path, "node_modules", "jshint", "package.json")
+
+    def get_tool_version(self):
+        """
+        :return: Version of the installed jshint npm package
+        """
+        try:
+            with open(self.get_tool_path(), "rt") as f:
+                return json.load(f).get("version")
+        except (IOError, OSError, ValueError):
+            return None
+
     def install(self):
         """ """
         sysdeps.install_npm(self.logger, self.jshint_path, "jshint", raise_error=True)
 
-    def validate(self, fname):
+    def is_batch_friendly(self):
         """
-        Run installed jshint against a file.
+        jshint accepts many files on one command line.
+        """
+        return not self.uses_worker()
+
+    def is_worker_friendly(self):
+        """
+        jshint can run in a worker unless we have been given command line options.
+        """
+        return not self.extra_options.strip()
+
+    def is_context_friendly(self):
+        """
+        The worker validates the file content loaded by VVV.
+        """
+        return self.uses_worker()
+
+    def is_subprocess_bound(self):
+        """
+        The worker runs in Node.js.
+        """
+        return True
+
+    def create_worker(self):
+        """
+        :return: Node.js worker with jshint and the configuration loaded
+        """
+
+        args = ["node", WORKER_SCRIPT, os.path.join(self.jshint_path, "node_modules", "jshint")]
+
+        if self.configuration and self.configuration.strip() != "":
+            args.append(utils.get_config_file(self.jshint_path, "jshintrc", self.configuration))
+
+        return WorkerProcess(self.logger, args, timeout=self.timeout)
+
+    def run_jshint(self, fnames):
+        """
+        Run installed jshint against files.
+
+        :return: Tuple (exit code, output)
         """
 
         with utils.temp_config_file(self.configuration) as config_fname:
-            
+
             # https://github.com/jshint/node-jshint/
 
-            options = self.extra_options
-            if not "--config" in options:
+            options = self.split_command(self.extra_options)
+            if not "--config" in self.extra_options:
                 if self.configuration and self.configuration.strip() != "":
                     # Make sure we don't pass empty config file as jshint seems to choke on it
-                    options += " --config '%s'" % config_fname
+                    options += ["--config", config_fname]
+
+            return self.run_command(["node", self.get_jshint_bin()] + fnames + options)
+
+    def validate_context(self, context):
+        """
+        Send the file content to the worker and report the errors it found.
+        """
+
+        response = None
+
+        if self.uses_worker():
+            response = self.validate_in_worker(dict(file=context.fullpath, source=context.get_text()))
+
+        if response is None:
+            return self.validate_fallback(context)
+
+        lines = context.get_lines()
+
+        for error in response["errors"]:
+
+            line = error.get("line") or 0
 
-            # W:100,10:Unused variable'
-            # pylint: disable = W0612    
+            excerpt = error.get("evidence")
+            if excerpt is None and 0 < line <= len(lines):
+                excerpt = lines[line - 1].rstrip("\n")
 
-            exitcode, output = utils.shell(self.logger, 'node %s "%s" %s' % (self.get_jshint_bin(), fname, options))
+            self.reporter.report_detailed(self.id, logging.ERROR, context.fullpath, line, error.get("character"),
+                                          error.get("code"), error.get("reason"), excerpt=excerpt)
+
+        return not response["errors"]
+
+    def validate(self, fname):
+        """
+        Run installed jshint against a file.
+        """
+
+        # W:100,10:Unused variable'
+        # pylint: disable = W0612
+
+        exitcode, output = self.run_jshint([fname])
+
+        if "error" in output:
+            self.reporter.report_unstructured(self.id, output, fname=fname)
+            return False
+
+        return True
+
+    def validate_batch(self, fnames):
+        """
+        Run jshint once for many files.
+
+        jshint prefixes each message line with the file name.
+        """
 
-            if "error" in output:
-                self.reporter.report_unstructured(self.id, output, fname=fname)
-                return False
+        def command(chunk):
+            """ Run one command line """
+            exitcode, output = self.run_jshint(chunk)
+            return "error" in output, output
 
-        return True
\ No newline at end of file
+        return self.run_batch_command(fnames, command, utils.get_prefix_matcher)
@@ -30,6 +30,9 @@ host-python-env
 If ``true`` do not create a virtualenv for running pep8, but install pep8 using
 the active ``python`` environment where vvv is run.
 
+If pep8 can be imported in the VVV Python environment, and ``pep8-command`` is not given,
+pep8 is run inside the VVV process instead of starting a new ``pep8`` process.
+
 Default is ``false``.
 
 .. note ::
@@ -86,12 +89,16 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 # Python imports
 import os
+import sys
+import shlex
+import logging
 
 # Local imports
 from vvv.plugin import Plugin
 from vvv import utils
 
 from vvv import sysdeps
+from vvv.filecontext import FileContext
 
 DEFAULT_COMMAND_LINE = ""
 
@@ -123,6 +130,9 @@ class PEP8Plugin(Plugin):
         #: Location of virtualenv.py if operating system cannot supply working one
         self.virtualenv_cmd = None
 
+        #: pep8.StyleGuide if we run pep8 inside VVV process, otherwise None
+        self.style = None
+
     def setup_local_options(self):
         """ """
 
@@ -146,6 +156,9 @@ class PEP8Plugin(Plugin):
         # vary by Python version so we don't get conflicting envs
         self.virtualenv = os.path.join(self.installation_path, "pep8-virtualenv-%s" % "python3k" if self.python3k else "python2")
 
+        if self.host_python and not self.pep8_command:
+            self.style = self.create_style()
+
     def get_default_matchlist(self):
         """
         These files go into the validator.
@@ -159,6 +172,9 @@ class PEP8Plugin(Plugin):
         See if we have installed working virtualenv for pep8
         """
 
+        if self.style:
+            return True
+
         if self.host_python:
             return sysdeps.which("pep8")
 
@@ -167,6 +183,32 @@ class PEP8Plugin(Plugin):
         self.logger.debug("pep8 virtualenv status: %s" % "good" if exists else "bad")
         return exists
 
+    def get_tool_path(self):
+        """
+        :return: pep8 module or command used to validate files
+        """
+
+        if self.style:
+            return sys.modules["pep8"].__file__
+
+        if self.pep8_command:
+            return sysdeps.which(self.pep8_command)
+
+        if self.host_python:
+            return sysdeps.which("pep8")
+
+        return os.path.join(self.virtualenv, "bin", "pep8")
+
+    def get_tool_version(self):
+        """
+        :return: Version of pep8 running inside VVV process
+        """
+
+        if self.style:
+            return getattr(sys.modules["pep8"], "__version__", None)
+
+        return None
+
     def resolve_pep8(self, cmd):
         """
         Resolve location to pep8 command.
@@ -189,15 +231,15 @@ class PEP8Plugin(Plugin):
         if not self.pep8_command:
             sysdeps.has_virtualenv(needed_for="PEP8 validator")
 
-    def run_virtualenv_command(self, cmd, raise_error=False):
+    def run_virtualenv_command(self, args, raise_error=False):
         """
-        Run cmd under host Python or our own virtualenv
+        Run command under host Python or our own virtualenv
         """
 
         if self.host_python:
-            return utils.shell(self.logger, cmd, raise_error=raise_error)
+            return self.run_command(args, raise_error=raise_error)
         else:
-            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, cmd, raise_error=raise_error)
+            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, args, raise_error=raise_error, timeout=self.timeout)
 
     def install(self):
         """
@@ -210,22 +252,118 @@ class PEP8Plugin(Plugin):
         if not self.host_python:
             sysdeps.create_virtualenv(self.logger, self.virtualenv_cmd, self.virtualenv, py3=self.python3k)
 
-        self.run_virtualenv_command("easy_install pep8", raise_error=True)
+        self.run_virtualenv_command(["easy_install", "pep8"], raise_error=True)
 
-    def validate(self, fname):
+    def is_batch_friendly(self):
         """
-        Run installed pep8 validator against a file.
+        PEP8 accepts many files on one command line.
+        """
+        return not self.style
+
+    def is_context_friendly(self):
+        """
+        PEP8 run inside VVV process checks the file content loaded by VVV.
+        """
+        return bool(self.style)
+
+    def create_style(self):
+        """
+        Set up pep8 for running inside VVV process.
+
+        Command line options and the project pep8 configuration are read like the pep8 command would do.
+
+        :return: pep8.StyleGuide or None if pep8 is not installed in VVV Python environment
+        """
+
+        try:
+            import pep8
+        except ImportError:
+            return None
+
+        # The project folder is passed as a path, so that pep8 finds setup.cfg or tox.ini there
+        arglist = shlex.split(self.extra_options) + [self.project_path]
+
+        return pep8.StyleGuide(paths=arglist, reporter=create_report_class(pep8, self))
+
+    def run_pep8(self, fnames):
         """
+        Run installed pep8 command against files.
 
-        options = self.extra_options
+        :return: Tuple (exit code, output)
+        """
+
+        options = self.split_command(self.extra_options)
 
         if self.pep8_command:
-            exitcode, output = utils.shell(self.logger, '%s %s "%s"' % (self.pep8_command, options, fname))
+            return self.run_command(self.split_command(self.pep8_command) + options + fnames)
         else:
-            exitcode, output = self.run_virtualenv_command('pep8 %s "%s"' % (options, fname))
+            return self.run_virtualenv_command(["pep8"] + options + fnames)
+
+    def validate_context(self, context):
+        """
+        Run pep8 inside VVV process against already loaded file.
+        """
+
+        if not self.style:
+            return Plugin.validate_context(self, context)
+
+        return self.style.input_file(context.fullpath, lines=context.get_lines()) == 0
+
+    def validate(self, fname):
+        """
+        Run installed pep8 validator against a file.
+        """
+
+        if self.style:
+            return self.validate_context(FileContext(os.path.dirname(fname), os.path.basename(fname)))
+
+        exitcode, output = self.run_pep8([fname])
 
         if exitcode == 0:
             return True     # Validation ok
         else:
             self.reporter.report_unstructured(self.id, output, fname=fname)
             return False
+
+    def validate_batch(self, fnames):
+        """
+        Run pep8 once for many files.
+
+        PEP8 prefixes each message line with the file name.
+        """
+
+        def command(chunk):
+            """ Run one command line """
+            exitcode, output = self.run_pep8(chunk)
+            return exitcode != 0, output
+
+        return self.run_batch_command(fnames, command, utils.get_prefix_matcher)
+
+
+def create_report_class(pep8, plugin):
+    """
+    Create pep8 report class passing pep8 messages to VVV reporter.
+
+    pep8 is imported only when it is used, so we cannot subclass its report class on the module level.
+
+    :param pep8: pep8 module
+
+    :param plugin: PEP8Plugin instance
+    """
+
+    class Report(pep8.BaseReport):
+        """
+        pep8 report giving messages to VVV reporter.
+        """
+
+        def error(self, line_number, offset, text, check):
+            """
+            Report an error, unless it is ignored in options.
+            """
+            code = pep8.BaseReport.error(self, line_number, offset, text, check)
+            if code:
+                excerpt = self.lines[line_number - 1].rstrip("\r\n") if line_number <= len(self.lines) else None
+                plugin.reporter.report_detailed(plugin.id, logging.ERROR, self.filename, line_number, offset + 1, code, text[5:], excerpt=excerpt)
+            return code
+
+    return Report
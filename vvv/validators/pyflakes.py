@@ -21,6 +21,9 @@ host-python-env
 If ``true`` do not create a virtualenv for running pyflakes, but install pyflakes using
 the active ``python`` environment where vvv is run.
 
+If pyflakes can be imported in the VVV Python environment, and ``pyflakes-command`` is not given,
+pyflakes is run inside the VVV process instead of starting a new ``pyflakes`` process.
+
 Default is ``false``.
 
 .. note ::
@@ -62,12 +65,15 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 # Python imports
 import os
+import sys
+import logging
 
 # Local imports
 from vvv.plugin import Plugin
 from vvv import utils
 
 from vvv import sysdeps
+from vvv.filecontext import FileContext
 
 DEFAULT_COMMAND_LINE = ""
 
@@ -96,6 +102,9 @@ class PyflakesPlugin(Plugin):
         #: Location of virtualenv.py if operating system cannot supply working one
         self.virtualenv_cmd = None
 
+        #: pyflakes.api module if we run pyflakes inside VVV process, otherwise None
+        self.pyflakes_api = None
+
     def setup_local_options(self):
         """ """
 
@@ -117,6 +126,9 @@ class PyflakesPlugin(Plugin):
         # vary by Python version so we don't get conflicting envs
         self.virtualenv = os.path.join(self.installation_path, "pyflakes-virtualenv-python2")
 
+        if self.host_python and not self.pyflakes_command:
+            self.pyflakes_api = import_pyflakes()
+
     def get_default_matchlist(self):
         """
         These files go into the validator.
@@ -130,6 +142,9 @@ class PyflakesPlugin(Plugin):
         See if we have installed working virtualenv for pyflakes
         """
 
+        if self.pyflakes_api:
+            return True
+
         if self.host_python:
             return sysdeps.which("pyflakes")
 
@@ -138,6 +153,32 @@ class PyflakesPlugin(Plugin):
         self.logger.debug("pyflakes virtualenv status: %s" % "good" if exists else "bad")
         return exists
 
+    def get_tool_path(self):
+        """
+        :return: pyflakes module or command used to validate files
+        """
+
+        if self.pyflakes_api:
+            return self.pyflakes_api.__file__
+
+        if self.pyflakes_command:
+            return sysdeps.which(self.pyflakes_command)
+
+        if self.host_python:
+            return sysdeps.which("pyflakes")
+
+        return os.path.join(self.virtualenv, "bin", "pyflakes")
+
+    def get_tool_version(self):
+        """
+        :return: Version of pyflakes running inside VVV process
+        """
+
+        if self.pyflakes_api:
+            return getattr(sys.modules.get("pyflakes"), "__version__", None)
+
+        return None
+
     def resolve_pyflakes(self, cmd):
         """
         Resolve location to pyflakes command.
@@ -160,15 +201,15 @@ class PyflakesPlugin(Plugin):
         if not self.pyflakes_command:
             sysdeps.has_virtualenv(needed_for="Pyflakes validator")
 
-    def run_virtualenv_command(self, cmd, raise_error=False):
+    def run_virtualenv_command(self, args, raise_error=False):
         """
-        Run cmd under host Python or our own virtualenv
+        Run command under host Python or our own virtualenv
         """
 
         if self.host_python:
-            return utils.shell(self.logger, cmd, raise_error=raise_error)
+            return self.run_command(args, raise_error=raise_error)
         else:
-            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, cmd, raise_error=raise_error)
+            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, args, raise_error=raise_error, timeout=self.timeout)
 
     def install(self):
         """
@@ -181,22 +222,134 @@ class PyflakesPlugin(Plugin):
         if not self.host_python:
             sysdeps.create_virtualenv(self.logger, self.virtualenv_cmd, self.virtualenv, py3=False)
 
-        self.run_virtualenv_command("easy_install pyflakes", raise_error=True)
+        self.run_virtualenv_command(["easy_install", "pyflakes"], raise_error=True)
 
-    def validate(self, fname):
+    def is_batch_friendly(self):
         """
-        Run installed pyflakes validator against a file.
+        Pyflakes accepts many files on one command line.
         """
+        return not self.pyflakes_api
 
-        options = self.extra_options
+    def is_context_friendly(self):
+        """
+        Pyflakes run inside VVV process checks the file content loaded by VVV.
+        """
+        return bool(self.pyflakes_api)
+
+    def run_pyflakes(self, fnames):
+        """
+        Run installed pyflakes command against files.
+
+        :return: Tuple (exit code, output)
+        """
+
+        options = self.split_command(self.extra_options)
 
         if self.pyflakes_command:
-            exitcode, output = utils.shell(self.logger, '%s %s "%s"' % (self.pyflakes_command, options, fname))
+            return self.run_command(self.split_command(self.pyflakes_command) + options + fnames)
         else:
-            exitcode, output = self.run_virtualenv_command('pyflakes %s "%s"' % (options, fname))
+            return self.run_virtualenv_command(["pyflakes"] + options + fnames)
+
+    def validate_context(self, context):
+        """
+        Run pyflakes inside VVV process against already loaded file.
+        """
+
+        if not self.pyflakes_api:
+            return Plugin.validate_context(self, context)
+
+        reporter = PyflakesReporter(self.reporter, self.id, context.get_lines())
+
+        self.pyflakes_api.check(context.get_text(), context.fullpath, reporter)
+
+        return not reporter.failed
+
+    def validate(self, fname):
+        """
+        Run installed pyflakes validator against a file.
+        """
+
+        if self.pyflakes_api:
+            return self.validate_context(FileContext(os.path.dirname(fname), os.path.basename(fname)))
+
+        exitcode, output = self.run_pyflakes([fname])
 
         if exitcode == 0:
             return True     # Validation ok
         else:
             self.reporter.report_unstructured(self.id, output, fname=fname)
             return False
+
+    def validate_batch(self, fnames):
+        """
+        Run pyflakes once for many files.
+
+        Pyflakes prefixes each message line with the file name.
+        """
+
+        def command(chunk):
+            """ Run one command line """
+            exitcode, output = self.run_pyflakes(chunk)
+            return exitcode != 0, output
+
+        return self.run_batch_command(fnames, command, utils.get_prefix_matcher)
+
+
+def import_pyflakes():
+    """
+    :return: pyflakes.api module or None if pyflakes is not installed in VVV Python environment
+    """
+    try:
+        from pyflakes import api
+    except ImportError:
+        return None
+    return api
+
+
+class PyflakesReporter(object):
+    """
+    Pass pyflakes messages to VVV reporter.
+
+    Implements the interface of pyflakes.reporter.Reporter.
+    """
+
+    def __init__(self, reporter, plugin_id, lines):
+        """
+        :param lines: Lines of the checked file for excerpts
+        """
+        self.reporter = reporter
+        self.plugin_id = plugin_id
+        self.lines = lines
+        self.failed = False
+
+    def get_excerpt(self, lineno):
+        """
+        :return: The source line or None
+        """
+        if lineno and lineno <= len(self.lines):
+            return self.lines[lineno - 1].rstrip("\r\n")
+        return None
+
+    def report(self, fname, lineno, col, error_id, msg):
+        """
+        Report one message.
+
+        :param col: Column starting from 1 or None
+        """
+        self.failed = True
+        lineno = max(lineno or 0, 1)
+        self.reporter.report_detailed(self.plugin_id, logging.ERROR, fname, lineno, col, error_id, msg, excerpt=self.get_excerpt(lineno))
+
+    def unexpectedError(self, filename, msg):
+        """ The file could not be read """
+        self.report(filename, 1, None, "unexpected error", msg)
+
+    def syntaxError(self, filename, msg, lineno, offset, text):
+        """ The file could not be parsed """
+        # W0613 Unused argument
+        # pylint: disable=W0613
+        self.report(filename, lineno, max(offset, 1) if offset is not None else None, "syntax error", msg)
+
+    def flake(self, message):
+        """ pyflakes found something wrong with the code """
+        self.report(message.filename, message.lineno, message.col + 1, message.__class__.__name__, message.message % message.message_args)
@@ -85,6 +85,16 @@ Example::
       # Points to buildout/bin/pylint command two levels below project folder
       pylint-command: ../../bin/pylint
 
+worker
+++++++
+
+If ``true`` (default) pylint is started once per run in the pylint Python environment
+and files are sent to it one by one. astroid keeps what it has inferred of the imported
+modules between files, so shared dependencies are analysed only once.
+Not used with ``pylint-command``.
+
+Set to ``false`` to run pylint command for many files at once instead.
+
 command-line
 ++++++++++++
 
@@ -181,9 +191,11 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 # Python imports
 import os
+import sys
 
 # Local imports
 from vvv.plugin import Plugin
+from vvv.worker import WorkerProcess
 from vvv import utils
 
 from vvv import sysdeps
@@ -195,6 +207,40 @@ DEFAULT_CONFIG = """
 
 """
 
+#: Pylint prints this before messages of each module
+MODULE_HEADER = "************* Module "
+
+#: Script run with the Python of the pylint installation, see :py:mod:`vvv.scripts.pylintworker`
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "pylintworker.py")
+
+
+def get_module_file(module, fnames):
+    """
+    Find the file of a Python module reported by pylint.
+
+    :param module: Dotted module name
+
+    :param fnames: Files given to pylint
+
+    :return: File name or None if the module does not match exactly one file
+    """
+
+    suffix = os.sep + module.replace(".", os.sep)
+
+    matches = []
+
+    for fname in fnames:
+        path = os.path.splitext(fname)[0]
+        if os.path.basename(path) == "__init__":
+            path = os.path.dirname(path)
+        if (os.sep + path).endswith(suffix):
+            matches.append(fname)
+
+    if len(matches) == 1:
+        return matches[0]
+
+    return None
+
 
 class PylintPlugin(Plugin):
     """
@@ -272,6 +318,19 @@ class PylintPlugin(Plugin):
         self.logger.debug("Pylint virtualenv status: %s" % "good" if exists else "bad")
         return exists
 
+    def get_tool_path(self):
+        """
+        :return: pylint command used to validate files
+        """
+
+        if self.pylint_command:
+            return sysdeps.which(self.pylint_command)
+
+        if self.host_python:
+            return sysdeps.which("pylint")
+
+        return os.path.join(self.virtualenv, "bin", "pylint")
+
     def resolve_pylint(self, cmd):
         """
         Resolve location to pylint command.
@@ -294,15 +353,15 @@ class PylintPlugin(Plugin):
         if not self.pylint_command:
             sysdeps.has_virtualenv(needed_for="Pylint validator")
 
-    def run_virtualenv_command(self, cmd, raise_error=False):
+    def run_virtualenv_command(self, args, raise_error=False, cwd=None, env=None):
         """
-        Run cmd under host Python or our own virtualenv
+        Run command under host Python or our own virtualenv
         """
 
         if self.host_python:
-            return utils.shell(self.logger, cmd, raise_error=raise_error)
+            return self.run_command(args, raise_error=raise_error, cwd=cwd, env=utils.get_environment(env) if env else None)
         else:
-            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, cmd, raise_error=raise_error)
+            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, args, raise_error=raise_error, cwd=cwd, env=env, timeout=self.timeout)
 
     def install(self):
         """
@@ -347,27 +406,84 @@ class PylintPlugin(Plugin):
             # If path exist, assume it's prior working download
             download.download_and_extract_gz(self.logger, pylint_download_path, "http://pypi.python.org/packages/source/p/pylint/pylint-0.25.1.tar.gz")
 
-        self.run_virtualenv_command("easy_install logilab-common", raise_error=True)
+        self.run_virtualenv_command(["easy_install", "logilab-common"], raise_error=True)
 
         # Use py3k patched logilab-astng
-        self.run_virtualenv_command("easy_install https://github.com/downloads/miohtama/vvv/logilab-astng-0.23.1-py3-patched.tar.gz", raise_error=True)
-        self.run_virtualenv_command("cd %s ; NO_SETUPTOOLS=1 %s setup.py install --no-compile" % (pylint_extract_path, python), raise_error=True)
+        self.run_virtualenv_command(["easy_install", "https://github.com/downloads/miohtama/vvv/logilab-astng-0.23.1-py3-patched.tar.gz"], raise_error=True)
+        self.run_virtualenv_command(self.split_command(python) + ["setup.py", "install", "--no-compile"],
+                                    cwd=pylint_extract_path, env=dict(NO_SETUPTOOLS="1"), raise_error=True)
 
-    def validate(self, fname):
+    def is_batch_friendly(self):
         """
-        Run installed pylint validator against a file.
+        Pylint accepts many files on one command line.
+        """
+        return not self.uses_worker()
+
+    def is_worker_friendly(self):
+        """
+        pylint can run in a worker process unless we have been given a custom pylint command.
+        """
+        return not self.pylint_command
+
+    def create_worker(self):
+        """
+        :return: Worker running pylint in the host Python or in our virtualenv
+        """
+
+        if self.host_python:
+            return WorkerProcess(self.logger, [sys.executable, WORKER_SCRIPT], timeout=self.timeout)
+
+        python = sysdeps.get_virtualenv_executable(self.virtualenv, "python")
+        env = sysdeps.get_virtualenv_environment(self.virtualenv)
+        return WorkerProcess(self.logger, [python, WORKER_SCRIPT], env=env, timeout=self.timeout)
+
+    def get_config_file(self):
+        """
+        :return: Path to the pylint rc file used by the worker, kept in the installation folder
+        """
+        return utils.get_config_file(self.installation_path, "pylintrc", self.pylint_configuration)
+
+    def get_worker_options(self):
+        """
+        :return: pylint command line options for the worker
+        """
+        options = self.split_command(self.extra_options)
+        if not "--rcfile" in self.extra_options:
+            options.append("--rcfile=%s" % self.get_config_file())
+        return options
+
+    def run_pylint(self, fnames):
+        """
+        Run installed pylint command against files.
+
+        :return: Tuple (exit code, output)
         """
 
         with utils.temp_config_file(self.pylint_configuration) as config_fname:
 
-            options = self.extra_options
-            if not "--rcfile" in options:
-                options += " --rcfile=%s" % config_fname
+            options = self.split_command(self.extra_options)
+            if not "--rcfile" in self.extra_options:
+                options.append("--rcfile=%s" % config_fname)
 
             if self.pylint_command:
-                exitcode, output = utils.shell(self.logger, '%s %s "%s"' % (self.pylint_command, options, fname))
+                return self.run_command(self.split_command(self.pylint_command) + options + fnames)
             else:
-                exitcode, output = self.run_virtualenv_command('pylint %s "%s"' % (options, fname))
+                return self.run_virtualenv_command(["pylint"] + options + fnames)
+
+    def validate(self, fname):
+        """
+        Run installed pylint validator against a file.
+        """
+
+        response = None
+
+        if self.uses_worker():
+            response = self.validate_in_worker(dict(file=fname, args=self.get_worker_options()))
+
+        if response is not None:
+            exitcode, output = response["status"], response["output"]
+        else:
+            exitcode, output = self.run_pylint([fname])
 
         if exitcode == 0:
             return True # Validation ok
@@ -375,4 +491,28 @@ class PylintPlugin(Plugin):
             self.reporter.report_unstructured(self.id, output, fname=fname)
             return False
 
+    def validate_batch(self, fnames):
+        """
+        Run pylint once for many files.
+
+        Pylint starts messages of each file with ``************* Module dotted.name`` line.
+        """
+
+        def command(chunk):
+            """ Run one command line """
+            exitcode, output = self.run_pylint(chunk)
+            return exitcode != 0, output
+
+        def get_fname_matcher(chunk):
+            """ Match module header lines """
+
+            def get_fname(line):
+                """ :return: File name for the module, or module name if not resolved """
+                if line.startswith(MODULE_HEADER):
+                    module = line[len(MODULE_HEADER):].strip()
+                    return get_module_file(module, chunk) or module
+                return None
+
+            return get_fname
 
+        return self.run_batch_command(fnames, command, get_fname_matcher)
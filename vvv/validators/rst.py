@@ -36,6 +36,13 @@ If true set-up pylint for Python 3.x. The default is Python 2.x.
 
     If you change this you need run ``vvv --reinstall``.
 
+worker
+++++++
+
+If ``true`` (default) ``vvv-validate-rst`` is started once per run in the docutils
+virtualenv and the documents are sent to it one by one.
+Set to ``false`` to run ``vvv-validate-rst`` separately for each file.
+
 
 More information
 ----------------
@@ -44,8 +51,10 @@ More information
 
 """
 import os
+import logging
 
 from vvv.plugin import Plugin
+from vvv.worker import WorkerProcess
 
 from vvv import sysdeps
 
@@ -102,6 +111,12 @@ class RestructuredTextPlugin(Plugin):
         has_created_virtualenv =  os.path.exists(self.virtualenv)
         return has_created_virtualenv
 
+    def get_tool_path(self):
+        """
+        :return: Python of the docutils virtualenv
+        """
+        return os.path.join(self.virtualenv, "bin", "python")
+
     def install(self):
         """
         """
@@ -109,14 +124,76 @@ class RestructuredTextPlugin(Plugin):
         sysdeps.create_virtualenv(self.logger, self.virtualenv_cmd, self.virtualenv, egg_spec="docutils==0.8.1", py3=self.python3k)
 #        sysdeps.run_virtualenv_command(self.logger, self.virtualenv, "easy_install Pygments", raise_error=True)
 
+    def is_worker_friendly(self):
+        """
+        vvv-validate-rst has a worker mode.
+        """
+        return True
+
+    def is_context_friendly(self):
+        """
+        The worker validates the file content loaded by VVV.
+        """
+        return self.uses_worker()
+
+    def is_subprocess_bound(self):
+        """
+        docutils runs in the virtualenv.
+        """
+        return True
+
+    def get_script(self):
+        """
+        :return: Location of vvv-validate-rst command
+        """
+        return os.path.join(sysdeps.get_bin_path(), "vvv-validate-rst")
+
+    def create_worker(self):
+        """
+        :return: vvv-validate-rst in worker mode, running in the docutils virtualenv
+        """
+        env = sysdeps.get_virtualenv_environment(self.virtualenv)
+        return WorkerProcess(self.logger, [self.get_script(), "--worker"], env=env, timeout=self.timeout)
+
+    def validate_context(self, context):
+        """
+        Send the document to the worker.
+        """
+
+        response = None
+
+        if self.uses_worker():
+            response = self.validate_in_worker(dict(file=context.fullpath, source=context.get_text()))
+
+        if response is None:
+            return self.validate_fallback(context)
+
+        lines = context.get_lines()
+
+        for report in response["reports"]:
+
+            line = report.get("line") or 0
+
+            excerpt = None
+            if 0 < line <= len(lines):
+                excerpt = lines[line - 1].rstrip("\n")
+
+            # Levels are given as "WARNING/2", "ERROR/3" and "SEVERE/4"
+            severity = logging.WARNING if report["level"].endswith("/2") else logging.ERROR
+
+            self.reporter.report_detailed(self.id, severity, context.fullpath, line, None,
+                                          report["level"], report["message"], excerpt=excerpt)
+
+        return not response["reports"]
+
     def validate(self, fname):
         """
         Run .rst against our custom validation script.
         """
 
-        binloc = os.path.join(sysdeps.get_bin_path(), "vvv-validate-rst")
+        binloc = self.get_script()
 
-        exitcode, output = sysdeps.run_virtualenv_command(self.logger, self.virtualenv, "%s %s" % (binloc, fname))
+        exitcode, output = sysdeps.run_virtualenv_command(self.logger, self.virtualenv, [binloc, fname], timeout=self.timeout)
 
         if exitcode != 0:
             self.reporter.report_unstructured(self.id, output, fname=fname)
@@ -71,6 +71,9 @@ from vvv import sysdeps
 
 DEFAULT_COMMAND_LINE = ""
 
+#: zptlint prints this before errors of each file
+ERROR_HEADER = "*** Error in:"
+
 
 class ZptlintPlugin(Plugin):
     """
@@ -140,6 +143,19 @@ class ZptlintPlugin(Plugin):
         self.logger.debug("zptlint virtualenv status: %s" % "good" if exists else "bad")
         return exists
 
+    def get_tool_path(self):
+        """
+        :return: zptlint command used to validate files
+        """
+
+        if self.zptlint_command:
+            return sysdeps.which(self.zptlint_command)
+
+        if self.host_python:
+            return sysdeps.which("zptlint")
+
+        return os.path.join(self.virtualenv, "bin", "zptlint")
+
     def resolve_zptlint(self, cmd):
         """
         Resolve location to zptlint command.
@@ -162,15 +178,15 @@ class ZptlintPlugin(Plugin):
         if not self.zptlint_command:
             sysdeps.has_virtualenv(needed_for="Zptlint validator")
 
-    def run_virtualenv_command(self, cmd, raise_error=False):
+    def run_virtualenv_command(self, args, raise_error=False, cwd=None, env=None):
         """
-        Run cmd under host Python or our own virtualenv
+        Run command under host Python or our own virtualenv
         """
 
         if self.host_python:
-            return utils.shell(self.logger, cmd, raise_error=raise_error)
+            return self.run_command(args, raise_error=raise_error, cwd=cwd, env=utils.get_environment(env) if env else None)
         else:
-            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, cmd, raise_error=raise_error)
+            return sysdeps.run_virtualenv_command(self.logger, self.virtualenv, args, raise_error=raise_error, cwd=cwd, env=env, timeout=self.timeout)
 
     def install(self):
         """
@@ -183,22 +199,65 @@ class ZptlintPlugin(Plugin):
         if not self.host_python:
             sysdeps.create_virtualenv(self.logger, self.virtualenv_cmd, self.virtualenv, py3=False)
 
-        self.run_virtualenv_command("easy_install zptlint", raise_error=True)
+        self.run_virtualenv_command(["easy_install", "zptlint"], raise_error=True)
 
-    def validate(self, fname):
+    def is_batch_friendly(self):
         """
-        Run installed zptlint validator against a file.
+        zptlint accepts many files on one command line.
+        """
+        return True
+
+    def run_zptlint(self, fnames):
+        """
+        Run installed zptlint command against files.
+
+        :return: Tuple (exit code, output)
         """
 
-        options = self.extra_options
+        options = self.split_command(self.extra_options)
 
         if self.zptlint_command:
-            exitcode, output = utils.shell(self.logger, '%s %s "%s"' % (self.zptlint_command, options, fname))
+            return self.run_command(self.split_command(self.zptlint_command) + options + fnames)
         else:
-            exitcode, output = self.run_virtualenv_command('zptlint %s "%s"' % (options, fname))
+            return self.run_virtualenv_command(["zptlint"] + options + fnames)
+
+    def validate(self, fname):
+        """
+        Run installed zptlint validator against a file.
+        """
+
+        exitcode, output = self.run_zptlint([fname])
 
         if not output:
             return True     # Validation ok
         else:
             self.reporter.report_unstructured(self.id, output, fname=fname)
             return False
+
+    def validate_batch(self, fnames):
+        """
+        Run zptlint once for many files.
+
+        zptlint starts errors of each file with ``*** Error in: filename`` line.
+        """
+
+        def command(chunk):
+            """ Run one command line """
+            exitcode, output = self.run_zptlint(chunk)
+            return bool(output), output
+
+        def get_fname_matcher(chunk):
+            """ Match error header lines """
+            chunk = set(chunk)
+
+            def get_fname(line):
+                """ :return: File name from the header line """
+                if line.startswith(ERROR_HEADER):
+                    fname = line[len(ERROR_HEADER):].strip()
+                    if fname in chunk:
+                        return fname
+                return None
+
+            return get_fname
+
+        return self.run_batch_command(fnames, command, get_fname_matcher)
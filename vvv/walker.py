@@ -35,41 +35,55 @@ class Walker:
         Walk project root and spit out project root relative output.
 
         Unlike os.walk() do not enter into directories which are on the ignore list.
+
+        Files are yielded as soon as they are found, so that validation can start
+        before the whole tree has been walked.
+
+        :return: Generator of project root relative file paths
         """
 
-        files = []
-               
-        project_path = os.path.abspath(project_path)
+        # Build relative paths by joining strings instead of
+        # calling os.path functions for every entry
+        prefix = os.path.relpath(os.path.abspath(target_path), os.path.abspath(project_path))
+
+        if prefix == ".":
+            prefix = ""
+        else:
+            prefix += os.sep
+
+        # Stack of open directory listings as (scandir iterator, relative path prefix)
+        stack = [(os.scandir(target_path), prefix)]
 
-        def recurse(path):
-            """
-            Handle each folder 
-            """
-            for name in os.listdir(path):
-                
-                fpath = os.path.abspath(os.path.join(path, name))
+        try:
+            while stack:
 
-                relative = os.path.relpath(fpath, project_path)
+                entries, prefix = stack[-1]
 
-                if relative.startswith("./"):
-                    relative = relative[2:]
+                entry = next(entries, None)
 
-                self.logger.debug("Scanning %s" % (relative))
+                if entry is None:
+                    # Folder done
+                    entries.close()
+                    stack.pop()
+                    continue
+
+                relative = prefix + entry.name
+
+                self.logger.debug("Scanning %s", relative)
 
                 if not utils.match_file(relative, matchlist):
                     if self.debug:
                         self.logger.info("Ignoring %s by global match list", relative)
                     continue
-                
-                if os.path.isdir(fpath):
-                    recurse(fpath)                
-                else:
-                    files.append(relative)
-                
 
-        recurse(target_path)
-        
-        return files          
+                # DirEntry caches the file type from the directory listing
+                if entry.is_dir():
+                    stack.append((os.scandir(entry.path), relative + os.sep))
+                else:
+                    yield relative
+        finally:
+            for entries, prefix in stack:
+                entries.close()
 
     @staticmethod
     def is_whitelisted(fpath, project_path, matchlist):
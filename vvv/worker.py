@@ -0,0 +1,268 @@
+"""
+
+    Long running validator processes.
+
+    Starting a validator for every file means paying for the interpreter start up
+    and the module imports again and again. A worker process is started once
+    per run and validates files sent to it over a pipe.
+
+    The protocol is JSON lines: VVV writes one JSON object per request to the
+    worker stdin and the worker writes one JSON object per response to its stdout.
+    The first line the worker writes is a handshake, ``{"ready": true}``
+    or ``{"error": "why not"}``. Anything the worker or the validator prints
+    must go to stderr. The worker exits when its stdin is closed.
+
+"""
+
+# Python imports
+import os
+import json
+import time
+import tempfile
+import selectors
+import threading
+import subprocess
+
+# Local imports
+from . import profiler
+from .utils import ShellCommandFailed
+
+
+class WorkerFailed(ShellCommandFailed):
+    """ Worker process died, did not answer in time or could not validate a file """
+
+
+class WorkerStartFailed(WorkerFailed):
+    """ Worker process could not be started """
+
+
+class WorkerProcess(object):
+    """
+    One worker process speaking JSON lines.
+
+    Requests are serialized, so the worker can be shared between threads.
+    A worker which has died is started again for the next request.
+    """
+
+    def __init__(self, logger, args, env=None, cwd=None, timeout=None):
+        """
+        :param args: Command starting the worker
+
+        :param env: Complete environment for the worker, or None to use the current environment
+
+        :param timeout: Seconds to wait for a response before the worker is killed, or None
+        """
+        self.logger = logger
+        self.args = args
+        self.env = env
+        self.cwd = cwd
+        self.timeout = timeout
+
+        self.process = None
+
+        #: Worker stderr, kept in a file so that the worker never blocks writing it
+        self.stderr = None
+
+        #: Bytes read after the last full line
+        self.buffer = b""
+
+        self.lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the worker and wait for the handshake.
+        """
+
+        self.logger.debug("Starting worker: %s" % self.args)
+
+        self.stderr = tempfile.TemporaryFile()
+        self.buffer = b""
+
+        try:
+            self.process = subprocess.Popen(self.args, env=self.env, cwd=self.cwd, stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE, stderr=self.stderr)
+        except OSError as e:
+            self.close()
+            raise WorkerStartFailed("Could not start worker %s: %s" % (" ".join(self.args), e))
+
+        try:
+            handshake = self.read_message()
+        except WorkerFailed as e:
+            raise WorkerStartFailed(str(e))
+
+        if not handshake.get("ready"):
+            self.close()
+            raise WorkerStartFailed("Worker %s could not start: %s" % (" ".join(self.args), handshake.get("error")))
+
+    def request(self, message):
+        """
+        Send a request and wait for the response.
+
+        :param message: JSON serializable dict
+
+        :return: Response dict
+        """
+
+        with self.lock:
+
+            if not self.is_alive():
+                # Clean up after a worker which has died between requests
+                self.close()
+                self.start()
+
+            with profiler.measure("worker", os.path.basename(self.args[-1])):
+                try:
+                    self.process.stdin.write(json.dumps(message).encode("utf-8") + b"\n")
+                    self.process.stdin.flush()
+                except (IOError, OSError) as e:
+                    self.close()
+                    raise WorkerFailed("Could not send request to worker %s: %s" % (" ".join(self.args), e))
+
+                return self.read_message()
+
+    def read_message(self):
+        """
+        Read one JSON line written by the worker.
+
+        Kills the worker if it does not answer in time or writes garbage.
+
+        :return: Decoded dict
+        """
+
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+
+        fd = self.process.stdout.fileno()
+
+        with selectors.DefaultSelector() as selector:
+
+            selector.register(fd, selectors.EVENT_READ)
+
+            while b"\n" not in self.buffer:
+
+                wait = None
+                if deadline is not None:
+                    wait = deadline - time.monotonic()
+                    if wait <= 0 or not selector.select(wait):
+                        self.close(kill=True)
+                        raise WorkerFailed("Worker %s did not answer in %s seconds" % (" ".join(self.args), self.timeout))
+
+                data = os.read(fd, 65536)
+                if not data:
+                    error = self.get_error_output()
+                    self.close()
+                    raise WorkerFailed("Worker %s died:\n%s" % (" ".join(self.args), error))
+
+                self.buffer += data
+
+        line, self.buffer = self.buffer.split(b"\n", 1)
+
+        try:
+            message = json.loads(line.decode("utf-8"))
+        except ValueError:
+            self.close()
+            raise WorkerFailed("Worker %s wrote garbage: %r" % (" ".join(self.args), line[:200]))
+
+        if not isinstance(message, dict):
+            self.close()
+            raise WorkerFailed("Worker %s wrote garbage: %r" % (" ".join(self.args), line[:200]))
+
+        return message
+
+    def get_error_output(self):
+        """
+        :return: What the worker has written to stderr
+        """
+        self.stderr.seek(0)
+        return self.stderr.read().decode("utf-8", "replace")
+
+    def is_alive(self):
+        """
+        :return True: If the worker is running
+        """
+        return self.process is not None and self.process.poll() is None
+
+    def close(self, kill=False):
+        """
+        Stop the worker by closing its stdin, or kill it if it does not exit.
+
+        :param kill: Kill the worker right away, e.g. when it is stuck
+        """
+
+        process = self.process
+        self.process = None
+
+        if process is not None:
+
+            if kill:
+                process.kill()
+
+            for stream in (process.stdin, process.stdout):
+                try:
+                    stream.close()
+                except (IOError, OSError):
+                    # Broken pipe of a dead worker
+                    pass
+
+            try:
+                process.wait(5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+        if self.stderr is not None:
+            self.stderr.close()
+            self.stderr = None
+
+
+class WorkerPool(object):
+    """
+    Worker processes of one validator.
+
+    Each request is handled by an idle worker. New workers are started on demand,
+    up to the pool size, e.g. when the asyncio scheduler runs jobs in several threads.
+    """
+
+    def __init__(self, create, size=1):
+        """
+        :param create: Function returning a new WorkerProcess
+
+        :param size: How many workers may run at once
+        """
+        self.create = create
+        self.available = threading.BoundedSemaphore(size)
+        self.idle = []
+        self.workers = []
+        self.lock = threading.Lock()
+
+    def request(self, message):
+        """
+        Send a request to an idle worker, see :py:meth:`WorkerProcess.request`.
+        """
+
+        with self.available:
+
+            with self.lock:
+                worker = self.idle.pop() if self.idle else None
+
+            if worker is None:
+                worker = self.create()
+                with self.lock:
+                    self.workers.append(worker)
+
+            try:
+                return worker.request(message)
+            finally:
+                with self.lock:
+                    self.idle.append(worker)
+
+    def close(self):
+        """
+        Stop all workers.
+        """
+        with self.lock:
+            workers = self.workers
+            self.workers = []
+            self.idle = []
+
+        for worker in workers:
+            worker.close()